@@ -0,0 +1,108 @@
+"""
+Throughput of the streaming bulk import and export paths at 1M rows, against a
+SQLite file standing in for MySQL (config/sqlite_db.py: same migrations and
+SQL). Import is compared with the one-report-per-commit pattern of POST
+/api/crime-report, measured on a sample and reported as rows/s. Peak RSS shows that neither path
+materializes the data set.
+
+Run from the backend directory:
+    python -m benchmarks.bench_bulk_io --rows 1000000
+"""
+import argparse
+import asyncio
+import json
+import os
+import resource
+import tempfile
+import time
+import config.db as db
+from config.db import ConnectionPool
+from config.sqlite_db import create_sqlite_connection
+from models.crime_report_model import CrimeReportRequest
+from repositories import crime_reports
+from utils.bulk_io import import_reports, export_reports
+
+def report(i):
+    return {"crime_type": "Theft", "location": f"Block {i} Street {i % 97}", "email": f"user{i % 5000}@example.com",
+            "latitude": 1.3 + (i % 1000) * 1e-4, "longitude": 103.8 + (i % 777) * 1e-4,
+            "police_station": "Central NPC", "submitted_at": "2024-05-01T12:00:00"}
+
+async def ndjson_body(rows, chunk_bytes=64 * 1024):
+    """Request body as it arrives over the wire: NDJSON in fixed-size chunks, generated lazily"""
+    buffer = bytearray()
+    for i in range(rows):
+        buffer += json.dumps(report(i)).encode() + b"\n"
+        if len(buffer) >= chunk_bytes:
+            yield bytes(buffer)
+            buffer.clear()
+    if buffer:
+        yield bytes(buffer)
+
+async def per_row_baseline(rows):
+    """One INSERT and commit per report, as POST /api/crime-report does"""
+    connection = await db.acquire_connection()
+    try:
+        for i in range(rows):
+            await crime_reports.create(connection, CrimeReportRequest.model_validate(report(i)), None, f"b{i}")
+    finally:
+        await db.release_connection(connection)
+
+async def export_all(fmt):
+    total_bytes = 0
+    async for chunk in export_reports(fmt, chunk_size=5000):
+        total_bytes += len(chunk)
+    return total_bytes
+
+def max_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--baseline-rows", type=int, default=20000)
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.sqlite3")
+        setup = create_sqlite_connection(path)
+        setup.cursor().executemany("INSERT INTO users (name, email, phone, password) VALUES (%s, %s, %s, 'x')",
+                          [(f"user{i}", f"user{i}@example.com", str(i)) for i in range(5000)])
+        setup.commit()
+        setup.close()
+
+        db._pool, db._executor = ConnectionPool(lambda: create_sqlite_connection(path), size=2, max_overflow=0,
+                                                pre_ping=False), None
+        rss_start = max_rss_mb()
+
+        start = time.perf_counter()
+        asyncio.run(per_row_baseline(args.baseline_rows))
+        baseline_s = time.perf_counter() - start
+        db.shutdown_db()
+
+        start = time.perf_counter()
+        summary = asyncio.run(import_reports(ndjson_body(args.rows), "ndjson", chunk_size=args.chunk_size))
+        import_s = time.perf_counter() - start
+        db.shutdown_db()
+        assert summary["inserted"] == args.rows and summary["invalid"] == 0, summary
+        rss_import = max_rss_mb()
+
+        results = {}
+        for fmt in ("ndjson", "csv"):
+            start = time.perf_counter()
+            size = asyncio.run(export_all(fmt))
+            results[fmt] = (time.perf_counter() - start, size)
+            db.shutdown_db()
+        rss_export = max_rss_mb()
+
+    total = args.rows + args.baseline_rows
+    print(f"{'path':<34} {'rows':>9} {'seconds':>9} {'rows/s':>10}")
+    print(f"{'per-row insert + commit':<34} {args.baseline_rows:>9} {baseline_s:>9.2f} {args.baseline_rows / baseline_s:>10.0f}")
+    print(f"{'bulk import (NDJSON, executemany)':<34} {args.rows:>9} {import_s:>9.2f} {args.rows / import_s:>10.0f}")
+    for fmt, (seconds, size) in results.items():
+        print(f"{'streaming export (' + fmt + ')':<34} {total:>9} {seconds:>9.2f} {total / seconds:>10.0f}"
+              f"   {size / 1e6:.0f} MB")
+    print(f"peak RSS: start {rss_start:.0f} MB, after import {rss_import:.0f} MB, after export {rss_export:.0f} MB")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+Throughput of a DB-bound async handler at high client concurrency, comparing the
+old pattern (blocking driver calls inline in `async def`) with the executor-backed
+data-access layer. The driver is simulated by a connection whose queries sleep,
+so no MySQL server is needed. Latencies are per handler call; in blocking mode
+the real cost shows up as throughput and event-loop stall instead.
+
+Run from the backend directory:
+    python -m benchmarks.bench_db_concurrency --clients 100 200 --query-ms 5
+"""
+import argparse
+import asyncio
+import statistics
+import time
+import config.db as db
+from config.db import ConnectionPool, db_call, acquire_connection, release_connection
+
+class SleepyCursor:
+    def __init__(self, query_s):
+        self.query_s = query_s
+
+    def execute(self, query, params=()):
+        time.sleep(self.query_s)
+
+    def fetchone(self):
+        return {"id": 1, "name": "bench", "email": "bench@example.com", "phone": "0"}
+
+    def close(self):
+        pass
+
+class SleepyConnection:
+    def __init__(self, query_s):
+        self.query_s = query_s
+
+    def cursor(self, dictionary=False):
+        return SleepyCursor(self.query_s)
+
+    def ping(self, reconnect=False):
+        pass
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+def fetch_user(connection, user_id):
+    cursor = connection.cursor(dictionary=True)
+    try:
+        cursor.execute("SELECT id, name, email, phone FROM users WHERE id = %s", (user_id,))
+        return cursor.fetchone()
+    finally:
+        cursor.close()
+
+fetch_user_async = db_call(fetch_user)
+
+async def blocking_handler(pool):
+    # Before: checkout and query run on the event loop thread
+    connection = pool.acquire()
+    try:
+        return fetch_user(connection, 1)
+    finally:
+        connection.close()
+
+async def executor_handler(pool):
+    # After: same shape as the get_db dependency plus a repository call
+    connection = await acquire_connection()
+    try:
+        return await fetch_user_async(connection, 1)
+    finally:
+        await release_connection(connection)
+
+async def drive(handler, pool, clients, requests_per_client):
+    latencies = []
+    stalls = [0.0]
+    done = asyncio.Event()
+
+    async def ticker():
+        # Measures how long the loop goes without servicing a 1 ms timer
+        while not done.is_set():
+            start = time.perf_counter()
+            await asyncio.sleep(0.001)
+            stalls[0] = max(stalls[0], time.perf_counter() - start - 0.001)
+
+    async def client():
+        for _ in range(requests_per_client):
+            start = time.perf_counter()
+            await handler(pool)
+            latencies.append(time.perf_counter() - start)
+
+    tick = asyncio.create_task(ticker())
+    await asyncio.sleep(0)
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(clients)))
+    elapsed = time.perf_counter() - start
+    done.set()
+    await tick
+    latencies.sort()
+    return {
+        "rps": len(latencies) / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+        "max_loop_stall_ms": stalls[0] * 1000
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, nargs="+", default=[100, 200])
+    parser.add_argument("--requests", type=int, default=20, help="requests per client")
+    parser.add_argument("--query-ms", type=float, default=5.0)
+    parser.add_argument("--pool-size", type=int, default=10)
+    parser.add_argument("--max-overflow", type=int, default=10)
+    args = parser.parse_args()
+
+    query_s = args.query_ms / 1000
+    print(f"{'clients':>8} {'mode':>9} {'req/s':>9} {'p50 ms':>9} {'p99 ms':>9} {'loop stall ms':>14}")
+    for clients in args.clients:
+        for name, handler in (("blocking", blocking_handler), ("executor", executor_handler)):
+            pool = ConnectionPool(lambda: SleepyConnection(query_s), size=args.pool_size,
+                                  max_overflow=args.max_overflow, timeout=60, pre_ping=False)
+            db._pool, db._executor = pool, None
+            result = asyncio.run(drive(handler, pool, clients, args.requests))
+            db.shutdown_db()
+            print(f"{clients:>8} {name:>9} {result['rps']:>9.0f} {result['p50_ms']:>9.1f} {result['p99_ms']:>9.1f} "
+                  f"{result['max_loop_stall_ms']:>14.1f}",
+                  flush=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+/api/history query cost for a heavy reporter, on an in-memory SQLite copy of
+the crime_reports table. Compares the old unbounded `WHERE email = %s` fetch
+(no index) against keyset pages over idx_crime_reports_user_submitted, and
+against OFFSET paging for contrast at depth.
+
+Run from the backend directory:
+    python -m benchmarks.bench_history_pagination --reports 100000 --page-size 100
+"""
+import argparse
+import random
+import sqlite3
+import time
+from repositories.crime_reports import HISTORY_FIRST_PAGE_SQL, HISTORY_NEXT_PAGE_SQL, HISTORY_COLUMNS
+
+LEGACY_SQL = "SELECT crime_type, location, police_station, submitted_at AS created_at FROM crime_reports WHERE email = ?"
+OFFSET_SQL = (f"SELECT {HISTORY_COLUMNS} FROM crime_reports WHERE user_id = ? "
+              "ORDER BY submitted_at DESC, id DESC LIMIT ? OFFSET ?")
+
+def sqlite_sql(query):
+    return query.replace("%s", "?")
+
+def build_db(reports, other_users, seed=0):
+    rng = random.Random(seed)
+    db = sqlite3.connect(":memory:")
+    db.execute("""
+        CREATE TABLE crime_reports (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, user_id INTEGER, crime_type TEXT, location TEXT,
+            email TEXT, latitude REAL, longitude REAL, police_station TEXT, submitted_at TEXT
+        )
+    """)
+    # The heavy user's reports are interleaved with background traffic from other accounts
+    rows = []
+    for i in range(reports * 2):
+        user_id = 1 if i % 2 == 0 else rng.randint(2, other_users + 1)
+        # Coarse timestamps so many rows share a submitted_at and the id tiebreak matters
+        ts = f"2024-{1 + i * 12 // (reports * 2):02d}-01 00:{(i // 60) % 60:02d}:00"
+        rows.append((user_id, "Theft", f"loc {i}", f"user{user_id}@example.com", 1.3, 103.8, "Central NPC", ts))
+    db.executemany(
+        "INSERT INTO crime_reports (user_id, crime_type, location, email, latitude, longitude, police_station, "
+        "submitted_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows
+    )
+    db.commit()
+    return db
+
+def timed(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+def walk_keyset(db, page_size):
+    rows, after = [], None
+    while True:
+        if after is None:
+            page = db.execute(sqlite_sql(HISTORY_FIRST_PAGE_SQL), (1, page_size + 1)).fetchall()
+        else:
+            page = db.execute(sqlite_sql(HISTORY_NEXT_PAGE_SQL), (1, after[0], after[0], after[1], page_size + 1)).fetchall()
+        rows.extend(page[:page_size])
+        if len(page) <= page_size:
+            return rows
+        after = (page[page_size - 1][4], page[page_size - 1][0])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--reports", type=int, default=100000, help="reports filed by the heavy user")
+    parser.add_argument("--other-users", type=int, default=1000)
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    db = build_db(args.reports, args.other_users)
+    n = args.page_size
+    deep_offset = args.reports - n
+
+    legacy_s, legacy = timed(lambda: db.execute(LEGACY_SQL, ("user1@example.com",)).fetchall(), args.repeat)
+
+    db.execute("CREATE INDEX idx_crime_reports_user_submitted ON crime_reports (user_id, submitted_at, id)")
+    first_s, first = timed(lambda: db.execute(sqlite_sql(HISTORY_FIRST_PAGE_SQL), (1, n + 1)).fetchall(), args.repeat)
+    last = first[n - 1] if len(first) > n else first[-1]
+    next_s, _ = timed(lambda: db.execute(sqlite_sql(HISTORY_NEXT_PAGE_SQL), (1, last[4], last[4], last[0], n + 1)).fetchall(),
+                      args.repeat)
+    offset_s, _ = timed(lambda: db.execute(OFFSET_SQL, (1, n, deep_offset)).fetchall(), args.repeat)
+    walk_s, walked = timed(lambda: walk_keyset(db, n), 1)
+
+    assert len(legacy) == args.reports and len(walked) == args.reports
+    assert len({row[0] for row in walked}) == args.reports, "keyset walk returned duplicate rows"
+
+    print(f"heavy user reports: {args.reports}, table rows: {args.reports * 2}, page size: {n}")
+    print(f"{'unbounded by email (no index)':<36} {legacy_s * 1000:>9.2f} ms  ({len(legacy)} rows)")
+    print(f"{'keyset first page':<36} {first_s * 1000:>9.2f} ms")
+    print(f"{'keyset next page':<36} {next_s * 1000:>9.2f} ms")
+    print(f"{'OFFSET page at depth ' + str(deep_offset):<36} {offset_s * 1000:>9.2f} ms")
+    print(f"{'keyset walk of every page':<36} {walk_s * 1000:>9.2f} ms  ({args.reports // n} pages)")
+
+if __name__ == "__main__":
+    main()
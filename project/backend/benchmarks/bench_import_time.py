@@ -0,0 +1,87 @@
+"""
+Startup budget for a worker: runs `python -X importtime -c "import main"` in a
+fresh interpreter (best of --repeat) and fails when importing the app takes
+longer than --budget-ms, or when a dependency that should only load on first
+use (pandas, bs4, twilio) is imported eagerly. Also times the dataset loads
+the lifespan handler performs, which are outside the import budget.
+
+Run from the backend directory:
+    python -m benchmarks.bench_import_time --budget-ms 1000
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LAZY_MODULES = ("pandas", "bs4", "twilio")
+OWN_PACKAGES = ("main", "config", "controllers", "models", "repositories", "routes", "utils")
+
+# Modules are imported before timing: the lifespan handler runs after `import main`
+DATASET_LOAD = """
+import time
+from utils.station_registry import get_station_registry
+from controllers.ranking_controller import get_ranking_index
+started = time.perf_counter()
+get_station_registry()
+registry_s = time.perf_counter() - started
+started = time.perf_counter()
+get_ranking_index()
+print(registry_s, time.perf_counter() - started)
+"""
+
+def import_profile():
+    """{module: (self_us, cumulative_us)} for one cold `import main`"""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import main"], cwd=BACKEND_DIR,
+                            capture_output=True, text=True, check=True)
+    profile = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        profile[name.strip()] = (int(self_us), int(cumulative_us))
+    return profile
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--budget-ms", type=float, default=1000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    profiles = [import_profile() for _ in range(args.repeat)]
+    profile = min(profiles, key=lambda p: p["main"][1])
+    total_ms = profile["main"][1] / 1000
+    own_ms = sum(self_us for name, (self_us, _) in profile.items()
+                 if name.split(".")[0] in OWN_PACKAGES) / 1000
+
+    print(f"import main: {total_ms:.0f} ms (best of {args.repeat}), of which app modules themselves {own_ms:.0f} ms")
+    print(f"slowest top-level imports:")
+    top_level = [(name, cumulative) for name, (_, cumulative) in profile.items() if "." not in name]
+    for name, cumulative in sorted(top_level, key=lambda item: -item[1])[1:args.top + 1]:
+        print(f"  {name:<30} {cumulative / 1000:>8.1f} ms")
+
+    started = time.perf_counter()
+    result = subprocess.run([sys.executable, "-c", DATASET_LOAD], cwd=BACKEND_DIR, capture_output=True, text=True)
+    if result.returncode == 0:
+        registry_s, ranking_s = map(float, result.stdout.split())
+        print(f"lifespan dataset loads: station registry {registry_s * 1000:.0f} ms, "
+              f"ranking index {ranking_s * 1000:.0f} ms (process {time.perf_counter() - started:.2f} s)")
+    else:
+        print(f"lifespan dataset loads skipped: {result.stderr.strip().splitlines()[-1]}")
+
+    failures = []
+    eager = [name for name in LAZY_MODULES if name in profile]
+    if eager:
+        failures.append(f"imported eagerly: {', '.join(eager)}")
+    if total_ms > args.budget_ms:
+        failures.append(f"import main took {total_ms:.0f} ms, over the {args.budget_ms:.0f} ms budget")
+    for failure in failures:
+        print(f"FAIL {failure}")
+    if not failures:
+        print(f"OK within {args.budget_ms:.0f} ms budget")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,71 @@
+"""
+Per-report cost of near-duplicate detection as the window fills, for the grid
+index in utils/incidents.py against a linear scan of every report still in the
+window. Both must agree on which reports are duplicates; the scan is checked on
+a prefix since it grows quadratically.
+
+Run from the backend directory:
+    python -m benchmarks.bench_incident_index --reports 100000 --rate 50
+"""
+import argparse
+import random
+import time
+from utils.haversine import haversine
+from utils.incidents import IncidentIndex
+
+CRIME_TYPES = ["Theft", "Robbery", "Assault", "Vandalism", "Burglary"]
+
+def reports(count, rate, lat0, seed=0):
+    """(uid, crime_type, lat, lon, ts) arriving at `rate` per second over a city-sized box"""
+    rng = random.Random(seed)
+    for i in range(count):
+        yield (f"r{i}", rng.choice(CRIME_TYPES), lat0 + rng.random() * 0.25, 103.6 + rng.random() * 0.4,
+               1_000_000.0 + i / rate)
+
+def linear_scan(stream, radius_m, window_s):
+    """Reference: compare each report against every earlier report in the window"""
+    recent, flags = [], []
+    for uid, crime_type, lat, lon, ts in stream:
+        recent = [r for r in recent if r[3] >= ts - window_s]
+        flags.append(any(
+            crime_type == other_type and haversine(lat, lon, other_lat, other_lon) * 1000 <= radius_m
+            for other_type, other_lat, other_lon, _ in recent
+        ))
+        recent.append((crime_type, lat, lon, ts))
+    return flags
+
+def indexed(stream, radius_m, window_s):
+    index = IncidentIndex(radius_m, window_s)
+    flags = [index.assign(uid, crime_type, lat, lon, now=ts)[1] for uid, crime_type, lat, lon, ts in stream]
+    return flags, index
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--reports", type=int, default=100000)
+    parser.add_argument("--rate", type=float, default=50, help="reports per second")
+    parser.add_argument("--radius-m", type=float, default=150)
+    parser.add_argument("--window-s", type=float, default=600)
+    parser.add_argument("--check", type=int, default=5000, help="reports compared against the linear scan")
+    args = parser.parse_args()
+
+    for lat0 in (1.25, 59.8):
+        prefix = list(reports(args.check, args.rate, lat0))
+        start = time.perf_counter()
+        expected = linear_scan(prefix, args.radius_m, args.window_s)
+        scan_s = time.perf_counter() - start
+        got, _ = indexed(prefix, args.radius_m, args.window_s)
+        assert got == expected, f"index disagrees with linear scan at latitude {lat0}"
+
+        stream = list(reports(args.reports, args.rate, lat0))
+        start = time.perf_counter()
+        flags, index = indexed(stream, args.radius_m, args.window_s)
+        index_s = time.perf_counter() - start
+
+        stats = index.stats()
+        print(f"latitude {lat0}: {args.check} reports match the linear scan")
+        print(f"  linear scan  {scan_s / args.check * 1e6:>9.1f} us/report  ({args.check} reports)")
+        print(f"  grid index   {index_s / args.reports * 1e6:>9.1f} us/report  ({args.reports} reports, "
+              f"{stats['tracked_reports']} in window, {sum(flags)} duplicates)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Per-request cost of MetricsMiddleware and the cost of a /metrics scrape. A
+minimal FastAPI app is driven directly through its ASGI interface, with and
+without the middleware, so the difference is the instrumentation alone. The
+scrape is rendered after populating a realistic number of label series.
+
+Run from the backend directory:
+    python -m benchmarks.bench_metrics_overhead --requests 20000
+"""
+import argparse
+import asyncio
+import time
+from fastapi import FastAPI
+from utils.metrics import (REGISTRY, MetricsMiddleware, HTTP_REQUESTS, HTTP_REQUEST_SECONDS, DB_QUERY_SECONDS,
+                           EXTERNAL_CALL_SECONDS)
+
+def build_app(instrumented):
+    app = FastAPI()
+
+    @app.get("/api/items/{item_id}")
+    async def item(item_id: int):
+        return {"id": item_id}
+
+    if instrumented:
+        app.add_middleware(MetricsMiddleware)
+    return app
+
+async def drive(app, requests):
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    start = time.perf_counter()
+    for i in range(requests):
+        scope = {"type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+                 "scheme": "http", "path": f"/api/items/{i}", "raw_path": f"/api/items/{i}".encode(),
+                 "root_path": "", "query_string": b"", "headers": [], "client": ("127.0.0.1", 1),
+                 "server": ("127.0.0.1", 80)}
+        await app(scope, receive, send)
+    return (time.perf_counter() - start) / requests
+
+async def bare_app(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"{}"})
+
+class MatchedRoute:
+    path = "/api/items/{item_id}"
+
+async def routed_bare_app(scope, receive, send):
+    scope["route"] = MatchedRoute
+    await bare_app(scope, receive, send)
+
+def populate(routes, operations):
+    for r in range(routes):
+        for status in ("200", "404", "500"):
+            HTTP_REQUESTS.inc("GET", f"/api/route{r}", status)
+        HTTP_REQUEST_SECONDS.observe("GET", f"/api/route{r}", value=0.01)
+    for o in range(operations):
+        DB_QUERY_SECONDS.observe(f"repo.operation{o}", value=0.001)
+    for service in ("distance_matrix", "twilio", "bcrypt"):
+        EXTERNAL_CALL_SECONDS.observe(service, "ok", value=0.1)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--routes", type=int, default=40)
+    parser.add_argument("--operations", type=int, default=30)
+    args = parser.parse_args()
+
+    plain, instrumented = build_app(False), build_app(True)
+    # Warm both paths, then interleave runs so drift affects both equally
+    asyncio.run(drive(plain, 1000))
+    asyncio.run(drive(instrumented, 1000))
+    plain_s = min(asyncio.run(drive(plain, args.requests)) for _ in range(3))
+    instrumented_s = min(asyncio.run(drive(instrumented, args.requests)) for _ in range(3))
+    # The same comparison around a do-nothing app isolates the middleware from framework noise
+    bare_s = min(asyncio.run(drive(routed_bare_app, args.requests)) for _ in range(3))
+    wrapped_s = min(asyncio.run(drive(MetricsMiddleware(routed_bare_app), args.requests)) for _ in range(3))
+
+    populate(args.routes, args.operations)
+    start = time.perf_counter()
+    for _ in range(20):
+        text = REGISTRY.render()
+    render_s = (time.perf_counter() - start) / 20
+
+    print(f"request without middleware  {plain_s * 1e6:>8.1f} us")
+    print(f"request with middleware     {instrumented_s * 1e6:>8.1f} us")
+    print(f"middleware alone            {(wrapped_s - bare_s) * 1e6:>8.1f} us")
+    print(f"/metrics render             {render_s * 1000:>8.2f} ms  ({len(text.splitlines())} lines, "
+          f"{len(text) / 1024:.0f} KiB)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Payload size and serialization time of GET /api/location/nearest before and
+after the lean response model. "Before" is the full station including the raw
+GeoJSON feature, rendered by the stdlib JSONResponse with no compression.
+"After" is the typed lean model, orjson and gzip negotiation. Requests run
+in-process through the real router, with the stub travel-time backend.
+
+Run from the backend directory:
+    python -m benchmarks.bench_nearest_payload --requests 500
+"""
+import os
+
+os.environ.setdefault("TRAVEL_TIME_BACKEND", "stub")
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+import timeit
+import httpx
+from fastapi import FastAPI
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from controllers.location_controller import get_nearest_location
+from models.location_model import NearestStation, NearestStationResponse
+from routes import location_routes
+from utils.responses import CompressionMiddleware, FastJSONResponse
+
+LAT_RANGE, LON_RANGE = (1.28, 1.44), (103.7, 103.98)
+
+def build_app(fast: bool) -> FastAPI:
+    if not fast:
+        app = FastAPI(default_response_class=JSONResponse)
+    else:
+        app = FastAPI(default_response_class=FastJSONResponse)
+        app.add_middleware(CompressionMiddleware)
+    app.include_router(location_routes.router)
+    return app
+
+async def measure(app: FastAPI, points, params: dict, headers: dict):
+    transport = httpx.ASGITransport(app=app)
+    sizes, latencies = [], []
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for lat, lon in points:
+            started = time.perf_counter()
+            response = await client.get("/api/location/nearest", params={"lat": lat, "lon": lon, **params},
+                                        headers=headers)
+            latencies.append(time.perf_counter() - started)
+            response.raise_for_status()
+            sizes.append(len(response.content) if response.headers.get("content-encoding") != "gzip"
+                         else int(response.headers["content-length"]))
+    return statistics.mean(sizes), statistics.median(latencies)
+
+def serialization_us(station: dict, number: int):
+    """Per-response cost of turning a station into body bytes, old path vs new"""
+    def before():
+        return JSONResponse(jsonable_encoder({"nearest_station": station})).body
+
+    def after():
+        lean = NearestStationResponse(nearest_station=NearestStation.from_station(station))
+        return FastJSONResponse(lean.model_dump(exclude_unset=True)).body
+
+    return {name: min(timeit.repeat(fn, number=number, repeat=5)) / number * 1e6
+            for name, fn in (("before", before), ("after", after))}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    points = [(rng.uniform(*LAT_RANGE), rng.uniform(*LON_RANGE)) for _ in range(args.requests)]
+    station = asyncio.run(get_nearest_location(*points[0]))
+
+    cases = [
+        ("before: raw feature, stdlib json", build_app(fast=False), {"include_raw": "true"}, {}),
+        ("after: lean, orjson", build_app(fast=True), {}, {"Accept-Encoding": "identity"}),
+        ("after: lean, orjson, gzip", build_app(fast=True), {}, {"Accept-Encoding": "gzip"}),
+        ("after: include_raw, orjson, gzip", build_app(fast=True), {"include_raw": "true"},
+         {"Accept-Encoding": "gzip"}),
+    ]
+    print(f"{'response':<36} {'bytes':>8} {'median request us':>18}")
+    for name, app, params, headers in cases:
+        size, latency = asyncio.run(measure(app, points, params, headers))
+        print(f"{name:<36} {size:>8.0f} {latency * 1e6:>18.0f}")
+
+    timings = serialization_us(station, number=2000)
+    print(f"serialization per response: before {timings['before']:.1f} us, after {timings['after']:.1f} us "
+          f"({timings['before'] / timings['after']:.1f}x)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Benchmark the NPC ranking CSV loader on synthetically enlarged files.
+
+Run from the backend directory:
+    python -m benchmarks.bench_ranking_loader --stations 50 500 5000 --years 20
+"""
+import argparse
+import csv
+import os
+import random
+import tempfile
+import time
+import pandas as pd
+from utils.ranking_utils import DIVCODE_TO_DIVISION, load_ranking_table, parse_ranking_file
+
+CRIMES = ["Outrage Of Modesty", "Robbery", "Housebreaking", "Theft Of Motor Vehicle", "Snatch Theft"]
+
+def parse_ranking_file_iterrows(filepath):
+    """The previous row-by-row loader, kept as the baseline"""
+    df = pd.read_csv(filepath)
+    ranking_data = {}
+    current_station = None
+
+    for _, row in df.iterrows():
+        name = str(row['DataSeries']).strip()
+
+        if "Police Division" in name:
+            current_station = name
+            ranking_data[current_station] = {}
+        elif current_station:
+            crime = name
+            crime_data = pd.to_numeric(pd.Series(row.values[1:]), errors="coerce").fillna(0).astype(int).tolist()
+            ranking_data[current_station][crime] = crime_data
+
+    return ranking_data
+
+def write_synthetic_csv(path, stations, years, seed=0):
+    rng = random.Random(seed)
+    divisions = list(DIVCODE_TO_DIVISION.values())
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["DataSeries"] + [str(2024 - y) for y in range(years)])
+        for s in range(stations):
+            writer.writerow([f"Station {s} NPC - {divisions[s % len(divisions)]}"] + ["na"] * years)
+            for crime in CRIMES:
+                # Sprinkle non-numeric markers so coercion is exercised
+                writer.writerow([crime] + [rng.choice(["na", "-"]) if rng.random() < 0.05 else rng.randint(0, 200)
+                                           for _ in range(years)])
+
+def best_of(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--stations", type=int, nargs="+", default=[50, 500, 5000])
+    parser.add_argument("--years", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'stations':>9} {'rows':>7} {'iterrows s':>11} {'vectorized s':>13} {'table s':>9} {'speedup':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for stations in args.stations:
+            path = os.path.join(tmp, f"ranking_{stations}.csv")
+            write_synthetic_csv(path, stations, args.years)
+
+            baseline_s, expected = best_of(lambda: parse_ranking_file_iterrows(path), args.repeat)
+            vectorized_s, actual = best_of(lambda: parse_ranking_file(path), args.repeat)
+            table_s, _ = best_of(lambda: load_ranking_table(path), args.repeat)
+            assert actual == expected, "vectorized loader diverged from the iterrows baseline"
+
+            rows = stations * (len(CRIMES) + 1)
+            print(f"{stations:>9} {rows:>7} {baseline_s:>11.3f} {vectorized_s:>13.3f} {table_s:>9.3f} "
+                  f"{baseline_s / vectorized_s:>7.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Division alerts through the SMS dispatcher against the old one-send-per-request
+path, with a fake provider that takes --provider-ms to accept each message.
+Reports how long the request path is held, how many messages reach the
+provider for a burst of alerts, and delivery latency (alert queued to message
+accepted by the provider).
+
+Run from the backend directory:
+    python -m benchmarks.bench_sms_dispatch --alerts 200 --divisions 4 --provider-ms 300
+"""
+import argparse
+import asyncio
+import time
+from utils.sms_utils import DIVCODE_PHONE_MAP, FakeSmsProvider, SmsDispatcher
+
+async def synchronous(alerts, divisions, provider):
+    """Every request waits for its own provider call, as send_sms_by_divcode did"""
+    held = []
+    for i in range(alerts):
+        started = time.perf_counter()
+        await provider.send(DIVCODE_PHONE_MAP[divisions[i % len(divisions)]], f"Crime report {i}")
+        held.append(time.perf_counter() - started)
+    return held
+
+async def dispatched(alerts, divisions, provider, window_s):
+    dispatcher = SmsDispatcher(provider, coalesce_window_s=window_s)
+    dispatcher.start()
+    held = []
+    for i in range(alerts):
+        started = time.perf_counter()
+        dispatcher.enqueue(divisions[i % len(divisions)], f"Crime report {i}")
+        held.append(time.perf_counter() - started)
+        await asyncio.sleep(0)
+    while dispatcher.alerts_delivered + dispatcher.failed < alerts:
+        await asyncio.sleep(0.05)
+    await dispatcher.stop()
+    return held, dispatcher.stats()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--alerts", type=int, default=200)
+    parser.add_argument("--divisions", type=int, default=4)
+    parser.add_argument("--provider-ms", type=float, default=300)
+    parser.add_argument("--window-s", type=float, default=1.0)
+    args = parser.parse_args()
+    divisions = list(DIVCODE_PHONE_MAP)[:args.divisions]
+
+    sync_provider = FakeSmsProvider(latency_s=args.provider_ms / 1000)
+    sync_held = asyncio.run(synchronous(args.alerts, divisions, sync_provider))
+    queued_provider = FakeSmsProvider(latency_s=args.provider_ms / 1000)
+    queued_held, stats = asyncio.run(dispatched(args.alerts, divisions, queued_provider, args.window_s))
+
+    delivery = stats["delivery_seconds"]
+    print(f"{'path':<14} {'request held (mean)':>20} {'messages sent':>14}")
+    print(f"{'synchronous':<14} {sum(sync_held) / len(sync_held) * 1000:>17.1f} ms {len(sync_provider.sent):>14}")
+    print(f"{'dispatcher':<14} {sum(queued_held) / len(queued_held) * 1e6:>17.1f} us {len(queued_provider.sent):>14}")
+    print(f"dispatcher delivery latency: mean {delivery['mean']:.2f}s, max {delivery['max']:.2f}s; "
+          f"{stats['alerts_coalesced']} alerts coalesced, {stats['rate_limited']} digests delayed by the rate limit")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,309 @@
+"""
+End-to-end load test of the HTTP API with local stand-ins for every external
+service, so no MySQL server, Google key or Twilio account is needed:
+  - DB_BACKEND=sqlite: a SQLite file built from the same migrations (config/sqlite_db.py)
+  - benchmarks.stub_distance_matrix: a Distance Matrix lookalike with configurable latency
+  - SMS_PROVIDER=fake: an in-process SMS sink (utils/sms_utils.FakeSmsProvider)
+
+Virtual users replay the mobile app's traffic: sign up, log in, then open the
+map (nearest station + top crimes), file reports (report + division SMS) and
+browse their history, with exponential think time in between. Latency
+percentiles, throughput and errors are reported per endpoint.
+
+Run from the backend directory:
+    python -m benchmarks.loadtest --users 50 --duration 60            # starts the app and stubs locally
+    python -m benchmarks.loadtest --target http://127.0.0.1:8000      # drives an already running server
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional
+import httpx
+from config.sqlite_db import create_sqlite_connection
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Share of each user's actions after signup/login; the map screen is what the app opens on
+ACTIONS = {"open_map": 0.5, "report": 0.2, "history": 0.3}
+CRIME_TYPES = ("Outrage Of Modesty", "Robbery", "Housebreaking", "Theft Of Motor Vehicle", "Snatch Theft")
+LAT_RANGE, LON_RANGE = (1.28, 1.44), (103.7, 103.98)
+
+# -----------------------------
+# Results
+# -----------------------------
+class EndpointStats:
+    def __init__(self):
+        self.latencies: List[float] = []
+        self.statuses: Dict[str, int] = {}
+        self.errors = 0
+
+    def record(self, seconds: float, status: Optional[int]) -> None:
+        self.latencies.append(seconds)
+        key = str(status) if status is not None else "transport_error"
+        self.statuses[key] = self.statuses.get(key, 0) + 1
+        if status is None or status >= 400:
+            self.errors += 1
+
+
+def percentile(ordered: List[float], p: float) -> float:
+    """Nearest-rank percentile of an ascending list"""
+    if not ordered:
+        return 0.0
+    rank = max(1, min(len(ordered), round(p / 100 * len(ordered) + 0.5)))
+    return ordered[rank - 1]
+
+def summarize(stats: Dict[str, EndpointStats], elapsed_s: float) -> Dict[str, dict]:
+    summary = {}
+    for label, endpoint in sorted(stats.items()):
+        ordered = sorted(endpoint.latencies)
+        summary[label] = {
+            "requests": len(ordered),
+            "errors": endpoint.errors,
+            "statuses": endpoint.statuses,
+            "rps": len(ordered) / elapsed_s if elapsed_s else 0.0,
+            "p50_ms": percentile(ordered, 50) * 1000,
+            "p95_ms": percentile(ordered, 95) * 1000,
+            "p99_ms": percentile(ordered, 99) * 1000,
+            "max_ms": (ordered[-1] if ordered else 0.0) * 1000
+        }
+    return summary
+
+# -----------------------------
+# Virtual users
+# -----------------------------
+class Session:
+    """One simulated app user; every call is timed under its route label"""
+
+    def __init__(self, client: httpx.AsyncClient, stats: Dict[str, EndpointStats], user_no: int,
+                 run_id: str, rng: random.Random):
+        self.client = client
+        self.stats = stats
+        self.rng = rng
+        self.email = f"load-{run_id}-{user_no}@example.com"
+        self.phone = f"{run_id}{user_no:06d}"
+        self.password = f"pw-{run_id}-{user_no}"
+        self.headers: Dict[str, str] = {}
+
+    async def call(self, label: str, method: str, url: str, **kwargs) -> Optional[httpx.Response]:
+        started = time.perf_counter()
+        try:
+            response = await self.client.request(method, url, headers=self.headers, **kwargs)
+        except httpx.HTTPError:
+            self.stats.setdefault(label, EndpointStats()).record(time.perf_counter() - started, None)
+            return None
+        self.stats.setdefault(label, EndpointStats()).record(time.perf_counter() - started, response.status_code)
+        return response
+
+    async def sign_in(self) -> bool:
+        await self.call("POST /api/users/signup", "POST", "/api/users/signup", json={
+            "name": f"Load {self.email}", "email": self.email, "phone": self.phone, "password": self.password
+        })
+        response = await self.call("POST /api/users/login", "POST", "/api/users/login",
+                                   json={"email": self.email, "password": self.password})
+        if response is None or response.status_code != 200:
+            return False
+        self.headers = {"Authorization": f"Bearer {response.json()['token']}"}
+        return True
+
+    def position(self):
+        return self.rng.uniform(*LAT_RANGE), self.rng.uniform(*LON_RANGE)
+
+    async def nearest(self, lat: float, lon: float) -> Optional[dict]:
+        response = await self.call("GET /api/location/nearest", "GET", "/api/location/nearest",
+                                   params={"lat": lat, "lon": lon})
+        if response is None or response.status_code != 200:
+            return None
+        return response.json()["nearest_station"]
+
+    async def open_map(self) -> None:
+        station = await self.nearest(*self.position())
+        if station and station.get("name"):
+            await self.call("POST /get_top_crimes", "POST", "/get_top_crimes",
+                            json={"station_name": station["name"], "divcode": station.get("divcode") or ""})
+
+    async def report(self) -> None:
+        lat, lon = self.position()
+        station = await self.nearest(lat, lon)
+        if station is None:
+            return
+        crime_type = self.rng.choice(CRIME_TYPES)
+        response = await self.call("POST /api/crime-report", "POST", "/api/crime-report", json={
+            "crime_type": crime_type, "location": f"{lat:.5f}, {lon:.5f}", "email": self.email,
+            "latitude": lat, "longitude": lon, "police_station": station.get("name") or ""
+        })
+        # The app alerts the division unless the report joined an existing incident
+        if response is not None and response.status_code < 300 and not response.json().get("duplicate"):
+            await self.call("POST /api/send-sms", "POST", "/api/send-sms", json={
+                "divcode": station.get("divcode") or "", "message": f"{crime_type} reported at {lat:.5f}, {lon:.5f}"
+            })
+
+    async def history(self) -> None:
+        await self.call("GET /api/history", "GET", "/api/history", params={"limit": 20})
+
+async def virtual_user(session: Session, start_delay_s: float, deadline: float, think_s: float) -> None:
+    await asyncio.sleep(start_delay_s)
+    if not await session.sign_in():
+        return
+    actions, weights = zip(*ACTIONS.items())
+    while time.monotonic() < deadline:
+        action = session.rng.choices(actions, weights)[0]
+        await getattr(session, action)()
+        if think_s:
+            await asyncio.sleep(min(session.rng.expovariate(1 / think_s), max(0.0, deadline - time.monotonic())))
+
+async def drive(target: str, users: int, duration_s: float, ramp_s: float, think_s: float, seed: int):
+    stats: Dict[str, EndpointStats] = {}
+    # Fresh accounts every run, so repeated runs against one database never collide on signup
+    run_id = f"{random.SystemRandom().randrange(10 ** 4):04d}"
+    limits = httpx.Limits(max_connections=users, max_keepalive_connections=users)
+    async with httpx.AsyncClient(base_url=target, limits=limits, timeout=30) as client:
+        started = time.monotonic()
+        deadline = started + ramp_s + duration_s
+        sessions = [Session(client, stats, n, run_id, random.Random(seed * 100_003 + n)) for n in range(users)]
+        await asyncio.gather(*(virtual_user(session, ramp_s * n / users, deadline, think_s)
+                               for n, session in enumerate(sessions)))
+        elapsed = time.monotonic() - started
+
+        health = {}
+        for name in ("db", "sms", "auth", "hasher"):
+            try:
+                health[name] = (await client.get(f"/api/health/{name}")).json()
+            except Exception:
+                pass
+    return summarize(stats, elapsed), elapsed, health
+
+# -----------------------------
+# Local stack
+# -----------------------------
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def wait_ready(url: str, process: subprocess.Popen, timeout_s: float = 60) -> None:
+    deadline = time.monotonic() + timeout_s
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"{' '.join(process.args)} exited with {process.returncode}")
+        try:
+            httpx.get(url, timeout=1)
+            return
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    raise RuntimeError(f"{url} not ready after {timeout_s:.0f}s")
+
+def start_local_stack(args, workdir: str):
+    """Start the distance-matrix stub and the app on free ports; returns (base URL, processes, app log path)"""
+    stub_port, app_port = free_port(), free_port()
+    stub = subprocess.Popen([sys.executable, "-m", "benchmarks.stub_distance_matrix", "--port", str(stub_port),
+                             "--latency-ms", str(args.maps_latency_ms), "--jitter-ms", str(args.maps_jitter_ms),
+                             "--error-rate", str(args.maps_error_rate)], cwd=BACKEND_DIR)
+    wait_ready(f"http://127.0.0.1:{stub_port}/stats", stub)
+
+    # Built here once: several workers migrating the same empty file at startup would race
+    database = os.path.join(workdir, "loadtest.sqlite3")
+    create_sqlite_connection(database).close()
+
+    env = dict(os.environ,
+               DB_BACKEND="sqlite",
+               SQLITE_DB_PATH=database,
+               INGEST_QUEUE_PATH=os.path.join(workdir, "ingest_queue.sqlite3"),
+               TRAVEL_TIME_BACKEND="google",
+               DISTANCE_MATRIX_URL=f"http://127.0.0.1:{stub_port}/maps/api/distancematrix/json",
+               GOOGLE_MAPS_API_KEY="loadtest",
+               SMS_PROVIDER="fake",
+               FAKE_SMS_LATENCY_MS=str(args.sms_latency_ms),
+               BCRYPT_ROUNDS=str(args.bcrypt_rounds))
+    log_path = os.path.join(workdir, "app.log")
+    with open(log_path, "w") as log:
+        app = subprocess.Popen([sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1",
+                                "--port", str(app_port), "--workers", str(args.workers), "--log-level", "warning"],
+                               cwd=BACKEND_DIR, env=env, stdout=log, stderr=subprocess.STDOUT)
+    target = f"http://127.0.0.1:{app_port}"
+    try:
+        wait_ready(f"{target}/api/health/db", app)
+    except RuntimeError:
+        stub.terminate()
+        app.terminate()
+        with open(log_path) as log:
+            print(log.read()[-4000:])
+        raise
+    return target, [app, stub], log_path
+
+def stop(processes: List[subprocess.Popen]) -> None:
+    for process in processes:
+        process.terminate()
+    for process in processes:
+        try:
+            process.wait(timeout=15)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+# -----------------------------
+# Entry point
+# -----------------------------
+def print_report(summary: Dict[str, dict], elapsed_s: float, users: int, health: dict) -> None:
+    print(f"\n{users} users for {elapsed_s:.1f}s")
+    print(f"{'endpoint':<28} {'requests':>9} {'errors':>7} {'req/s':>8} {'p50 ms':>9} {'p95 ms':>9} "
+          f"{'p99 ms':>9} {'max ms':>9}")
+    total = errors = 0
+    for label, row in summary.items():
+        total += row["requests"]
+        errors += row["errors"]
+        print(f"{label:<28} {row['requests']:>9} {row['errors']:>7} {row['rps']:>8.1f} {row['p50_ms']:>9.1f} "
+              f"{row['p95_ms']:>9.1f} {row['p99_ms']:>9.1f} {row['max_ms']:>9.1f}")
+    print(f"{'total':<28} {total:>9} {errors:>7} {total / elapsed_s if elapsed_s else 0:>8.1f}")
+
+    pool, sms = health.get("db", {}), health.get("sms", {})
+    if pool:
+        print(f"db pool: peak {pool.get('peak_checked_out')}/{pool.get('size', 0) + pool.get('max_overflow', 0)} "
+              f"checked out, {pool.get('waits')} waits, {pool.get('timeouts')} timeouts")
+    if sms:
+        print(f"sms ({sms.get('provider')}): {sms.get('alerts_delivered')} alerts in {sms.get('messages_sent')} "
+              f"messages, {sms.get('failed')} failed, pending {sms.get('pending')}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--target", help="base URL of a running server; omit to start the app and stubs locally")
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=60, help="seconds of steady load after the ramp")
+    parser.add_argument("--ramp", type=float, default=5, help="seconds over which users start")
+    parser.add_argument("--think-ms", type=float, default=500, help="mean pause between a user's actions")
+    parser.add_argument("--seed", type=int, default=1, help="seed for user behaviour (positions, actions)")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers for the local app")
+    parser.add_argument("--bcrypt-rounds", type=int, default=int(os.getenv("BCRYPT_ROUNDS", "12")))
+    parser.add_argument("--maps-latency-ms", type=float, default=120)
+    parser.add_argument("--maps-jitter-ms", type=float, default=40)
+    parser.add_argument("--maps-error-rate", type=float, default=0.0)
+    parser.add_argument("--sms-latency-ms", type=float, default=300)
+    parser.add_argument("--output", help="write the per-endpoint summary as JSON")
+    args = parser.parse_args()
+
+    processes: List[subprocess.Popen] = []
+    with tempfile.TemporaryDirectory() as workdir:
+        target = args.target
+        if target is None:
+            target, processes, log_path = start_local_stack(args, workdir)
+            print(f"app at {target} (sqlite + stub maps + fake sms), log {log_path}")
+        try:
+            summary, elapsed, health = asyncio.run(
+                drive(target, args.users, args.duration, args.ramp, args.think_ms / 1000, args.seed))
+        finally:
+            stop(processes)
+
+    print_report(summary, elapsed, args.users, health)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"target": args.target or "local", "users": args.users, "elapsed_s": elapsed,
+                       "endpoints": summary, "health": health}, f, indent=2)
+    return 1 if any(row["errors"] for row in summary.values()) else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,300 @@
+"""
+Microbenchmark suite for the backend hot paths: nearest-station lookup, top
+crimes, the ranking CSV and station GeoJSON parsers, haversine, JWT decoding
+and password hashing. Cases run against the bundled SPF GeoJSON and NPC CSV
+and against synthetic copies scaled to N times the stations and years. The
+k-NN index is checked against a brute-force haversine sort at every scale.
+
+Results are written as JSON so runs can be compared between commits:
+    python -m benchmarks.run                                   # scales 1 10 100
+    python -m benchmarks.run --scales 1 10 --output before.json
+    python -m benchmarks.run --compare before.json --fail-over 1.25
+
+Run from the backend directory.
+"""
+import argparse
+import contextlib
+import csv
+import gc
+import itertools
+import json
+import os
+import platform
+import random
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import bcrypt
+import jwt
+import numpy as np
+from controllers import location_controller
+from controllers.ranking_controller import RANKING_FILE, get_top_crimes, reload_ranking_index, _lookup_top_crimes
+from utils.auth import decode_bearer, jwt_secret
+from utils.haversine import haversine, haversine_np
+from utils.ranking_utils import extract_info_from_geojson, parse_ranking_file
+from utils.station_registry import STATION_FILE, get_station_registry, reload_station_registry
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(BACKEND_DIR, "benchmarks", "results")
+
+# Query points are drawn from a box around Singapore
+LAT_RANGE, LON_RANGE = (1.22, 1.47), (103.6, 104.05)
+
+# -----------------------------
+# Synthetic datasets
+# -----------------------------
+_BLDG = re.compile(r"(<th>BLDG</th>\s*<td>)([^<]*)(</td>)")
+
+def scale_geojson(source: str, target: str, factor: int, seed: int = 0) -> None:
+    """Write `factor` copies of every station, renamed and jittered by up to ~2 km"""
+    rng = random.Random(seed)
+    with open(source, encoding="utf-8") as f:
+        data = json.load(f)
+    features = []
+    for copy in range(factor):
+        for feature in data["features"]:
+            feature = json.loads(json.dumps(feature))
+            if copy:
+                lon, lat = feature["geometry"]["coordinates"][:2]
+                feature["geometry"]["coordinates"][:2] = [lon + rng.uniform(-0.02, 0.02),
+                                                          lat + rng.uniform(-0.02, 0.02)]
+                description = feature["properties"].get("Description", "")
+                feature["properties"]["Description"] = _BLDG.sub(
+                    lambda m: f"{m.group(1)}{m.group(2)} {copy}{m.group(3)}", description)
+            features.append(feature)
+    data["features"] = features
+    with open(target, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+
+def scale_ranking_csv(source: str, target: str, factor: int, seed: int = 0) -> None:
+    """Write `factor` renamed copies of every station block, each with `factor` times the year columns"""
+    rng = random.Random(seed)
+    with open(source, newline="", encoding="utf-8") as f:
+        rows = list(csv.reader(f))
+    header, body = rows[0], rows[1:]
+    years = header[1:]
+    oldest = min(int(year) for year in years)
+    extra_years = [str(oldest - i) for i in range(1, len(years) * (factor - 1) + 1)]
+
+    with open(target, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(header + extra_years)
+        for copy in range(factor):
+            for name, *values in body:
+                if "Police Division" in name:
+                    name = name if copy == 0 else f"{name.split(' - ')[0]} {copy} - {name.split(' - ', 1)[-1]}"
+                    writer.writerow([name] + values + ["na"] * len(extra_years))
+                else:
+                    writer.writerow([name] + values + [rng.choice(values) for _ in extra_years])
+
+# -----------------------------
+# Timing
+# -----------------------------
+def measure(fn, min_time: float, repeat: int) -> dict:
+    """Per-call timings like timeit: calibrate a loop count, then take `repeat` timed loops with gc off"""
+    number = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(number):
+            fn()
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_time / repeat or number >= 1_000_000:
+            break
+        number *= 10 if elapsed < min_time / (repeat * 100) else 2
+
+    per_call = []
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            started = time.perf_counter()
+            for _ in range(number):
+                fn()
+            per_call.append((time.perf_counter() - started) / number)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return {
+        "number": number,
+        "repeat": repeat,
+        "min_us": min(per_call) * 1e6,
+        "median_us": statistics.median(per_call) * 1e6,
+        "max_us": max(per_call) * 1e6
+    }
+
+def cycling(fn, arguments):
+    """Zero-argument callable that applies `fn` to the next argument tuple on every call"""
+    items = itertools.cycle(arguments)
+    return lambda: fn(*next(items))
+
+@contextlib.contextmanager
+def station_file(path: str):
+    """Point the location controller at another GeoJSON for the duration of the block"""
+    previous = location_controller.LOCATION_FILE
+    location_controller.LOCATION_FILE = path
+    try:
+        yield
+    finally:
+        location_controller.LOCATION_FILE = previous
+
+# -----------------------------
+# Cases
+# -----------------------------
+def check_nearest_equivalence(geojson: str, points, k: int = 5) -> int:
+    """Assert the KD-tree returns exactly the brute-force haversine ranking; returns queries checked"""
+    registry = get_station_registry(geojson)
+    for lat, lon in points:
+        indexed = [i for i, _ in registry.index.query(lat, lon, k)]
+        distances = haversine_np(lat, lon, registry.latitudes, registry.longitudes)
+        brute = np.argsort(distances, kind="stable")[:k].tolist()
+        assert indexed == brute, f"k-NN index disagrees with brute force at ({lat}, {lon}) in {geojson}"
+    return len(points)
+
+def scaled_cases(geojson: str, ranking_csv: str, points, min_time: float, repeat: int, slow_repeat: int):
+    """(name, timings) for every case that depends on the dataset size"""
+    registry = reload_station_registry(geojson)
+    reload_ranking_index(ranking_csv)
+    queries = [(name, divcode or "") for name, divcode in zip(registry.names, registry.divcodes) if name]
+    queries = random.Random(1).sample(queries, min(len(queries), 500))
+    origin = points[0]
+
+    with station_file(geojson):
+        yield "get_nearest_5", measure(cycling(location_controller.get_nearest_5, points), min_time, repeat)
+    yield "get_top_crimes (uncached)", measure(cycling(_lookup_top_crimes.__wrapped__, queries), min_time, repeat)
+    yield "get_top_crimes (lru hit)", measure(cycling(get_top_crimes, queries), min_time, repeat)
+    yield "haversine_np (origin x stations)", measure(
+        lambda: haversine_np(origin[0], origin[1], registry.latitudes, registry.longitudes), min_time, repeat)
+    yield "parse_ranking_file", measure(lambda: parse_ranking_file(ranking_csv), 0, slow_repeat)
+
+    def parse_geojson():
+        reload_station_registry(geojson)
+        return extract_info_from_geojson(geojson)
+    yield "extract_info_from_geojson (parse)", measure(parse_geojson, 0, slow_repeat)
+    yield "extract_info_from_geojson (registry hit)", measure(
+        lambda: extract_info_from_geojson(geojson), min_time, repeat)
+
+def fixed_cases(points, min_time: float, repeat: int, rounds: int):
+    """(name, timings) for cases independent of the dataset size"""
+    pairs = [(a[0], a[1], b[0], b[1]) for a, b in zip(points, points[1:])]
+    yield "haversine", measure(cycling(haversine, pairs), min_time, repeat)
+
+    token = jwt.encode({"userId": 1, "exp": int(time.time()) + 3600}, jwt_secret(), algorithm="HS256")
+    yield "jwt.decode (HS256)", measure(lambda: jwt.decode(token, jwt_secret(), algorithms=["HS256"]),
+                                        min_time, repeat)
+    yield "decode_bearer (token cache hit)", measure(lambda: decode_bearer(f"Bearer {token}"), min_time, repeat)
+
+    hashed = bcrypt.hashpw(b"correct horse battery staple", bcrypt.gensalt(rounds))
+    yield f"bcrypt.hashpw (rounds={rounds})", measure(
+        lambda: bcrypt.hashpw(b"correct horse battery staple", bcrypt.gensalt(rounds)), 0, 3)
+    yield f"bcrypt.checkpw (rounds={rounds})", measure(
+        lambda: bcrypt.checkpw(b"correct horse battery staple", hashed), 0, 3)
+
+# -----------------------------
+# Reporting
+# -----------------------------
+def environment() -> dict:
+    def git(*args):
+        try:
+            return subprocess.run(["git", *args], cwd=BACKEND_DIR, capture_output=True, text=True,
+                                  check=True).stdout.strip()
+        except Exception:
+            return None
+    return {
+        "commit": git("rev-parse", "--short", "HEAD"),
+        "dirty": bool(git("status", "--porcelain", "--", ".")),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count()
+    }
+
+def compare(previous: dict, current: dict, fail_over: float) -> bool:
+    """Print per-case ratios against an earlier run; False if any case slowed down beyond `fail_over`"""
+    before = {(r["name"], r["scale"]): r for r in previous["results"]}
+    ok = True
+    print(f"\ncompared with {previous['environment'].get('commit')} ({previous['environment'].get('timestamp')})")
+    for result in current["results"]:
+        old = before.get((result["name"], result["scale"]))
+        if old is None:
+            continue
+        ratio = result["min_us"] / old["min_us"] if old["min_us"] else float("inf")
+        flag = ""
+        if ratio > fail_over:
+            flag, ok = "  REGRESSION", False
+        label = f"x{result['scale']}" if result["scale"] else "-"
+        print(f"  {result['name']:<42} {label:<5} {old['min_us']:>12.1f} -> "
+              f"{result['min_us']:>12.1f} us  {ratio:>6.2f}x{flag}")
+    return ok
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--min-time", type=float, default=0.5, help="seconds spent timing each fast case")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--slow-repeat", type=int, default=3, help="repeats for whole-file parses")
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--bcrypt-rounds", type=int, default=int(os.getenv("BCRYPT_ROUNDS", "12")))
+    parser.add_argument("--output", help="JSON results path (default benchmarks/results/<commit>.json)")
+    parser.add_argument("--compare", help="earlier results JSON to compare against")
+    parser.add_argument("--fail-over", type=float, default=1.25,
+                        help="with --compare, exit non-zero when a case is this many times slower")
+    args = parser.parse_args()
+
+    for path in (STATION_FILE, RANKING_FILE):
+        if not os.path.exists(path):
+            sys.exit(f"Bundled dataset not found: {os.path.abspath(path)}")
+
+    rng = random.Random(0)
+    points = [(rng.uniform(*LAT_RANGE), rng.uniform(*LON_RANGE)) for _ in range(args.queries)]
+    report = {"environment": environment(), "results": []}
+
+    def record(name, scale, timings, **extra):
+        report["results"].append({"name": name, "scale": scale, **timings, **extra})
+        label = f"x{scale}" if scale else "-"
+        print(f"  {name:<42} {label:<5} {timings['min_us']:>12.1f} us  (median {timings['median_us']:.1f}, "
+              f"{timings['number']} loops x {timings['repeat']})")
+
+    print("fixed-size cases")
+    for name, timings in fixed_cases(points, args.min_time, args.repeat, args.bcrypt_rounds):
+        record(name, None, timings)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for scale in args.scales:
+            geojson, ranking_csv = STATION_FILE, RANKING_FILE
+            if scale != 1:
+                geojson = os.path.join(tmp, f"stations_x{scale}.geojson")
+                ranking_csv = os.path.join(tmp, f"ranking_x{scale}.csv")
+                scale_geojson(STATION_FILE, geojson, scale)
+                scale_ranking_csv(RANKING_FILE, ranking_csv, scale)
+
+            registry = reload_station_registry(geojson)
+            checked = check_nearest_equivalence(geojson, points[:200])
+            print(f"scale x{scale}: {len(registry)} stations, k-NN matches brute force on {checked} queries")
+            for name, timings in scaled_cases(geojson, ranking_csv, points, args.min_time, args.repeat,
+                                              args.slow_repeat):
+                record(name, scale, timings, stations=len(registry))
+
+    # Leave the process-wide datasets as the app would load them
+    reload_station_registry(STATION_FILE)
+    reload_ranking_index(RANKING_FILE)
+
+    output = args.output or os.path.join(RESULTS_DIR, f"{report['environment']['commit'] or 'unknown'}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"results written to {output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            previous = json.load(f)
+        if not compare(previous, report, args.fail_over):
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,62 @@
+"""
+Local stand-in for the Google Distance Matrix API. It answers with the same JSON
+shape the real service returns, using the haversine estimate for distances and
+durations, after a configurable latency. Point the app at it with
+TRAVEL_TIME_BACKEND=google and DISTANCE_MATRIX_URL=http://127.0.0.1:<port>/maps/api/distancematrix/json,
+so load tests exercise the pooled HTTP client, timeouts and cache as in production.
+
+Run from the backend directory:
+    python -m benchmarks.stub_distance_matrix --port 8099 --latency-ms 120 --jitter-ms 40 --error-rate 0.01
+"""
+import argparse
+import asyncio
+import random
+from fastapi import FastAPI
+from utils.travel_time import HaversineEstimator
+
+def create_app(latency_s: float = 0.0, jitter_s: float = 0.0, error_rate: float = 0.0) -> FastAPI:
+    app = FastAPI()
+    estimator = HaversineEstimator()
+    app.state.requests = 0
+
+    @app.get("/maps/api/distancematrix/json")
+    async def distance_matrix(origins: str, destinations: str, key: str = "", mode: str = "driving",
+                              units: str = "metric"):
+        app.state.requests += 1
+        await asyncio.sleep(max(0.0, latency_s + random.uniform(-jitter_s, jitter_s)))
+        if random.random() < error_rate:
+            return {"status": "OVER_QUERY_LIMIT", "rows": []}
+
+        origin = tuple(map(float, origins.split(",")))
+        elements = []
+        for destination in destinations.split("|"):
+            estimate = estimator.estimate(origin, tuple(map(float, destination.split(","))))
+            elements.append({
+                "status": "OK",
+                "distance": {"value": round(estimate["travel_distance_km"] * 1000)},
+                "duration": {"value": round(estimate["travel_time_min"] * 60)}
+            })
+        return {"status": "OK", "rows": [{"elements": elements}]}
+
+    @app.get("/stats")
+    async def stats():
+        return {"requests": app.state.requests}
+
+    return app
+
+def main():
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--latency-ms", type=float, default=100)
+    parser.add_argument("--jitter-ms", type=float, default=0)
+    parser.add_argument("--error-rate", type=float, default=0)
+    args = parser.parse_args()
+
+    app = create_app(args.latency_ms / 1000, args.jitter_ms / 1000, args.error_rate)
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+if __name__ == "__main__":
+    main()
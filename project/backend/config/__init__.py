@@ -1 +1,6 @@
-from .db import get_db_connection
+from .env import load_env
+
+# Before .db is imported, so settings read at import time see .env values
+load_env()
+
+from .db import get_db_connection, get_db, get_pool
@@ -1,26 +1,386 @@
 import mysql.connector
 from mysql.connector import Error
+import asyncio
+import contextlib
+import functools
 import os
-from dotenv import load_dotenv
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from config.env import load_env
+from fastapi import HTTPException
+from utils.metrics import REGISTRY, DB_ACQUIRE_SECONDS, DB_QUERY_SECONDS
 
 # Load environment variables from .env file
-load_dotenv()
+load_env()
 
 # MySQL connection setup
+def create_connection():
+    # DB_BACKEND=sqlite swaps MySQL for a local file with the same schema (load tests, offline runs)
+    if os.getenv("DB_BACKEND", "mysql").lower() == "sqlite":
+        from config.sqlite_db import create_sqlite_connection, DEFAULT_SQLITE_PATH
+        return create_sqlite_connection(os.getenv("SQLITE_DB_PATH", DEFAULT_SQLITE_PATH))
+
+    connection = mysql.connector.connect(
+        host=os.getenv("DB_HOST"),  # Default to localhost
+        user=os.getenv("DB_USER"),
+        password=os.getenv("DB_PASSWORD"),
+        database=os.getenv("DB_NAME"),
+        port=int(os.getenv("PORT")),
+        unix_socket=None,
+        # submitted_at is written from the app's UTC clock (repositories/crime_reports.submitted_now)
+        time_zone="+00:00"
+    )
+    if not connection.is_connected():
+        raise Error("Connection was not established")
+    return connection
+
+
+class PoolTimeout(Error):
+    """Raised when no pooled connection frees up within the checkout timeout"""
+
+
+class PooledConnection:
+    """Proxy for a pooled connection; close() hands it back to the pool instead of disconnecting"""
+
+    def __init__(self, pool: "ConnectionPool", raw, created_at: float):
+        self._pool = pool
+        self._raw = raw
+        self._created_at = created_at
+        self._released = False
+
+    def __getattr__(self, name):
+        return getattr(self._raw, name)
+
+    def close(self):
+        if not self._released:
+            self._released = True
+            self._pool.release(self._raw, self._created_at)
+
+
+class ConnectionPool:
+    """
+    Bounded connection pool. `size` connections are kept idle for reuse and up
+    to `max_overflow` extra ones are opened under load and closed on release.
+    Connections older than `recycle` seconds are replaced, and with `pre_ping`
+    every checkout verifies the connection is still alive.
+    """
+
+    def __init__(self, connect, size: int = 5, max_overflow: int = 10, recycle: float = 1800,
+                 timeout: float = 10, pre_ping: bool = True):
+        self._connect = connect
+        self.size = size
+        self.max_overflow = max_overflow
+        self.recycle = recycle
+        self.timeout = timeout
+        self.pre_ping = pre_ping
+        self._idle: "queue.LifoQueue" = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._open = 0
+        self._checked_out = 0
+        self._peak_checked_out = 0
+        self._created = 0
+        self._recycled = 0
+        self._ping_failures = 0
+        self._waits = 0
+        self._timeouts = 0
+        self._wait_seconds = 0.0
+
+    @property
+    def capacity(self) -> int:
+        return self.size + self.max_overflow
+
+    def _new_connection(self):
+        try:
+            raw = self._connect()
+        except Exception:
+            with self._lock:
+                self._open -= 1
+            raise
+        with self._lock:
+            self._created += 1
+        return raw, time.monotonic()
+
+    def _discard(self, raw):
+        try:
+            raw.close()
+        except Exception:
+            pass
+
+    def _is_usable(self, raw, created_at: float) -> bool:
+        if self.recycle and time.monotonic() - created_at > self.recycle:
+            with self._lock:
+                self._recycled += 1
+            return False
+        if self.pre_ping:
+            try:
+                raw.ping(reconnect=False)
+            except Exception:
+                with self._lock:
+                    self._ping_failures += 1
+                return False
+        return True
+
+    def _checkout(self):
+        started = time.monotonic()
+        waited = False
+        try:
+            while True:
+                try:
+                    return self._idle.get_nowait()
+                except queue.Empty:
+                    pass
+                with self._lock:
+                    can_open = self._open < self.capacity
+                    if can_open:
+                        self._open += 1
+                if can_open:
+                    return self._new_connection()
+
+                if not waited:
+                    waited = True
+                    with self._lock:
+                        self._waits += 1
+                remaining = started + self.timeout - time.monotonic()
+                if remaining <= 0:
+                    with self._lock:
+                        self._timeouts += 1
+                    raise PoolTimeout(f"No database connection available within {self.timeout}s")
+                # Wake periodically: a discarded connection frees a slot without refilling the queue
+                try:
+                    return self._idle.get(timeout=min(remaining, 0.1))
+                except queue.Empty:
+                    continue
+        finally:
+            if waited:
+                with self._lock:
+                    self._wait_seconds += time.monotonic() - started
+
+    def acquire(self) -> PooledConnection:
+        raw, created_at = self._checkout()
+
+        if not self._is_usable(raw, created_at):
+            # Replace in place: the slot stays counted as open
+            self._discard(raw)
+            raw, created_at = self._new_connection()
+
+        with self._lock:
+            self._checked_out += 1
+            self._peak_checked_out = max(self._peak_checked_out, self._checked_out)
+        return PooledConnection(self, raw, created_at)
+
+    def release(self, raw, created_at: float) -> None:
+        with self._lock:
+            self._checked_out -= 1
+        try:
+            # End any open transaction so the next borrower starts from a clean snapshot
+            raw.rollback()
+        except Exception:
+            self._discard(raw)
+            with self._lock:
+                self._open -= 1
+            return
+
+        with self._lock:
+            keep = self._idle.qsize() < self.size
+            if not keep:
+                self._open -= 1
+        if keep:
+            self._idle.put((raw, created_at))
+        else:
+            self._discard(raw)
+
+    def record_wait(self, seconds: float, timed_out: bool = False) -> None:
+        """Account for time a caller queued for a connection outside `acquire`"""
+        with self._lock:
+            self._waits += 1
+            self._wait_seconds += seconds
+            if timed_out:
+                self._timeouts += 1
+
+    def dispose(self) -> None:
+        """Close every idle connection; checked-out ones close when released"""
+        while True:
+            try:
+                raw, _ = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(raw)
+            with self._lock:
+                self._open -= 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "size": self.size,
+                "max_overflow": self.max_overflow,
+                "open": self._open,
+                "idle": self._idle.qsize(),
+                "checked_out": self._checked_out,
+                "overflow": max(0, self._open - self.size),
+                "peak_checked_out": self._peak_checked_out,
+                "saturation": self._checked_out / self.capacity if self.capacity else 0.0,
+                "created": self._created,
+                "recycled": self._recycled,
+                "ping_failures": self._ping_failures,
+                "waits": self._waits,
+                "timeouts": self._timeouts,
+                "wait_seconds_total": round(self._wait_seconds, 6)
+            }
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def get_pool() -> ConnectionPool:
+    """Process-wide pool, configured from DB_POOL_* environment variables on first use"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(
+                    create_connection,
+                    size=int(os.getenv("DB_POOL_SIZE", "5")),
+                    max_overflow=int(os.getenv("DB_POOL_MAX_OVERFLOW", "10")),
+                    recycle=float(os.getenv("DB_POOL_RECYCLE", "1800")),
+                    timeout=float(os.getenv("DB_POOL_TIMEOUT", "10")),
+                    pre_ping=os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+                )
+    return _pool
+
+def _pool_metrics():
+    if _pool is None:
+        return []
+    stats = _pool.stats()
+    return [
+        ("db_pool_connections", "gauge", "Pooled connections by state",
+         [("db_pool_connections", {"state": state}, stats[state]) for state in ("open", "idle", "checked_out")]),
+        ("db_pool_waits_total", "counter", "Checkouts that had to wait for a free connection",
+         [("db_pool_waits_total", {}, stats["waits"])]),
+        ("db_pool_timeouts_total", "counter", "Checkouts that gave up waiting",
+         [("db_pool_timeouts_total", {}, stats["timeouts"])])
+    ]
+
+REGISTRY.register_collector(_pool_metrics)
+
 def get_db_connection():
+    """Borrow a pooled connection; close() returns it to the pool. None if unavailable."""
     try:
-        connection = mysql.connector.connect(
-            host=os.getenv("DB_HOST"),  # Default to localhost
-            user=os.getenv("DB_USER"),
-            password=os.getenv("DB_PASSWORD"),
-            database=os.getenv("DB_NAME"),
-            port=int(os.getenv("PORT")),
-            unix_socket=None
-        )
-        
-        if connection.is_connected():
-            print("✅ Connected to MySQL")
-            return connection
-    except Error as e:
+        return get_pool().acquire()
+    except Exception as e:
         print(f"❌ MySQL connection failed: {e}")
         return None
+
+# -----------------------------
+# Async access
+# -----------------------------
+_executor = None
+
+def get_db_executor() -> ThreadPoolExecutor:
+    """
+    Bounded thread pool that runs blocking driver calls off the event loop. It is
+    sized to the connection pool's capacity so every checked-out connection can
+    always get a thread.
+    """
+    global _executor
+    if _executor is None:
+        with _pool_lock:
+            if _executor is None:
+                workers = int(os.getenv("DB_EXECUTOR_WORKERS", "0")) or get_pool().capacity
+                _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="db")
+    return _executor
+
+async def run_db(fn, *args, **kwargs):
+    """Run a blocking database call on the DB executor and await its result"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_db_executor(), functools.partial(fn, *args, **kwargs))
+
+def db_call(fn):
+    """
+    Turn a blocking `fn(connection, ...)` into an awaitable that runs on the DB
+    executor. The blocking version stays reachable as `.sync`.
+    """
+    query_seconds = DB_QUERY_SECONDS.labels(f"{fn.__module__.rsplit('.', 1)[-1]}.{fn.__name__}")
+
+    def timed(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            query_seconds.observe(time.perf_counter() - started)
+
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        return await run_db(timed, *args, **kwargs)
+    wrapper.sync = fn
+    return wrapper
+
+_slots = None
+
+def _connection_slots() -> asyncio.Semaphore:
+    # Async waiters queue here, so threads are only spent on checkouts that can succeed
+    global _slots
+    if _slots is None:
+        _slots = asyncio.Semaphore(get_pool().capacity)
+    return _slots
+
+async def acquire_connection() -> PooledConnection:
+    """Check a connection out without blocking the event loop or a thread while the pool is full"""
+    pool = get_pool()
+    slots = _connection_slots()
+    started = time.monotonic()
+    if slots.locked():
+        try:
+            await asyncio.wait_for(slots.acquire(), timeout=pool.timeout)
+        except asyncio.TimeoutError:
+            pool.record_wait(time.monotonic() - started, timed_out=True)
+            raise PoolTimeout(f"No database connection available within {pool.timeout}s")
+        pool.record_wait(time.monotonic() - started)
+    else:
+        await slots.acquire()
+    try:
+        connection = await run_db(pool.acquire)
+    except BaseException:
+        slots.release()
+        raise
+    DB_ACQUIRE_SECONDS.observe(value=time.monotonic() - started)
+    return connection
+
+async def release_connection(connection: PooledConnection) -> None:
+    try:
+        await run_db(connection.close)
+    finally:
+        _connection_slots().release()
+
+def shutdown_db() -> None:
+    global _executor, _slots
+    _slots = None
+    if _executor is not None:
+        _executor.shutdown(wait=True)
+        _executor = None
+    if _pool is not None:
+        _pool.dispose()
+
+@contextlib.asynccontextmanager
+async def db_session():
+    """
+    Borrow a pooled connection for the body of an `async with` block. Pool
+    exhaustion surfaces as a 503 and connection failures as a 500.
+    """
+    try:
+        connection = await acquire_connection()
+    except PoolTimeout:
+        raise HTTPException(status_code=503, detail="Database busy, please retry")
+    except Exception as e:
+        print(f"❌ MySQL connection failed: {e}")
+        raise HTTPException(status_code=500, detail="Database connection failed")
+    try:
+        yield connection
+    finally:
+        await release_connection(connection)
+
+async def get_db():
+    """FastAPI dependency yielding a pooled connection that is released after the request"""
+    async with db_session() as connection:
+        yield connection
@@ -0,0 +1,10 @@
+from dotenv import load_dotenv
+
+_loaded = False
+
+def load_env() -> None:
+    """Read .env into the process environment once; later calls are no-ops"""
+    global _loaded
+    if not _loaded:
+        load_dotenv()
+        _loaded = True
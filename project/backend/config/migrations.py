@@ -0,0 +1,218 @@
+"""
+Versioned schema migrations.
+
+Migrations are the numbered `NNNN_description.sql` files in backend/migrations,
+applied in order and recorded in `schema_migrations`. Run from the backend
+directory:
+    python -m config.migrations status
+    python -m config.migrations up
+    python -m config.migrations baseline 0002   # mark 0001..0002 applied without running them
+"""
+import os
+import re
+import sys
+from typing import Dict, List, Tuple
+from config.env import load_env
+from config.db import get_db_connection
+
+load_env()
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "migrations")
+_FILENAME = re.compile(r"^(\d{4})_([\w-]+)\.sql$")
+
+# (table, leading columns) every deployment needs for the queries in repositories/
+EXPECTED_INDEXES: List[Tuple[str, Tuple[str, ...]]] = [
+    ("users", ("email",)),
+    ("users", ("phone",)),
+    ("crime_reports", ("user_id", "submitted_at", "id")),
+    ("crime_reports", ("report_uid",)),
+    ("crime_reports", ("email",)),
+    ("crime_reports", ("incident_id",)),
+    ("crime_report_cells", ("day", "cell_lat", "cell_lon")),
+    ("crime_report_cells", ("cell_lat", "cell_lon")),
+    ("feedbacks", ("email", "created_at")),
+]
+
+def discover(directory: str = MIGRATIONS_DIR) -> List[Tuple[str, str]]:
+    """(version, path) for every migration file, in version order"""
+    found = []
+    for filename in os.listdir(directory):
+        match = _FILENAME.match(filename)
+        if match:
+            found.append((match.group(1), os.path.join(directory, filename)))
+    found.sort()
+    versions = [version for version, _ in found]
+    if len(versions) != len(set(versions)):
+        raise ValueError(f"Duplicate migration version in {directory}")
+    return found
+
+def split_statements(sql: str) -> List[str]:
+    """Split a migration file into statements on `;` line endings, dropping `--` comments"""
+    lines = [line for line in sql.splitlines() if not line.strip().startswith("--")]
+    statements, current = [], []
+    for line in lines:
+        current.append(line)
+        if line.rstrip().endswith(";"):
+            statement = "\n".join(current).strip().rstrip(";").strip()
+            if statement:
+                statements.append(statement)
+            current = []
+    tail = "\n".join(current).strip()
+    if tail:
+        statements.append(tail)
+    return statements
+
+def ensure_version_table(connection) -> None:
+    cursor = connection.cursor()
+    try:
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS schema_migrations (
+                version VARCHAR(16) PRIMARY KEY,
+                name VARCHAR(255) NOT NULL,
+                applied_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        connection.commit()
+    finally:
+        cursor.close()
+
+def applied_versions(connection) -> Dict[str, str]:
+    ensure_version_table(connection)
+    cursor = connection.cursor()
+    try:
+        cursor.execute("SELECT version, applied_at FROM schema_migrations")
+        return {str(version): str(applied_at) for version, applied_at in cursor.fetchall()}
+    finally:
+        cursor.close()
+
+def _record(connection, version: str, path: str) -> None:
+    cursor = connection.cursor()
+    try:
+        cursor.execute("INSERT INTO schema_migrations (version, name) VALUES (%s, %s)",
+                       (version, os.path.basename(path)))
+        connection.commit()
+    finally:
+        cursor.close()
+
+def pending(connection, directory: str = MIGRATIONS_DIR) -> List[Tuple[str, str]]:
+    done = applied_versions(connection)
+    return [(version, path) for version, path in discover(directory) if version not in done]
+
+def migrate(connection, directory: str = MIGRATIONS_DIR) -> List[str]:
+    """
+    Apply every pending migration in order and return the versions applied.
+    MySQL commits DDL implicitly, so a migration that fails halfway is not
+    recorded and must be fixed up by hand before re-running.
+    """
+    applied = []
+    for version, path in pending(connection, directory):
+        with open(path, encoding="utf-8") as f:
+            statements = split_statements(f.read())
+        cursor = connection.cursor()
+        try:
+            for statement in statements:
+                cursor.execute(statement)
+            connection.commit()
+        except Exception:
+            connection.rollback()
+            print(f"❌ Migration {os.path.basename(path)} failed")
+            raise
+        finally:
+            cursor.close()
+        _record(connection, version, path)
+        print(f"✅ Applied migration {os.path.basename(path)}")
+        applied.append(version)
+    return applied
+
+def baseline(connection, up_to: str, directory: str = MIGRATIONS_DIR) -> List[str]:
+    """Record migrations up to `up_to` as applied without running them, for hand-built schemas"""
+    marked = []
+    for version, path in pending(connection, directory):
+        if version > up_to:
+            break
+        _record(connection, version, path)
+        marked.append(version)
+    return marked
+
+# -----------------------------
+# Index check
+# -----------------------------
+def existing_indexes(connection) -> Dict[str, List[Tuple[str, ...]]]:
+    """Column tuples of every index in the current database, by table"""
+    cursor = connection.cursor()
+    try:
+        cursor.execute("""
+            SELECT table_name, index_name, column_name
+            FROM information_schema.statistics
+            WHERE table_schema = DATABASE()
+            ORDER BY table_name, index_name, seq_in_index
+        """)
+        rows = cursor.fetchall()
+    finally:
+        cursor.close()
+
+    columns: Dict[Tuple[str, str], List[str]] = {}
+    for table, index, column in rows:
+        columns.setdefault((table, index), []).append(column)
+    indexes: Dict[str, List[Tuple[str, ...]]] = {}
+    for (table, _), cols in columns.items():
+        indexes.setdefault(table, []).append(tuple(cols))
+    return indexes
+
+def missing_indexes(connection) -> List[Tuple[str, Tuple[str, ...]]]:
+    """Expected indexes with no existing index starting with the same columns"""
+    indexes = existing_indexes(connection)
+    return [
+        (table, cols) for table, cols in EXPECTED_INDEXES
+        if not any(existing[:len(cols)] == cols for existing in indexes.get(table, []))
+    ]
+
+def check_schema() -> None:
+    """
+    Startup check: apply migrations when AUTO_MIGRATE is set, then warn about
+    pending migrations and missing indexes. Never prevents the app from starting.
+    """
+    connection = get_db_connection()
+    if connection is None:
+        print("⚠️ Schema check skipped: database unavailable")
+        return
+    try:
+        if os.getenv("AUTO_MIGRATE", "false").lower() in ("1", "true", "yes"):
+            migrate(connection)
+        for version, path in pending(connection):
+            print(f"⚠️ Pending migration {os.path.basename(path)}; run `python -m config.migrations up`")
+        for table, cols in missing_indexes(connection):
+            print(f"⚠️ Missing index on {table} ({', '.join(cols)}); queries on it will scan the table")
+    except Exception as e:
+        print(f"⚠️ Schema check failed: {e}")
+    finally:
+        connection.close()
+
+def main(argv: List[str]) -> int:
+    command = argv[0] if argv else "status"
+    connection = get_db_connection()
+    if connection is None:
+        print("❌ Database unavailable")
+        return 1
+    try:
+        if command == "up":
+            applied = migrate(connection)
+            print(f"{len(applied)} migration(s) applied")
+        elif command == "baseline" and len(argv) == 2:
+            marked = baseline(connection, argv[1])
+            print(f"Marked as applied: {', '.join(marked) or 'nothing'}")
+        elif command == "status":
+            done = applied_versions(connection)
+            for version, path in discover():
+                print(f"{'applied ' + done[version] if version in done else 'pending':<28} {os.path.basename(path)}")
+            for table, cols in missing_indexes(connection):
+                print(f"missing index: {table} ({', '.join(cols)})")
+        else:
+            print(__doc__)
+            return 2
+    finally:
+        connection.close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
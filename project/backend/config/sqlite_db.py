@@ -0,0 +1,217 @@
+"""
+SQLite stand-in for MySQL, selected with DB_BACKEND=sqlite for load tests and
+local runs without a database server. The schema is built by applying the
+same migrations in backend/migrations; the MySQL dialect the repositories and
+migrations use is translated statement by statement. Not for production: all
+writers serialize on one file lock.
+"""
+import datetime
+import math
+import os
+import re
+import sqlite3
+import tempfile
+import threading
+import uuid
+from typing import Optional
+
+DEFAULT_SQLITE_PATH = os.path.join(tempfile.gettempdir(), "crimewatch.sqlite3")
+
+# -----------------------------
+# Dialect translation
+# -----------------------------
+_AUTO_INCREMENT = re.compile(r"\bINT\s+AUTO_INCREMENT\s+PRIMARY\s+KEY\b", re.IGNORECASE)
+_INSERT_IGNORE = re.compile(r"\bINSERT\s+IGNORE\b", re.IGNORECASE)
+_ON_DUPLICATE = re.compile(r"\bON\s+DUPLICATE\s+KEY\s+UPDATE\b", re.IGNORECASE)
+_VALUES_REF = re.compile(r"\bVALUES\((\w+)\)", re.IGNORECASE)
+_FOR_UPDATE = re.compile(r"\s+FOR\s+UPDATE\s*$", re.IGNORECASE)
+_SELECT_WITHOUT_WHERE = re.compile(r"(\bFROM\s+\w+)\s+(GROUP\s+BY\b)", re.IGNORECASE)
+_UPDATE_JOIN = re.compile(
+    r"^UPDATE\s+(\w+)\s+(\w+)\s+JOIN\s+(\w+)\s+(\w+)\s+ON\s+(.+?)\s+SET\s+(.+?)\s+WHERE\s+(.+)$",
+    re.IGNORECASE | re.DOTALL)
+
+# Same (table, index, column) rows as information_schema.statistics, in index column order
+_INDEX_COLUMNS_SQL = """
+    SELECT m.name, il.name, ii.name
+    FROM sqlite_master m, pragma_index_list(m.name) il, pragma_index_info(il.name) ii
+    WHERE m.type = 'table'
+    ORDER BY m.name, il.name, ii.seqno
+"""
+
+def _translate_update_join(match: re.Match) -> str:
+    table, alias, other, other_alias, condition, assignments, where = match.groups()
+    # SQLite's UPDATE ... FROM does not accept a qualified column on the left of SET
+    assignments = re.sub(rf"\b{alias}\.(\w+)\s*=", r"\1 =", assignments)
+    return (f"UPDATE {table} AS {alias} SET {assignments} FROM {other} AS {other_alias} "
+            f"WHERE ({condition}) AND ({where})")
+
+def translate(sql: str) -> str:
+    """Rewrite one MySQL statement as used in this codebase into SQLite's dialect"""
+    if "information_schema.statistics" in sql:
+        return _INDEX_COLUMNS_SQL
+
+    sql = sql.replace("%s", "?")
+    sql = _AUTO_INCREMENT.sub("INTEGER PRIMARY KEY AUTOINCREMENT", sql)
+    sql = _INSERT_IGNORE.sub("INSERT OR IGNORE", sql)
+    # Row locks: SQLite locks the whole file on write instead
+    sql = _FOR_UPDATE.sub("", sql)
+
+    match = _UPDATE_JOIN.match(sql.strip())
+    if match:
+        return _translate_update_join(match)
+
+    if _ON_DUPLICATE.search(sql):
+        head, assignments = _ON_DUPLICATE.split(sql, maxsplit=1)
+        if re.search(r"\bSELECT\b", head, re.IGNORECASE) and not re.search(r"\bWHERE\b", head, re.IGNORECASE):
+            # INSERT ... SELECT needs a WHERE before an upsert clause to parse unambiguously
+            head = _SELECT_WITHOUT_WHERE.sub(r"\1 WHERE true \2", head)
+        assignments = _VALUES_REF.sub(r"excluded.\1", assignments)
+        sql = f"{head}ON CONFLICT DO UPDATE SET{assignments}"
+    return sql
+
+def _to_sqlite_param(value):
+    # MySQL stores bytes in VARCHAR columns as text (bcrypt hashes); keep that behaviour
+    if isinstance(value, bytes):
+        return value.decode("utf-8")
+    if isinstance(value, datetime.datetime):
+        return value.isoformat(" ")
+    if isinstance(value, datetime.date):
+        return value.isoformat()
+    return value
+
+def _params(params):
+    if params is None:
+        return ()
+    if isinstance(params, dict):
+        return {key: _to_sqlite_param(value) for key, value in params.items()}
+    return tuple(_to_sqlite_param(value) for value in params)
+
+def _parse_timestamp(raw: bytes) -> datetime.datetime:
+    return datetime.datetime.fromisoformat(raw.decode())
+
+def _parse_date(raw: bytes) -> datetime.date:
+    return datetime.date.fromisoformat(raw.decode()[:10])
+
+# Columns declared TIMESTAMP / DATE come back as datetime / date, as from MySQL
+sqlite3.register_converter("TIMESTAMP", _parse_timestamp)
+sqlite3.register_converter("DATE", _parse_date)
+
+# -----------------------------
+# mysql-connector compatible surface
+# -----------------------------
+class SqliteCursor:
+    """Cursor with mysql-connector's `%s` placeholders and optional dict rows"""
+
+    def __init__(self, cursor: sqlite3.Cursor, dictionary: bool = False):
+        self._cursor = cursor
+        self._dictionary = dictionary
+
+    @property
+    def lastrowid(self) -> Optional[int]:
+        return self._cursor.lastrowid
+
+    @property
+    def rowcount(self) -> int:
+        return self._cursor.rowcount
+
+    @property
+    def description(self):
+        return self._cursor.description
+
+    def execute(self, sql: str, params=None) -> None:
+        self._cursor.execute(translate(sql), _params(params))
+
+    def executemany(self, sql: str, rows) -> None:
+        self._cursor.executemany(translate(sql), [_params(row) for row in rows])
+
+    def _row(self, row):
+        if row is None or not self._dictionary:
+            return row
+        return {column[0]: value for column, value in zip(self._cursor.description, row)}
+
+    def fetchone(self):
+        return self._row(self._cursor.fetchone())
+
+    def fetchmany(self, size: int = 1):
+        return [self._row(row) for row in self._cursor.fetchmany(size)]
+
+    def fetchall(self):
+        return [self._row(row) for row in self._cursor.fetchall()]
+
+    def close(self) -> None:
+        self._cursor.close()
+
+
+# MySQL named locks (GET_LOCK / RELEASE_LOCK), shared by the connections of this process
+_named_locks = {}
+_named_locks_guard = threading.Lock()
+
+def _named_lock(name: str) -> threading.Lock:
+    with _named_locks_guard:
+        return _named_locks.setdefault(name, threading.Lock())
+
+def _get_lock(name: str, timeout: float) -> int:
+    return int(_named_lock(name).acquire(timeout=timeout if timeout >= 0 else -1))
+
+def _release_lock(name: str) -> Optional[int]:
+    try:
+        _named_lock(name).release()
+        return 1
+    except RuntimeError:
+        return 0
+
+
+class SqliteConnection:
+    """One SQLite connection behaving like a mysql-connector connection for the repositories"""
+
+    def __init__(self, path: str, busy_timeout_s: float = 30.0):
+        self.path = path
+        self._db = sqlite3.connect(path, timeout=busy_timeout_s, check_same_thread=False,
+                                   detect_types=sqlite3.PARSE_DECLTYPES)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.create_function("CURDATE", 0, lambda: datetime.date.today().isoformat())
+        self._db.create_function("NOW", 0, lambda: datetime.datetime.now().isoformat(" ", "seconds"))
+        self._db.create_function("FLOOR", 1, lambda x: None if x is None else math.floor(x))
+        self._db.create_function("UUID", 0, lambda: str(uuid.uuid4()))
+        self._db.create_function("GET_LOCK", 2, _get_lock)
+        self._db.create_function("RELEASE_LOCK", 1, _release_lock)
+        self._open = True
+
+    def cursor(self, dictionary: bool = False, **kwargs) -> SqliteCursor:
+        return SqliteCursor(self._db.cursor(), dictionary=dictionary)
+
+    def commit(self) -> None:
+        self._db.commit()
+
+    def rollback(self) -> None:
+        self._db.rollback()
+
+    def ping(self, reconnect: bool = False) -> None:
+        self._db.execute("SELECT 1")
+
+    def is_connected(self) -> bool:
+        return self._open
+
+    def close(self) -> None:
+        self._open = False
+        self._db.close()
+
+# -----------------------------
+# Connection factory
+# -----------------------------
+_migrated = set()
+_migrate_lock = threading.Lock()
+
+def create_sqlite_connection(path: str = DEFAULT_SQLITE_PATH) -> SqliteConnection:
+    """Open `path`, applying pending migrations the first time this process opens it"""
+    connection = SqliteConnection(path)
+    key = os.path.abspath(path)
+    if key not in _migrated:
+        with _migrate_lock:
+            if key not in _migrated:
+                # Imported here: config.migrations imports config.db, which imports this module lazily
+                from config.migrations import migrate
+                migrate(connection)
+                _migrated.add(key)
+    return connection
@@ -1,29 +1,52 @@
-from typing import List, Dict
-from utils.ranking_utils import normalize, DIVCODE_TO_DIVISION, parse_ranking_file
+import os
+import threading
+from functools import lru_cache
+from typing import List, Optional
+from utils.ranking_utils import normalize, load_ranking_table, StationCrimeIndex
 
-# Load ranking data once at module level
-ranking_data = parse_ranking_file("data/FivePreventableCrimeCasesRecordedByNeighbourhoodPoliceCentreNPCAnnual.csv")
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+RANKING_FILE = os.path.join(BASE_DIR, '../data/FivePreventableCrimeCasesRecordedByNeighbourhoodPoliceCentreNPCAnnual.csv')
 
-def get_top_crimes(
-    station_name: str,
-    divcode: str
-) -> List[str]:
-    norm_station = normalize(station_name)
+# Normalized names, n-gram postings and sorted top-3 lists, built once per worker
+_ranking_index: Optional[StationCrimeIndex] = None
+_ranking_lock = threading.Lock()
+
+def get_ranking_index() -> StationCrimeIndex:
+    """Return the shared ranking index, parsing the ranking CSV on first use"""
+    global _ranking_index
+    if _ranking_index is None:
+        with _ranking_lock:
+            if _ranking_index is None:
+                _ranking_index = StationCrimeIndex(load_ranking_table(RANKING_FILE), n=3)
+    return _ranking_index
+
+def reload_ranking_index(path: str = RANKING_FILE) -> StationCrimeIndex:
+    """Re-parse the ranking CSV at `path` and swap it in for subsequent lookups"""
+    global _ranking_index
+    index = StationCrimeIndex(load_ranking_table(path), n=3)
+    with _ranking_lock:
+        _ranking_index = index
+        _lookup_top_crimes.cache_clear()
+    return index
+
+@lru_cache(maxsize=4096)
+def _lookup_top_crimes(station_name: str, divcode: str) -> tuple:
+    ranking_index = get_ranking_index()
 
     # Try matching exact station
-    for full_station in ranking_data:
-        if norm_station in normalize(full_station):
-            crime_dict = ranking_data[full_station]
-            sorted_crimes = sorted(crime_dict.items(), key=lambda x: x[1][0], reverse=True)
-            return [crime for crime, _ in sorted_crimes[:3]]
+    top = ranking_index.top_for_station(normalize(station_name))
+    if top is not None:
+        return tuple(top)
 
     # Fallback: Try matching division
-    division_name = DIVCODE_TO_DIVISION.get(divcode)
-    if division_name:
-        for full_station in ranking_data:
-            if division_name in full_station:
-                crime_dict = ranking_data[full_station]
-                sorted_crimes = sorted(crime_dict.items(), key=lambda x: x[1][0], reverse=True)
-                return [crime for crime, _ in sorted_crimes[:3]]
-
-    return []
+    top = ranking_index.top_for_division(divcode)
+    if top is not None:
+        return tuple(top)
+
+    return ()
+
+def get_top_crimes(
+    station_name: str,
+    divcode: str
+) -> List[str]:
+    return list(_lookup_top_crimes(station_name, divcode))
@@ -1,14 +1,61 @@
+import asyncio
+import contextlib
+import os
+from config.env import load_env
+
+# Load environment variables from .env file before any module reads its settings
+load_env()
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-import os
-from dotenv import load_dotenv
-from routes import user_routes, feedback_routes, crime_report_routes, history_routes, location_routes, ranking_routes, sms_routes  # Importing the user and feedback routes
+from routes import user_routes, feedback_routes, crime_report_routes, history_routes, location_routes, ranking_routes, sms_routes, health_routes, admin_routes, hotspot_routes, tile_routes, metrics_routes  # Importing the user and feedback routes
 from controllers import auth_controller  # Importing the auth controller
-# Load environment variables from .env file
-load_dotenv()
+from controllers.ranking_controller import get_ranking_index
+from config.db import shutdown_db
+from config.migrations import check_schema
+from utils.station_registry import get_station_registry
+from utils.travel_time import close_travel_time_provider
+from utils.cache import close_shared_cache
+from utils.ingest_queue import start_ingest_worker, stop_ingest_worker
+from utils.heatmap_tiles import get_tile_cache
+from utils.sms_utils import start_sms_dispatcher, stop_sms_dispatcher
+from utils.metrics import MetricsMiddleware
+from utils.responses import CompressionMiddleware, FastJSONResponse
+
+@contextlib.asynccontextmanager
+async def lifespan(app: FastAPI):
+    loop = asyncio.get_running_loop()
+    # Parse reference datasets once per worker, side by side, before the first request
+    await asyncio.gather(
+        loop.run_in_executor(None, get_station_registry),
+        loop.run_in_executor(None, get_ranking_index)
+    )
+    # Subscribes to report inserts so cached heatmap tiles are invalidated from the first write
+    get_tile_cache()
+    await loop.run_in_executor(None, check_schema)
 
-# Initialize FastAPI app
-app = FastAPI()
+    # Write-behind ingestion (CRIME_REPORT_INGEST_MODE=queue) also replays reports left queued by a crash;
+    # the SMS dispatcher sends division alerts off the request path
+    await start_ingest_worker()
+    await start_sms_dispatcher()
+    try:
+        yield
+    finally:
+        await stop_ingest_worker()
+        await stop_sms_dispatcher()
+        await close_travel_time_provider()
+        await close_shared_cache()
+        shutdown_db()
+
+# Initialize FastAPI app; orjson serializes every JSON response several times faster than the stdlib encoder
+app = FastAPI(lifespan=lifespan, default_response_class=FastJSONResponse)
+
+# Innermost, so each body is compressed once and the time is counted by the metrics middleware
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=int(os.getenv("GZIP_MIN_SIZE", "1000")),
+    compresslevel=int(os.getenv("GZIP_LEVEL", "6"))
+)
 
 # CORS Middleware Setup
 origins = [
@@ -21,8 +68,12 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
+# Added last so it is outermost and times everything, CORS included
+app.add_middleware(MetricsMiddleware)
+
 # Register the user and feedback routes
 app.include_router(auth_controller.router)
 app.include_router(user_routes.router)
@@ -32,6 +83,11 @@ app.include_router(history_routes.router)
 app.include_router(location_routes.router)
 app.include_router(ranking_routes.router)
 app.include_router(sms_routes.router)
+app.include_router(health_routes.router)
+app.include_router(admin_routes.router)
+app.include_router(hotspot_routes.router)
+app.include_router(tile_routes.router)
+app.include_router(metrics_routes.router)
 # Getting the port from environment variables or defaulting to 3001
 port = os.getenv("PORT", 8000)
 
@@ -0,0 +1,12 @@
+-- Key crime reports by the submitting user's id instead of the free-text email,
+-- and back /api/history keyset pagination with a covering composite index.
+
+ALTER TABLE crime_reports ADD COLUMN user_id INT NULL;
+
+-- Existing reports are attributed to the account whose email they were filed under
+UPDATE crime_reports cr
+JOIN users u ON u.email = cr.email
+SET cr.user_id = u.id
+WHERE cr.user_id IS NULL;
+
+CREATE INDEX idx_crime_reports_user_submitted ON crime_reports (user_id, submitted_at, id);
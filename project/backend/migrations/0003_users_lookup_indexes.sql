@@ -0,0 +1,7 @@
+-- Signup, login and profile updates look users up by email and by phone, and
+-- both must be unique. Existing duplicates have to be resolved before this
+-- migration can apply.
+
+CREATE UNIQUE INDEX uq_users_email ON users (email);
+
+CREATE UNIQUE INDEX uq_users_phone ON users (phone);
@@ -0,0 +1,7 @@
+-- Client-visible report ids. Queued reports are inserted with ON DUPLICATE KEY
+-- UPDATE id = id on this key, so replaying a batch after a crash never
+-- duplicates a report.
+
+ALTER TABLE crime_reports ADD COLUMN report_uid CHAR(32) NULL;
+
+CREATE UNIQUE INDEX uq_crime_reports_report_uid ON crime_reports (report_uid);
@@ -0,0 +1,20 @@
+-- Pre-aggregated report counts per 0.005 degree grid cell (about 550 m), crime
+-- type and day, maintained incrementally on every insert and read by
+-- /api/hotspots. cell_lat / cell_lon are FLOOR(coordinate / 0.005); the cell
+-- size is repositories.hotspots.CELL_DEG and changing it requires a rebuild.
+
+CREATE TABLE IF NOT EXISTS crime_report_cells (
+    day DATE NOT NULL,
+    cell_lat INT NOT NULL,
+    cell_lon INT NOT NULL,
+    crime_type VARCHAR(100) NOT NULL,
+    report_count INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (day, cell_lat, cell_lon, crime_type)
+);
+
+-- Backfill from every report filed before this migration
+INSERT INTO crime_report_cells (day, cell_lat, cell_lon, crime_type, report_count)
+SELECT DATE(submitted_at), FLOOR(latitude / 0.005), FLOOR(longitude / 0.005), crime_type, COUNT(*)
+FROM crime_reports
+GROUP BY DATE(submitted_at), FLOOR(latitude / 0.005), FLOOR(longitude / 0.005), crime_type
+ON DUPLICATE KEY UPDATE report_count = VALUES(report_count);
@@ -0,0 +1,4 @@
+-- Heatmap tiles read all-time totals for a box of cells regardless of day.
+-- Covering index so those reads never touch the day-keyed rows.
+
+CREATE INDEX idx_crime_report_cells_cell ON crime_report_cells (cell_lat, cell_lon, report_count);
@@ -0,0 +1,12 @@
+-- Near-duplicate reports of the same incident share an incident_id: the
+-- report_uid of the first report of that incident (utils/incidents.py).
+-- Reports filed before this migration are their own incident. Those filed
+-- before 0004 have no report_uid yet, so they are given one first.
+
+ALTER TABLE crime_reports ADD COLUMN incident_id CHAR(32) NULL;
+
+UPDATE crime_reports SET report_uid = REPLACE(UUID(), '-', '') WHERE report_uid IS NULL;
+
+UPDATE crime_reports SET incident_id = report_uid WHERE incident_id IS NULL;
+
+CREATE INDEX idx_crime_reports_incident ON crime_reports (incident_id);
@@ -0,0 +1,8 @@
+-- Lookups by submitter email on reports and feedback. Reports stay keyed by
+-- email wherever no account id is known: bulk-imported rows whose email has
+-- no account yet are stored with user_id NULL, and linking them later is the
+-- email join from 0002. Feedback is looked up per submitter, newest first.
+
+CREATE INDEX idx_crime_reports_email ON crime_reports (email);
+
+CREATE INDEX idx_feedbacks_email_created ON feedbacks (email, created_at);
@@ -0,0 +1,8 @@
+-- Earlier versions of 0007 copied report_uid into incident_id without first
+-- giving reports filed before 0004 a report_uid, which left them with neither.
+-- Repeat the backfill for databases migrated by that version; elsewhere both
+-- statements match no rows.
+
+UPDATE crime_reports SET report_uid = REPLACE(UUID(), '-', '') WHERE report_uid IS NULL;
+
+UPDATE crime_reports SET incident_id = report_uid WHERE incident_id IS NULL;
@@ -0,0 +1,38 @@
+import math
+from typing import Optional
+from pydantic import BaseModel
+
+def _finite(value: Optional[float]) -> Optional[float]:
+    # Unroutable destinations are ranked with inf; JSON has no infinity, so they go out as null
+    return None if value is None or math.isinf(value) else value
+
+class NearestStation(BaseModel):
+    name: Optional[str]
+    divcode: Optional[str]
+    latitude: float
+    longitude: float
+    distance: float
+    travel_distance_km: Optional[float]
+    travel_time_min: Optional[float]
+    eta_source: Optional[str] = None
+    raw: Optional[dict] = None
+
+    @classmethod
+    def from_station(cls, station: dict, include_raw: bool = False) -> "NearestStation":
+        """Lean view of a location controller station dict; the GeoJSON feature only when asked for"""
+        fields = {
+            "name": station["name"],
+            "divcode": station["divcode"],
+            "latitude": station["latitude"],
+            "longitude": station["longitude"],
+            "distance": station["distance"],
+            "travel_distance_km": _finite(station.get("travel_distance_km")),
+            "travel_time_min": _finite(station.get("travel_time_min")),
+            "eta_source": station.get("eta_source")
+        }
+        if include_raw:
+            fields["raw"] = station["raw"]
+        return cls(**fields)
+
+class NearestStationResponse(BaseModel):
+    nearest_station: NearestStation
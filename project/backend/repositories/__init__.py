@@ -0,0 +1 @@
+from . import users, hotspots, crime_reports, feedbacks
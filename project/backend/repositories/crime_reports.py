@@ -0,0 +1,166 @@
+from datetime import datetime, timezone
+from typing import Iterator, List, Optional, Sequence, Tuple
+from config.db import db_call
+from models.crime_report_model import CrimeReportRequest
+from repositories import hotspots
+
+INSERT_COLUMNS = ("report_uid", "user_id", "crime_type", "location", "email", "latitude", "longitude",
+                  "police_station", "submitted_at", "incident_id")
+
+EXPORT_COLUMNS = ("id",) + INSERT_COLUMNS
+
+# Newest first; (submitted_at, id) is the keyset and matches idx_crime_reports_user_submitted
+HISTORY_COLUMNS = "id, crime_type, location, police_station, submitted_at AS created_at"
+HISTORY_FIRST_PAGE_SQL = (
+    f"SELECT {HISTORY_COLUMNS} FROM crime_reports WHERE user_id = %s "
+    "ORDER BY submitted_at DESC, id DESC LIMIT %s"
+)
+HISTORY_NEXT_PAGE_SQL = (
+    f"SELECT {HISTORY_COLUMNS} FROM crime_reports WHERE user_id = %s "
+    # The leading `submitted_at <= %s` gives the optimizer an index range bound
+    # that the OR alone would hide
+    "AND submitted_at <= %s AND (submitted_at < %s OR id < %s) "
+    "ORDER BY submitted_at DESC, id DESC LIMIT %s"
+)
+
+def submitted_now() -> str:
+    """
+    UTC submission timestamp from the app clock. Direct inserts, queued
+    reports and imports all stamp rows with it, so history order and hotspot
+    days do not depend on which path (or which clock) wrote the report.
+    """
+    return datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+
+@db_call
+def create(connection, report: CrimeReportRequest, user_id: int, report_uid: str,
+           incident_id: Optional[str] = None) -> int:
+    """
+    Insert one crime report for `user_id`, count it in its hotspot cell, and
+    commit; returns the new row id. `incident_id` defaults to the report's own uid.
+    """
+    submitted_at = submitted_now()
+    cursor = connection.cursor()
+    try:
+        cursor.execute(
+            """
+            INSERT INTO crime_reports (report_uid, user_id, crime_type, location, email, latitude, longitude,
+                                       police_station, submitted_at, incident_id)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+            """,
+            (report_uid, user_id, report.crime_type, report.location, report.email, report.latitude,
+             report.longitude, report.police_station, submitted_at, incident_id or report_uid)
+        )
+        hotspots.add_to_cells(cursor, hotspots.cell_deltas(
+            [(report.latitude, report.longitude, report.crime_type, submitted_at)]
+        ))
+        connection.commit()
+        hotspots.notify({hotspots.cell_of(report.latitude, report.longitude)})
+        return cursor.lastrowid
+    except Exception:
+        connection.rollback()
+        raise
+    finally:
+        cursor.close()
+
+# Named lock held by create_many from its uid check to its commit
+BATCH_LOCK = "crimewatch.crime_reports.create_many"
+BATCH_LOCK_TIMEOUT_S = 10
+
+@db_call
+def create_many(connection, rows: Sequence[tuple]) -> int:
+    """
+    Insert rows shaped like INSERT_COLUMNS with one executemany (the driver
+    folds it into a multi-row INSERT), update the hotspot cells, and commit in
+    one transaction. Rows whose report_uid already exists are skipped; returns
+    the number inserted.
+
+    Calls are serialized on BATCH_LOCK. Two flushes of the same report_uids
+    could otherwise both find them missing, and both count them in the
+    hotspot cells while only one copy is stored.
+    """
+    if not rows:
+        return 0
+    # Not INSERT IGNORE: that would also downgrade truncation and bad-value errors to warnings
+    query = (f"INSERT INTO crime_reports ({', '.join(INSERT_COLUMNS)}) "
+             f"VALUES ({', '.join(['%s'] * len(INSERT_COLUMNS))}) "
+             "ON DUPLICATE KEY UPDATE id = id")
+    cursor = connection.cursor()
+    try:
+        cursor.execute("SELECT GET_LOCK(%s, %s)", (BATCH_LOCK, BATCH_LOCK_TIMEOUT_S))
+        if cursor.fetchall() != [(1,)]:
+            raise TimeoutError(f"Crime report batch lock not acquired within {BATCH_LOCK_TIMEOUT_S}s")
+        try:
+            # A locking read sees the latest commits, not this transaction's snapshot
+            uids = [row[0] for row in rows]
+            cursor.execute(f"SELECT report_uid FROM crime_reports WHERE report_uid IN "
+                           f"({', '.join(['%s'] * len(uids))}) FOR UPDATE", uids)
+            seen = {uid for (uid,) in cursor.fetchall()}
+            # With the lock held, exactly these rows are written by this call
+            fresh = []
+            for row in rows:
+                if row[0] not in seen:
+                    seen.add(row[0])
+                    fresh.append(row)
+            deltas = hotspots.cell_deltas((row[5], row[6], row[2], row[8]) for row in fresh)
+            if fresh:
+                cursor.executemany(query, fresh)
+                hotspots.add_to_cells(cursor, deltas)
+            connection.commit()
+        except Exception:
+            connection.rollback()
+            raise
+        finally:
+            cursor.execute("SELECT RELEASE_LOCK(%s)", (BATCH_LOCK,))
+            cursor.fetchall()
+    finally:
+        cursor.close()
+    if deltas:
+        hotspots.notify({(cell_lat, cell_lon) for _, cell_lat, cell_lon, _ in deltas})
+    return len(fresh)
+
+@db_call
+def list_page_by_user(connection, user_id: int, limit: int,
+                      after: Optional[Tuple[str, int]] = None) -> Tuple[List[dict], Optional[tuple]]:
+    """
+    One page of a user's reports, newest first, starting strictly after the
+    `(submitted_at, id)` keyset `after`. Returns the rows and the keyset of the
+    last row when more rows follow, else None.
+    """
+    cursor = connection.cursor(dictionary=True)
+    try:
+        # Fetch one extra row to learn whether another page exists without a COUNT
+        if after is None:
+            cursor.execute(HISTORY_FIRST_PAGE_SQL, (user_id, limit + 1))
+        else:
+            submitted_at, last_id = after
+            cursor.execute(HISTORY_NEXT_PAGE_SQL, (user_id, submitted_at, submitted_at, last_id, limit + 1))
+        rows = cursor.fetchall()
+    finally:
+        cursor.close()
+
+    next_key = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_key = (rows[-1]["created_at"], rows[-1]["id"])
+    return rows, next_key
+
+def iter_export_chunks(connection, chunk_size: int) -> Iterator[List[tuple]]:
+    """
+    Blocking generator over every report in id order, `chunk_size` rows at a
+    time, read through an unbuffered cursor so the result set streams from the
+    server instead of being loaded whole. Drive it with run_db.
+    """
+    cursor = connection.cursor(buffered=False)
+    try:
+        cursor.execute(f"SELECT {', '.join(EXPORT_COLUMNS)} FROM crime_reports ORDER BY id")
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                return
+            yield rows
+    finally:
+        try:
+            cursor.close()
+        except Exception:
+            # Closing with unread rows fails on an abandoned stream; the pool discards the connection
+            pass
@@ -0,0 +1,18 @@
+from config.db import db_call
+
+@db_call
+def create(connection, email: str, rating: int, comment: str) -> int:
+    """Insert one feedback row and commit; returns the new feedback id"""
+    cursor = connection.cursor()
+    try:
+        cursor.execute(
+            "INSERT INTO feedbacks (email, rating, comment) VALUES (%s, %s, %s)",
+            (email, rating, comment)
+        )
+        connection.commit()
+        return cursor.lastrowid
+    except Exception:
+        connection.rollback()
+        raise
+    finally:
+        cursor.close()
@@ -0,0 +1,80 @@
+import math
+from collections import Counter
+from typing import Callable, Dict, Iterable, List, Set, Tuple
+from config.db import db_call
+
+# Grid cell edge in degrees (~550 m); must match migrations/0005_crime_report_cells.sql
+CELL_DEG = 0.005
+
+# (day, cell_lat, cell_lon, crime_type) -> number of reports to add
+CellDeltas = Dict[Tuple[str, int, int, str], int]
+
+def cell_of(lat: float, lon: float) -> Tuple[int, int]:
+    return math.floor(lat / CELL_DEG), math.floor(lon / CELL_DEG)
+
+def cell_deltas(reports: Iterable[Tuple[float, float, str, str]]) -> CellDeltas:
+    """Per-cell count increments for (latitude, longitude, crime_type, submitted_at) tuples"""
+    deltas = Counter()
+    for lat, lon, crime_type, submitted_at in reports:
+        cell_lat, cell_lon = cell_of(lat, lon)
+        deltas[(str(submitted_at)[:10], cell_lat, cell_lon, crime_type)] += 1
+    return deltas
+
+UPSERT_SQL = (
+    "INSERT INTO crime_report_cells (day, cell_lat, cell_lon, crime_type, report_count) "
+    "VALUES (%s, %s, %s, %s, %s) "
+    "ON DUPLICATE KEY UPDATE report_count = report_count + VALUES(report_count)"
+)
+
+# Callbacks told which (cell_lat, cell_lon) cells gained reports, after the commit
+_listeners: List[Callable[[Set[Tuple[int, int]]], None]] = []
+
+def subscribe(callback: Callable[[Set[Tuple[int, int]]], None]) -> None:
+    _listeners.append(callback)
+
+def notify(cells: Set[Tuple[int, int]]) -> None:
+    for callback in _listeners:
+        try:
+            callback(cells)
+        except Exception as e:
+            print(f"⚠️ Hotspot listener failed: {e}")
+
+def add_to_cells(cursor, deltas: CellDeltas) -> None:
+    """Upsert cell counts on the caller's cursor, inside the caller's transaction"""
+    if deltas:
+        cursor.executemany(UPSERT_SQL, [key + (count,) for key, count in deltas.items()])
+
+@db_call
+def counts_in_box(connection, since: str, lat_range: Tuple[int, int], lon_range: Tuple[int, int],
+                  crime_type: str = None) -> List[tuple]:
+    """(cell_lat, cell_lon, crime_type, count) summed over days >= `since` for cells in the box"""
+    query = (
+        "SELECT cell_lat, cell_lon, crime_type, SUM(report_count) FROM crime_report_cells "
+        "WHERE day >= %s AND cell_lat BETWEEN %s AND %s AND cell_lon BETWEEN %s AND %s"
+    )
+    params = [since, lat_range[0], lat_range[1], lon_range[0], lon_range[1]]
+    if crime_type:
+        query += " AND crime_type = %s"
+        params.append(crime_type)
+    query += " GROUP BY cell_lat, cell_lon, crime_type"
+    cursor = connection.cursor()
+    try:
+        cursor.execute(query, params)
+        return cursor.fetchall()
+    finally:
+        cursor.close()
+
+@db_call
+def totals_in_box(connection, lat_range: Tuple[int, int], lon_range: Tuple[int, int]) -> List[tuple]:
+    """(cell_lat, cell_lon, count) over all days and crime types for cells in the box"""
+    cursor = connection.cursor()
+    try:
+        cursor.execute(
+            "SELECT cell_lat, cell_lon, SUM(report_count) FROM crime_report_cells "
+            "WHERE cell_lat BETWEEN %s AND %s AND cell_lon BETWEEN %s AND %s "
+            "GROUP BY cell_lat, cell_lon",
+            (lat_range[0], lat_range[1], lon_range[0], lon_range[1])
+        )
+        return [(cell_lat, cell_lon, int(count)) for cell_lat, cell_lon, count in cursor.fetchall()]
+    finally:
+        cursor.close()
@@ -0,0 +1,115 @@
+from typing import Dict, Iterable, Optional
+from config.db import db_call
+
+# Columns safe to hand back to clients (no password hash)
+PUBLIC_COLUMNS = "id, name, email, phone"
+
+@db_call
+def exists_by_email_or_phone(connection, email: str, phone: str) -> bool:
+    cursor = connection.cursor()
+    try:
+        # UNION ALL lets each branch use its own unique index; an OR forces a scan
+        cursor.execute(
+            "SELECT id FROM users WHERE email = %s UNION ALL SELECT id FROM users WHERE phone = %s LIMIT 1",
+            (email, phone)
+        )
+        return cursor.fetchone() is not None
+    finally:
+        cursor.close()
+
+@db_call
+def exists_by_email(connection, email: str) -> bool:
+    cursor = connection.cursor()
+    try:
+        cursor.execute("SELECT id FROM users WHERE email = %s", (email,))
+        return cursor.fetchone() is not None
+    finally:
+        cursor.close()
+
+@db_call
+def get_by_email(connection, email: str) -> Optional[dict]:
+    """Full user row including the password hash, for login"""
+    cursor = connection.cursor(dictionary=True)
+    try:
+        cursor.execute("SELECT * FROM users WHERE email = %s", (email,))
+        return cursor.fetchone()
+    finally:
+        cursor.close()
+
+@db_call
+def get_by_id(connection, user_id: int) -> Optional[dict]:
+    cursor = connection.cursor(dictionary=True)
+    try:
+        cursor.execute(f"SELECT {PUBLIC_COLUMNS} FROM users WHERE id = %s", (user_id,))
+        return cursor.fetchone()
+    finally:
+        cursor.close()
+
+@db_call
+def ids_by_email(connection, emails: Iterable[str]) -> Dict[str, int]:
+    """Map each email that belongs to an account to its user id, in one query"""
+    emails = list(emails)
+    if not emails:
+        return {}
+    cursor = connection.cursor()
+    try:
+        cursor.execute(f"SELECT email, id FROM users WHERE email IN ({', '.join(['%s'] * len(emails))})", emails)
+        return {email: user_id for email, user_id in cursor.fetchall()}
+    finally:
+        cursor.close()
+
+@db_call
+def get_password_hash(connection, user_id: int) -> Optional[str]:
+    cursor = connection.cursor(dictionary=True)
+    try:
+        cursor.execute("SELECT password FROM users WHERE id = %s", (user_id,))
+        row = cursor.fetchone()
+        return row["password"] if row else None
+    finally:
+        cursor.close()
+
+@db_call
+def phone_taken_by_other(connection, phone: str, user_id: int) -> bool:
+    cursor = connection.cursor()
+    try:
+        cursor.execute("SELECT id FROM users WHERE (phone = %s) AND id != %s", (phone, user_id))
+        return cursor.fetchone() is not None
+    finally:
+        cursor.close()
+
+@db_call
+def create(connection, name: str, email: str, phone: str, password_hash) -> int:
+    """Insert a user and commit; returns the new user id"""
+    cursor = connection.cursor()
+    try:
+        cursor.execute(
+            "INSERT INTO users (name, email, phone, password) VALUES (%s, %s, %s, %s)",
+            (name, email, phone, password_hash)
+        )
+        connection.commit()
+        return cursor.lastrowid
+    except Exception:
+        connection.rollback()
+        raise
+    finally:
+        cursor.close()
+
+@db_call
+def update_profile(connection, user_id: int, name: str, phone: str, password_hash=None) -> None:
+    """Update name/phone, and the password when a new hash is given, then commit"""
+    cursor = connection.cursor()
+    try:
+        if password_hash is not None:
+            cursor.execute("""
+                UPDATE users SET name = %s, phone = %s, password = %s WHERE id = %s
+            """, (name, phone, password_hash, user_id))
+        else:
+            cursor.execute("""
+                UPDATE users SET name = %s, phone = %s WHERE id = %s
+            """, (name, phone, user_id))
+        connection.commit()
+    except Exception:
+        connection.rollback()
+        raise
+    finally:
+        cursor.close()
@@ -0,0 +1,41 @@
+import os
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from utils.auth import require_admin
+from utils.bulk_io import import_reports, export_reports
+
+router = APIRouter(dependencies=[Depends(require_admin)])
+
+IMPORT_CHUNK_SIZE = int(os.getenv("IMPORT_CHUNK_SIZE", "1000"))
+EXPORT_CHUNK_SIZE = int(os.getenv("EXPORT_CHUNK_SIZE", "5000"))
+
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+def _format_from_content_type(content_type: str) -> str:
+    if "csv" in content_type:
+        return "csv"
+    return "ndjson"
+
+@router.post("/api/admin/crime-reports/import")
+async def bulk_import_crime_reports(request: Request, format: str = Query(None, pattern="^(ndjson|csv)$")):
+    """
+    Backfill crime reports from an NDJSON or CSV request body, streamed and
+    written in batches. Invalid rows are skipped and listed in the summary.
+    """
+    fmt = format or _format_from_content_type(request.headers.get("content-type", ""))
+    try:
+        return await import_reports(request.stream(), fmt, chunk_size=IMPORT_CHUNK_SIZE)
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"❌ Bulk import failed: {e}")
+        raise HTTPException(status_code=500, detail=f"Import failed: {e}")
+
+@router.get("/api/admin/crime-reports/export")
+async def bulk_export_crime_reports(format: str = Query("ndjson", pattern="^(ndjson|csv)$")):
+    """Stream every crime report as NDJSON or CSV without loading the table into memory"""
+    return StreamingResponse(
+        export_reports(format, chunk_size=EXPORT_CHUNK_SIZE),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f"attachment; filename=crime_reports.{format}"}
+    )
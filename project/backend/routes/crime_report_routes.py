@@ -1,8 +1,11 @@
-from fastapi import APIRouter, HTTPException, Header
-from config.db import get_db_connection
+from fastapi import APIRouter, HTTPException, Depends, Response
+import uuid
+from config.db import db_session
 from models.crime_report_model import CrimeReportRequest  # Ensure this imports your Pydantic model for crime report
-import jwt
-import os
+from repositories import crime_reports
+from utils.auth import get_current_user
+from utils.incidents import get_incident_index
+from utils.ingest_queue import ingest_mode, get_ingest_worker, report_row
 router = APIRouter()
 
 
@@ -10,54 +13,48 @@ router = APIRouter()
 @router.post("/api/crime-report")
 async def submit_crime_report(
     report: CrimeReportRequest,
-    authorization: str = Header(...),
+    response: Response,
+    user=Depends(get_current_user),  # Validates the Authorization header
 ):
-    if not authorization.startswith("Bearer "):
-        raise HTTPException(status_code=400, detail="Invalid Authorization header format")
+    report_uid = uuid.uuid4().hex
+    # Same crime type reported nearby moments ago: link it to that incident rather than a new one
+    incident_id, duplicate = get_incident_index().assign(
+        report_uid, report.crime_type, report.latitude, report.longitude
+    )
+    result = {
+        "msg": "Crime report submitted successfully",
+        "report_id": report_uid,
+        "incident_id": incident_id,
+        "duplicate": duplicate
+    }
+
+    if ingest_mode() == "queue":
+        # Durable local enqueue; the ingest worker batches it into MySQL shortly after
+        try:
+            await get_ingest_worker().submit(report_uid, report_row(report, user["id"], report_uid, incident_id))
+        except Exception as e:
+            print(f"Error occurred: {str(e)}")
+            _withdraw(report, report_uid)
+            raise HTTPException(status_code=500, detail=f"Queue error: {str(e)}")
+        response.status_code = 202
+        return result
 
-    token = authorization.split("Bearer ")[1]
-
-    # Ensure the JWT_SECRET is set in your environment variables
-    secret_key = os.getenv("JWT_SECRET", "your_jwt_secret")
-    if not secret_key:
-        raise HTTPException(status_code=500, detail="JWT_SECRET is not set")
-    connection = get_db_connection()
-    if not connection:
-        raise HTTPException(status_code=500, detail="Database connection failed")
-
-    cursor = connection.cursor()
     try:
-        # Decode JWT token
-        decoded_token = jwt.decode(token, secret_key, algorithms=["HS256"])
-
-        # Extract userId from the decoded token
-        user_id = decoded_token.get("userId")
-
-        if not user_id:
-            raise HTTPException(status_code=400, detail="Invalid token: userId missing")
-
-        # Fetch user details from the database to validate
-        cursor.execute("SELECT id, email FROM users WHERE id = %s", (user_id,))
-        user = cursor.fetchone()
-
-        if not user:
-            raise HTTPException(status_code=404, detail="User not found")
-
-        # Insert crime report into the database
-        cursor.execute(
-            """
-            INSERT INTO crime_reports (crime_type, location, email, latitude, longitude, police_station)
-            VALUES (%s, %s, %s, %s, %s, %s)
-            """,
-            (report.crime_type, report.location, report.email, report.latitude, report.longitude, report.police_station)
-        )
-        connection.commit()
-
-        return {"msg": "Crime report submitted successfully"}
-
-    except Exception as e:
-        print(f"Error occurred: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
-    finally:
-        cursor.close()
-        connection.close()
\ No newline at end of file
+        await _insert_report(report, user["id"], report_uid, incident_id)
+    except HTTPException:
+        _withdraw(report, report_uid)
+        raise
+    return result
+
+def _withdraw(report: CrimeReportRequest, report_uid: str):
+    # The report was never stored, so later reports nearby must not be linked to it
+    get_incident_index().withdraw(report_uid, report.crime_type, report.latitude, report.longitude)
+
+async def _insert_report(report: CrimeReportRequest, user_id: int, report_uid: str, incident_id: str):
+    async with db_session() as connection:
+        try:
+            # Insert crime report into the database
+            await crime_reports.create(connection, report, user_id, report_uid, incident_id)
+        except Exception as e:
+            print(f"Error occurred: {str(e)}")
+            raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
@@ -0,0 +1,53 @@
+from fastapi import APIRouter
+from config.db import get_pool
+from utils.password_hasher import get_password_hasher
+from utils.auth import token_cache, user_cache
+from utils.ingest_queue import ingest_mode, get_ingest_worker
+from utils.heatmap_tiles import get_tile_cache
+from utils.incidents import get_incident_index
+from utils.sms_utils import get_sms_dispatcher
+from utils.travel_time import get_travel_time_provider
+
+router = APIRouter()
+
+@router.get("/api/health/db")
+def database_pool_stats():
+    """Connection pool occupancy, overflow and saturation counters for this worker"""
+    return get_pool().stats()
+
+@router.get("/api/health/hasher")
+def password_hasher_stats():
+    """bcrypt pool queue depth, shed count, and hash / queue-wait latency"""
+    return get_password_hasher().stats()
+
+@router.get("/api/health/auth")
+def auth_cache_stats():
+    """Hit / miss counters for the verified-token and user-lookup caches, per tier for users"""
+    return {"tokens": token_cache.stats(), "users": user_cache.stats()}
+
+@router.get("/api/health/travel-time")
+def travel_time_cache_stats():
+    """Travel-time cache hits per tier, upstream calls, coalesced duplicate calls and fallbacks"""
+    return get_travel_time_provider().stats()
+
+@router.get("/api/health/ingest")
+def ingest_queue_stats():
+    """Write-behind queue depth, batch sizes, flush latency and queue delay"""
+    if ingest_mode() != "queue":
+        return {"mode": ingest_mode()}
+    return get_ingest_worker().stats()
+
+@router.get("/api/health/tiles")
+def tile_cache_stats():
+    """Heatmap tile renders, memory / disk cache hits and invalidations"""
+    return get_tile_cache().stats()
+
+@router.get("/api/health/incidents")
+def incident_index_stats():
+    """Near-duplicate index size and how many reports joined an existing incident"""
+    return get_incident_index().stats()
+
+@router.get("/api/health/sms")
+def sms_dispatch_stats():
+    """Pending alerts per division, digests sent, retries, failures and delivery latency"""
+    return get_sms_dispatcher().stats()
@@ -0,0 +1,19 @@
+from datetime import date
+from typing import Optional
+from fastapi import APIRouter, HTTPException
+from config.db import db_session
+from utils.hotspots import parse_bbox, hotspots_in_box
+
+router = APIRouter()
+
+@router.get("/api/hotspots")
+async def get_hotspots(bbox: str, since: Optional[date] = None, crime_type: Optional[str] = None):
+    """Report counts per grid cell inside `bbox` (minLon,minLat,maxLon,maxLat) since a date"""
+    # Validated before borrowing a connection: a bad bbox is a 400 even with the database down
+    box = parse_bbox(bbox)
+    async with db_session() as connection:
+        try:
+            return await hotspots_in_box(connection, box, since, crime_type)
+        except Exception as e:
+            print(f"❌ Hotspot query failed: {e}")
+            raise HTTPException(status_code=500, detail="Error fetching hotspots")
@@ -1,13 +1,15 @@
 from fastapi import APIRouter, HTTPException
 from controllers.location_controller import get_nearest_location
+from models.location_model import NearestStation, NearestStationResponse
 
 router = APIRouter()
 
-@router.get("/api/location/nearest")
-def nearest_station(lat: float, lon: float):
+# Unset fields are left out, so `raw` only appears when include_raw=true
+@router.get("/api/location/nearest", response_model=NearestStationResponse, response_model_exclude_unset=True)
+async def nearest_station(lat: float, lon: float, include_raw: bool = False):
     try:
-        nearest = get_nearest_location(lat, lon)
-        return {"nearest_station": nearest}
+        nearest = await get_nearest_location(lat, lon)
+        return NearestStationResponse(nearest_station=NearestStation.from_station(nearest, include_raw))
     except Exception as e:
         print("🔥 ERROR in nearest_station:", str(e))
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,9 @@
+from fastapi import APIRouter, Response
+from utils.metrics import REGISTRY
+
+router = APIRouter()
+
+@router.get("/metrics", include_in_schema=False)
+def prometheus_metrics():
+    """Request, database and upstream-call metrics for this worker in Prometheus text format"""
+    return Response(REGISTRY.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
@@ -1,6 +1,6 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Response
 from pydantic import BaseModel
-from utils.sms_utils import send_sms_by_divcode
+from utils.sms_utils import get_sms_dispatcher
 
 router = APIRouter()
 
@@ -9,6 +9,9 @@ class SMSRequest(BaseModel):
     message: str
 
 @router.post("/api/send-sms")
-def send_sms_endpoint(request: SMSRequest):
-    result = send_sms_by_divcode(request.divcode, request.message)
-    return {"result": result}
+async def send_sms_endpoint(request: SMSRequest, response: Response):
+    # Queued for the dispatcher, which coalesces, rate-limits and retries per division
+    if not get_sms_dispatcher().enqueue(request.divcode, request.message):
+        return {"result": f"❌ Unknown division code: {request.divcode}"}
+    response.status_code = 202
+    return {"result": f"✅ Message queued for {request.divcode.upper()}"}
@@ -0,0 +1,30 @@
+from fastapi import APIRouter, HTTPException, Request, Response
+from utils.heatmap_tiles import TILE_MIN_ZOOM, TILE_MAX_ZOOM, get_tile_cache
+
+router = APIRouter()
+
+# Browsers and proxies may reuse a tile briefly, then revalidate cheaply with If-None-Match
+TILE_CACHE_CONTROL = "public, max-age=60, stale-while-revalidate=300"
+
+@router.get("/tiles/{z}/{x}/{y}")
+async def heatmap_tile(z: int, x: int, y: str, request: Request):
+    """256x256 PNG heatmap tile of report density (XYZ / Web Mercator scheme)"""
+    try:
+        y = int(y.removesuffix(".png"))
+    except ValueError:
+        raise HTTPException(status_code=404, detail="Tile not found")
+    if not TILE_MIN_ZOOM <= z <= TILE_MAX_ZOOM or not (0 <= x < 1 << z and 0 <= y < 1 << z):
+        raise HTTPException(status_code=404, detail="Tile not found")
+
+    try:
+        png, etag = await get_tile_cache().get((z, x, y))
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"❌ Tile render failed for {z}/{x}/{y}: {e}")
+        raise HTTPException(status_code=500, detail="Error rendering tile")
+
+    headers = {"ETag": etag, "Cache-Control": TILE_CACHE_CONTROL}
+    if etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=304, headers=headers)
+    return Response(content=png, media_type="image/png", headers=headers)
@@ -0,0 +1,169 @@
+import asyncio
+import time
+import pytest
+from utils.cache import InProcessSharedCache, SingleFlight, TieredCache, TTLCache
+
+def run(coro):
+    return asyncio.run(coro)
+
+class CountingLoader:
+    def __init__(self, value, delay=0.02):
+        self.value = value
+        self.delay = delay
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return self.value
+
+
+class BrokenSharedCache(InProcessSharedCache):
+    name = "broken"
+
+    async def get(self, key):
+        raise ConnectionError("shared tier down")
+
+    async def get_many(self, keys):
+        raise ConnectionError("shared tier down")
+
+    async def set(self, key, value, ttl):
+        raise ConnectionError("shared tier down")
+
+    async def delete(self, key):
+        raise ConnectionError("shared tier down")
+
+
+def test_concurrent_get_or_load_runs_one_load():
+    async def scenario():
+        cache = TieredCache("users", shared=InProcessSharedCache())
+        load = CountingLoader({"id": 1})
+        results = await asyncio.gather(*[cache.get_or_load(1, load) for _ in range(50)])
+        return cache, load, results
+
+    cache, load, results = run(scenario())
+    assert load.calls == 1
+    assert results == [{"id": 1}] * 50
+    assert cache.stats()["loads"] == 1
+    assert cache.stats()["coalesced"] == 49
+    assert cache.stats()["shared_misses"] == 1
+
+def test_load_in_one_worker_is_a_hit_in_another():
+    async def scenario():
+        shared = InProcessSharedCache()
+        first, second = TieredCache("users", shared=shared), TieredCache("users", shared=shared)
+        load = CountingLoader({"id": 7, "name": "Ann"})
+        await first.get_or_load(7, load)
+        value = await second.get_or_load(7, load)
+        return second, load, value
+
+    second, load, value = run(scenario())
+    assert value == {"id": 7, "name": "Ann"}
+    assert load.calls == 1
+    assert second.stats()["shared_hits"] == 1 and second.stats()["loads"] == 0
+
+def test_invalidate_removes_both_tiers():
+    async def scenario():
+        shared = InProcessSharedCache()
+        first, second = TieredCache("users", shared=shared), TieredCache("users", shared=shared)
+        await first.set(1, {"name": "old"})
+        await first.invalidate(1)
+        return await first.get(1), await second.get(1)
+
+    assert run(scenario()) == (None, None)
+
+def test_invalidate_during_load_does_not_store_stale_value():
+    async def scenario():
+        shared = InProcessSharedCache()
+        cache = TieredCache("users", shared=shared)
+        pending = asyncio.ensure_future(cache.get_or_load(1, CountingLoader({"name": "old"}, delay=0.05)))
+        await asyncio.sleep(0.01)
+        await cache.invalidate(1)
+        stale = await pending
+        stored = cache.local.get(1), await shared.get(cache._key(1))
+        # A caller after the invalidation starts a fresh load rather than joining the stale one
+        fresh = await cache.get_or_load(1, CountingLoader({"name": "new"}))
+        return stale, stored, fresh
+
+    stale, stored, fresh = run(scenario())
+    assert stale == {"name": "old"}
+    assert stored == (None, None)
+    assert fresh == {"name": "new"}
+
+def test_failing_shared_tier_falls_back_to_local():
+    async def scenario():
+        cache = TieredCache("users", shared=BrokenSharedCache())
+        load = CountingLoader({"id": 1})
+        first = await cache.get_or_load(1, load)
+        second = await cache.get_or_load(1, load)
+        many = await cache.get_many([1, 2])
+        await cache.invalidate(1)
+        return cache, load, first, second, many
+
+    cache, load, first, second, many = run(scenario())
+    assert first == second == {"id": 1}
+    assert many == [{"id": 1}, None]
+    assert load.calls == 1
+    # shared get + set on the load, get_many for key 2, delete on invalidate
+    assert cache.stats()["shared_errors"] == 4
+
+def test_entries_expire_after_ttl_in_both_tiers():
+    async def scenario():
+        shared = InProcessSharedCache()
+        cache = TieredCache("users", ttl=0.05, shared=shared)
+        await cache.set(1, {"id": 1})
+        fresh = await TieredCache("users", shared=shared).get(1)
+        await asyncio.sleep(0.06)
+        return fresh, await cache.get(1), await TieredCache("users", shared=shared).get(1)
+
+    assert run(scenario()) == ({"id": 1}, None, None)
+
+def test_local_ttl_bounds_staleness_with_a_shared_tier():
+    cache = TieredCache("users", ttl=30, shared=InProcessSharedCache(), local_ttl=5)
+    assert cache.local.ttl == 5
+    assert TieredCache("users", ttl=30, local_ttl=5).local.ttl == 30
+
+def test_ttl_cache_expiry_and_lru_eviction():
+    cache = TTLCache(maxsize=2, ttl=0.05)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") is None and cache.get("a") == 1
+    time.sleep(0.06)
+    assert cache.get("a") is None
+
+def test_cancelled_caller_does_not_fail_coalesced_callers():
+    async def scenario():
+        cache = TieredCache("users", shared=InProcessSharedCache())
+        load = CountingLoader({"id": 2}, delay=0.05)
+        first = asyncio.ensure_future(cache.get_or_load(2, load))
+        second = asyncio.ensure_future(cache.get_or_load(2, load))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second, load, await cache.get(2)
+
+    value, load, cached = run(scenario())
+    assert value == {"id": 2} and cached == {"id": 2}
+    assert load.calls == 1
+
+def test_single_flight_failure_reaches_every_caller_then_clears():
+    async def scenario():
+        flight = SingleFlight()
+        calls = 0
+
+        async def boom():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            raise ValueError("upstream failed")
+
+        results = await asyncio.gather(*[flight.do("k", boom) for _ in range(3)], return_exceptions=True)
+        retry = await asyncio.gather(flight.do("k", boom), return_exceptions=True)
+        return calls, results, retry
+
+    calls, results, retry = run(scenario())
+    assert all(isinstance(result, ValueError) for result in results + retry)
+    assert calls == 2
@@ -0,0 +1,68 @@
+from contextlib import asynccontextmanager
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from routes import crime_report_routes
+from utils.auth import get_current_user
+from utils.incidents import IncidentIndex
+
+REPORT = {"crime_type": "Theft", "location": "Somewhere", "email": "a@example.com",
+          "latitude": 1.3, "longitude": 103.8, "police_station": "Central NPC"}
+NEARBY = dict(REPORT, latitude=1.3003)
+
+class FlakyStore:
+    """Stands in for the database (direct mode) or the ingest queue; fails the first save"""
+
+    def __init__(self):
+        self.saved = []
+        self.fail_next = True
+
+    def save(self, report_uid):
+        if self.fail_next:
+            self.fail_next = False
+            raise RuntimeError("connection lost")
+        self.saved.append(report_uid)
+
+@pytest.fixture
+def store(monkeypatch):
+    store = FlakyStore()
+    index = IncidentIndex()
+    monkeypatch.setattr(crime_report_routes, "get_incident_index", lambda: index)
+
+    @asynccontextmanager
+    async def db_session():
+        yield object()
+
+    async def create(connection, report, user_id, report_uid, incident_id):
+        store.save(report_uid)
+
+    class Worker:
+        async def submit(self, report_uid, row):
+            store.save(report_uid)
+
+    monkeypatch.setattr(crime_report_routes, "db_session", db_session)
+    monkeypatch.setattr(crime_report_routes.crime_reports, "create", create)
+    monkeypatch.setattr(crime_report_routes, "get_ingest_worker", lambda: Worker())
+    store.index = index
+    return store
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.include_router(crime_report_routes.router)
+    app.dependency_overrides[get_current_user] = lambda: {"id": 1}
+    return TestClient(app, raise_server_exceptions=False)
+
+@pytest.mark.parametrize("mode", ["direct", "queue"])
+def test_failed_save_does_not_leave_a_phantom_incident(mode, store, client, monkeypatch):
+    monkeypatch.setenv("CRIME_REPORT_INGEST_MODE", mode)
+    assert client.post("/api/crime-report", json=REPORT).status_code == 500
+    assert store.index.stats()["tracked_reports"] == 0
+
+    first = client.post("/api/crime-report", json=NEARBY).json()
+    assert first["duplicate"] is False
+    assert first["incident_id"] == first["report_id"] == store.saved[0]
+
+    second = client.post("/api/crime-report", json=REPORT).json()
+    assert second["duplicate"] is True and second["incident_id"] == first["incident_id"]
+    assert store.index.stats()["incidents"] == 1
@@ -0,0 +1,35 @@
+from datetime import datetime, timezone
+import pytest
+from config.sqlite_db import create_sqlite_connection
+from models.crime_report_model import CrimeReportRequest
+from repositories import crime_reports
+from utils.ingest_queue import report_row
+
+@pytest.fixture
+def connection(tmp_path):
+    connection = create_sqlite_connection(str(tmp_path / "reports.sqlite3"))
+    yield connection
+    connection.close()
+
+def make_report(lat=1.3, lon=103.8, crime_type="Theft"):
+    return CrimeReportRequest(crime_type=crime_type, location="Somewhere", email="a@example.com",
+                              latitude=lat, longitude=lon, police_station="Central NPC")
+
+def fetch(connection, query):
+    cursor = connection.cursor()
+    try:
+        cursor.execute(query)
+        return cursor.fetchall()
+    finally:
+        cursor.close()
+
+def test_direct_and_queued_reports_use_the_same_utc_clock(connection):
+    report = make_report()
+    crime_reports.create.sync(connection, report, 1, "direct")
+    crime_reports.create_many.sync(connection, [report_row(report, 1, "queued")])
+
+    today = datetime.now(timezone.utc).date().isoformat()
+    stamps = fetch(connection, "SELECT submitted_at FROM crime_reports ORDER BY id")
+    assert [str(stamp)[:10] for (stamp,) in stamps] == [today, today]
+    cells = fetch(connection, "SELECT day, report_count FROM crime_report_cells")
+    assert [(str(day), count) for day, count in cells] == [(today, 2)]
@@ -0,0 +1,40 @@
+import numpy as np
+from utils.haversine import EARTH_RADIUS_KM, haversine, haversine_matrix, haversine_np
+
+def random_points(rng, n):
+    return rng.uniform(-90, 90, n), rng.uniform(-180, 180, n)
+
+def test_vectorized_versions_match_scalar_on_random_pairs():
+    rng = np.random.default_rng(3)
+    lats1, longs1 = random_points(rng, 500)
+    lats2, longs2 = random_points(rng, 500)
+    expected = [haversine(*pair) for pair in zip(lats1, longs1, lats2, longs2)]
+    np.testing.assert_allclose(haversine_np(lats1, longs1, lats2, longs2), expected, rtol=1e-12)
+
+def test_matrix_matches_scalar_for_every_pair():
+    rng = np.random.default_rng(4)
+    lats1, longs1 = random_points(rng, 40)
+    lats2, longs2 = random_points(rng, 60)
+    expected = [[haversine(lat1, long1, lat2, long2) for lat2, long2 in zip(lats2, longs2)]
+                for lat1, long1 in zip(lats1, longs1)]
+    matrix = haversine_matrix(lats1, longs1, lats2, longs2)
+    assert matrix.shape == (40, 60)
+    np.testing.assert_allclose(matrix, expected, rtol=1e-12)
+
+def test_identical_points_are_zero_apart():
+    rng = np.random.default_rng(5)
+    lats, longs = random_points(rng, 100)
+    assert all(haversine(lat, long, lat, long) == 0 for lat, long in zip(lats, longs))
+    assert not haversine_np(lats, longs, lats, longs).any()
+    assert not np.diag(haversine_matrix(lats, longs, lats, longs)).any()
+
+def test_antipodal_points_are_half_the_circumference_apart():
+    rng = np.random.default_rng(6)
+    lats, longs = random_points(rng, 100)
+    anti_lats, anti_longs = -lats, np.where(longs > 0, longs - 180, longs + 180)
+    half = np.pi * EARTH_RADIUS_KM
+    scalar = [haversine(*pair) for pair in zip(lats, longs, anti_lats, anti_longs)]
+    # asin is ill-conditioned next to 1, so antipodal distances are only good to ~1e-8
+    np.testing.assert_allclose(scalar, half, rtol=1e-7)
+    np.testing.assert_allclose(haversine_np(lats, longs, anti_lats, anti_longs), scalar, rtol=1e-12)
+    np.testing.assert_allclose(np.diag(haversine_matrix(lats, longs, anti_lats, anti_longs)), scalar, rtol=1e-12)
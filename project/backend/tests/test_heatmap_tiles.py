@@ -0,0 +1,38 @@
+import asyncio
+import os
+import threading
+from utils.heatmap_tiles import TileCache
+
+TILE = (12, 3230, 2030)
+
+def cache_with_tile_on_disk(tmp_path, monkeypatch):
+    cache = TileCache(str(tmp_path / "tiles"))
+    cache._write_disk(TILE, b"stale")
+
+    async def render(tile):
+        return (b"fresh", '"fresh"')
+
+    monkeypatch.setattr(cache, "_render", render)
+    return cache
+
+def test_invalidation_deletes_files_in_the_background(tmp_path, monkeypatch):
+    cache = cache_with_tile_on_disk(tmp_path, monkeypatch)
+    release = threading.Event()
+    # Hold the remover thread so the stale file is still on disk after invalidate returns
+    cache._remover.submit(release.wait)
+
+    cache.invalidate_tiles([TILE])
+    assert os.path.exists(cache._path(TILE))
+    # A doomed file is never served, even before it is deleted
+    assert asyncio.run(cache.get(TILE)) == (b"fresh", '"fresh"')
+    assert cache.stats()["pending_file_deletions"] == 1
+
+    release.set()
+    cache._remover.submit(lambda: None).result()
+    assert not os.path.exists(cache._path(TILE))
+    assert cache.stats()["pending_file_deletions"] == 0
+
+def test_disk_hit_is_served_when_not_invalidated(tmp_path, monkeypatch):
+    cache = cache_with_tile_on_disk(tmp_path, monkeypatch)
+    assert asyncio.run(cache.get(TILE))[0] == b"stale"
+    assert cache.disk_hits == 1
@@ -0,0 +1,108 @@
+import threading
+import pytest
+from fastapi import HTTPException
+from config.sqlite_db import create_sqlite_connection
+from repositories import crime_reports, hotspots
+from utils.hotspots import parse_bbox
+
+def report(uid, lat=1.3, lon=103.8, crime_type="Theft", submitted_at="2024-05-01 12:00:00"):
+    return (uid, 1, crime_type, "Somewhere", "a@example.com", lat, lon, "Central NPC", submitted_at, uid)
+
+BATCH = [
+    report("a"), report("b"), report("c", crime_type="Robbery"),
+    report("d", lat=1.35, lon=103.85), report("e", submitted_at="2024-05-02 08:00:00")
+]
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / "hotspots.sqlite3")
+    create_sqlite_connection(path).close()
+    return path
+
+@pytest.fixture
+def connection(db_path):
+    connection = create_sqlite_connection(db_path)
+    yield connection
+    connection.close()
+
+def cell_counts(connection):
+    cursor = connection.cursor()
+    try:
+        cursor.execute("SELECT day, cell_lat, cell_lon, crime_type, report_count FROM crime_report_cells")
+        return {(str(day), cell_lat, cell_lon, crime): count for day, cell_lat, cell_lon, crime, count in cursor.fetchall()}
+    finally:
+        cursor.close()
+
+def report_count(connection):
+    cursor = connection.cursor()
+    try:
+        cursor.execute("SELECT COUNT(*) FROM crime_reports")
+        return cursor.fetchall()[0][0]
+    finally:
+        cursor.close()
+
+def test_batch_counts_each_report_in_its_cell(connection):
+    assert crime_reports.create_many.sync(connection, BATCH) == 5
+    cell = hotspots.cell_of(1.3, 103.8)
+    assert cell_counts(connection) == {
+        ("2024-05-01",) + cell + ("Theft",): 2,
+        ("2024-05-01",) + cell + ("Robbery",): 1,
+        ("2024-05-01",) + hotspots.cell_of(1.35, 103.85) + ("Theft",): 1,
+        ("2024-05-02",) + cell + ("Theft",): 1,
+    }
+
+def test_replayed_batch_leaves_cell_counts_unchanged(connection):
+    assert crime_reports.create_many.sync(connection, BATCH) == 5
+    counts = cell_counts(connection)
+    assert crime_reports.create_many.sync(connection, BATCH) == 0
+    assert crime_reports.create_many.sync(connection, BATCH[:2] + [report("f")]) == 1
+    counts[("2024-05-01",) + hotspots.cell_of(1.3, 103.8) + ("Theft",)] += 1
+    assert cell_counts(connection) == counts
+    assert report_count(connection) == 6
+
+def test_uid_repeated_within_a_batch_is_counted_once(connection):
+    assert crime_reports.create_many.sync(connection, [report("a"), report("a")]) == 1
+    assert sum(cell_counts(connection).values()) == report_count(connection) == 1
+
+def test_concurrent_flushes_of_one_batch_count_it_once(db_path, connection):
+    inserted, errors = [], []
+
+    def flush():
+        worker_connection = create_sqlite_connection(db_path)
+        try:
+            inserted.append(crime_reports.create_many.sync(worker_connection, BATCH))
+        except Exception as e:
+            errors.append(e)
+        finally:
+            worker_connection.close()
+
+    threads = [threading.Thread(target=flush) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    assert sorted(inserted) == [0, 0, 0, 5]
+    assert sum(cell_counts(connection).values()) == report_count(connection) == 5
+
+def test_notify_reports_touched_cells_only_for_new_rows(connection):
+    seen = []
+    hotspots.subscribe(seen.append)
+    try:
+        crime_reports.create_many.sync(connection, BATCH[:1])
+        crime_reports.create_many.sync(connection, BATCH[:1])
+    finally:
+        hotspots._listeners.remove(seen.append)
+    assert seen == [{hotspots.cell_of(1.3, 103.8)}]
+
+@pytest.mark.parametrize("bbox", [
+    "nan,1.2,103.9,1.4", "103.6,1.2,inf,1.4", "-inf,1.2,103.9,1.4", "103.6,NaN,103.9,1.4",
+    "103.6,1.2,103.9", "a,b,c,d", "103.9,1.2,103.6,1.4", "100,1.2,103.9,1.4"
+])
+def test_parse_bbox_rejects_malformed_boxes(bbox):
+    with pytest.raises(HTTPException) as raised:
+        parse_bbox(bbox)
+    assert raised.value.status_code == 400
+
+def test_parse_bbox_accepts_a_box_in_geojson_order():
+    assert parse_bbox("103.6,1.2,103.9,1.4") == (103.6, 1.2, 103.9, 1.4)
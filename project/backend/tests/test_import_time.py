@@ -0,0 +1,15 @@
+import os
+from benchmarks.bench_import_time import LAZY_MODULES, import_profile
+
+# Same default as `python -m benchmarks.bench_import_time`; raise it on slow CI machines
+IMPORT_BUDGET_MS = float(os.getenv("IMPORT_BUDGET_MS", "1000"))
+
+def test_import_main_defers_heavy_modules_and_stays_within_budget():
+    # Best of three cold interpreters, so one noisy run does not fail the budget
+    profiles = [import_profile() for _ in range(3)]
+    for profile in profiles:
+        eager = [name for name in profile if name.split(".")[0] in LAZY_MODULES]
+        assert not eager, f"imported eagerly by `import main`: {sorted(eager)[:10]}"
+
+    total_ms = min(profile["main"][1] for profile in profiles) / 1000
+    assert total_ms <= IMPORT_BUDGET_MS, f"import main took {total_ms:.0f} ms, budget {IMPORT_BUDGET_MS:.0f} ms"
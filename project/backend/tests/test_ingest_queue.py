@@ -0,0 +1,50 @@
+import asyncio
+from utils import ingest_queue
+from utils.ingest_queue import IngestWorker, ReportQueue
+
+def row(uid):
+    return (uid, 1, "Theft", "Somewhere", "a@example.com", 1.3, 103.8, "Central NPC", "2024-05-01 12:00:00", uid)
+
+def fake_database(monkeypatch):
+    written = []
+
+    async def acquire_connection():
+        return object()
+
+    async def release_connection(connection):
+        pass
+
+    async def create_many(connection, rows):
+        written.extend(rows)
+        return len(rows)
+
+    monkeypatch.setattr(ingest_queue, "acquire_connection", acquire_connection)
+    monkeypatch.setattr(ingest_queue, "release_connection", release_connection)
+    monkeypatch.setattr(ingest_queue.crime_reports, "create_many", create_many)
+    return written
+
+def test_only_the_lock_holder_drains_a_shared_queue(tmp_path, monkeypatch):
+    written = fake_database(monkeypatch)
+    path = str(tmp_path / "queue.sqlite3")
+    first, second = IngestWorker(ReportQueue(path)), IngestWorker(ReportQueue(path))
+
+    async def scenario():
+        await first.submit("a", row("a"))
+        assert await first.flush_once() == 1
+        # Both processes enqueue into the same file, but only the holder flushes
+        await second.submit("b", row("b"))
+        assert await second.flush_once() == 0
+        assert [r[0] for r in written] == ["a"]
+        assert await first.flush_once() == 1
+
+        # Once the holder goes away the other worker takes over
+        await first.submit("c", row("c"))
+        first.queue.close()
+        assert await second.flush_once() == 1
+        assert second.stats()["draining"] is True
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        second.queue.close()
+    assert [r[0] for r in written] == ["a", "b", "c"]
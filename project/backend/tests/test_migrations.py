@@ -0,0 +1,44 @@
+import shutil
+from config.migrations import discover, migrate, missing_indexes, pending
+from config.sqlite_db import SqliteConnection, create_sqlite_connection
+
+def test_migrations_create_every_expected_index(tmp_path):
+    connection = create_sqlite_connection(str(tmp_path / "schema.sqlite3"))
+    try:
+        assert pending(connection) == []
+        assert missing_indexes(connection) == []
+    finally:
+        connection.close()
+
+def migrate_up_to(connection, version, directory):
+    for found, path in discover():
+        if found <= version:
+            shutil.copy(path, directory)
+    migrate(connection, str(directory))
+
+def test_reports_filed_before_report_uids_become_their_own_incidents(tmp_path):
+    connection = SqliteConnection(str(tmp_path / "legacy.sqlite3"))
+    try:
+        early = tmp_path / "early"
+        early.mkdir()
+        migrate_up_to(connection, "0003", early)
+        cursor = connection.cursor()
+        cursor.executemany(
+            "INSERT INTO crime_reports (crime_type, location, email, latitude, longitude, police_station) "
+            "VALUES (%s, %s, %s, %s, %s, %s)",
+            [("Theft", "Somewhere", "a@example.com", 1.3, 103.8, "Central NPC")] * 3
+        )
+        connection.commit()
+
+        migrate(connection)
+        assert pending(connection) == []
+        cursor.execute("SELECT report_uid, incident_id FROM crime_reports ORDER BY id")
+        rows = cursor.fetchall()
+        cursor.close()
+    finally:
+        connection.close()
+
+    uids = [uid for uid, _ in rows]
+    assert all(uid and len(uid) == 32 and "-" not in uid for uid in uids)
+    assert len(set(uids)) == 3
+    assert [incident for _, incident in rows] == uids
@@ -0,0 +1,146 @@
+import hashlib
+import json
+import numpy as np
+import pytest
+from utils import snapshot
+from utils.ranking_utils import RankingTable, load_ranking_table
+from utils.snapshot import FORMAT_VERSION, ReferenceSnapshot, SnapshotError, SnapshotFeatures, write_snapshot
+from utils.station_registry import load_station_registry
+
+DESCRIPTION = ("<center><table><tr><th>BLDG</th><td>{name}</td></tr>"
+               "<tr><th>DIVCODE</th><td>{divcode}</td></tr></table></center>")
+
+def write_geojson(path, n=25):
+    rng = np.random.default_rng(0)
+    features = []
+    for i in range(n):
+        # Some stations lack a DIVCODE row, and names include non-ASCII text
+        description = DESCRIPTION.format(name=f"Neighbourhood Police Centre {i} – Ō", divcode=chr(65 + i % 6))
+        if i % 7 == 3:
+            description = "<table><tr><th>BLDG</th><td>Post {}</td></tr></table>".format(i)
+        features.append({
+            "type": "Feature",
+            "properties": {"Name": f"kml_{i}", "Description": description},
+            "geometry": {"type": "Point", "coordinates": [rng.uniform(103.6, 104.0), rng.uniform(1.25, 1.45), 0.0]}
+        })
+    path.write_text(json.dumps({"type": "FeatureCollection", "features": features}), encoding="utf-8")
+
+def write_ranking_csv(path):
+    rows = [
+        "DataSeries,2023,2022,2021",
+        "Orphan Crime,1,2,3",
+        "Central Police Division,5,6,7",
+        "Theft,10,8,na",
+        "Robbery,3,3,3",
+        "Theft,12,9,1",
+        "Jurong Police Division,0,0,0",
+        "Outrage Of Modesty,4,2,-",
+        "Housebreaking,4,5,6",
+        "Bedok Police Division,1,1,1",
+        "Robbery,7,1,1",
+        "Central Police Division,0,0,0",
+        "Cheating,20,18,15",
+        "Theft,2,2,2",
+    ]
+    path.write_text("\n".join(rows) + "\n", encoding="utf-8")
+
+@pytest.fixture
+def sources(tmp_path):
+    stations, ranking = tmp_path / "stations.geojson", tmp_path / "ranking.csv"
+    write_geojson(stations)
+    write_ranking_csv(ranking)
+    return stations, ranking
+
+@pytest.fixture
+def built(tmp_path, sources):
+    stations, ranking = sources
+    registry = load_station_registry(str(stations), use_snapshot=False)
+    table = load_ranking_table(str(ranking), use_snapshot=False)
+    path = tmp_path / "reference.snapshot"
+    write_snapshot(str(path), registry, table, {"stations": str(stations), "ranking": str(ranking)})
+    return path, registry, table
+
+def assert_same_registry(actual, expected):
+    assert actual.names == expected.names
+    assert actual.divcodes == expected.divcodes
+    np.testing.assert_array_equal(actual.latitudes, expected.latitudes)
+    np.testing.assert_array_equal(actual.longitudes, expected.longitudes)
+    assert list(actual.features) == list(expected.features)
+    assert [actual.station(i) for i in range(len(actual))] == [expected.station(i) for i in range(len(expected))]
+
+def assert_same_table(actual, expected):
+    assert actual.stations == expected.stations
+    assert actual.crimes == expected.crimes
+    assert actual.years == expected.years
+    np.testing.assert_array_equal(actual.counts, expected.counts)
+    np.testing.assert_array_equal(actual.rank, expected.rank)
+    assert actual.to_dict() == expected.to_dict()
+    for year in range(len(expected.years)):
+        assert actual.top_crimes(3, year) == expected.top_crimes(3, year)
+
+def test_round_trip_matches_parsed_datasets(built):
+    path, registry, table = built
+    reference = ReferenceSnapshot(str(path))
+    assert reference.meta["format_version"] == FORMAT_VERSION
+    assert reference.meta["stations"] == len(registry)
+
+    names, divcodes, latitudes, longitudes, features = reference.stations()
+    assert isinstance(features, SnapshotFeatures)
+    assert features[-1] == registry.features[-1] and features[1:3] == list(registry.features[1:3])
+    rebuilt = type(registry)(registry.path, registry.mtime, names, divcodes, latitudes, longitudes, features)
+    assert_same_registry(rebuilt, registry)
+    assert None in registry.divcodes  # the None string ref survives the round trip
+
+    assert_same_table(RankingTable(*reference.ranking()), table)
+    # Numeric sections are views onto the mapping, not copies
+    assert not reference.ranking()[3].flags.owndata
+
+def test_loaders_use_current_snapshot_and_parse_stale_sources(built, sources, monkeypatch):
+    path, registry, table = built
+    stations, ranking = sources
+    original = snapshot.get_snapshot
+    monkeypatch.setattr(snapshot, "get_snapshot", lambda path_=None: original(str(path)))
+
+    from_snapshot = load_station_registry(str(stations))
+    assert isinstance(from_snapshot.features, SnapshotFeatures)
+    assert_same_registry(from_snapshot, registry)
+    assert_same_table(load_ranking_table(str(ranking)), table)
+
+    with open(ranking, "a", encoding="utf-8") as f:
+        f.write("Housebreaking,1,1,1\n")
+    reference = original(str(path))
+    assert reference.matches("stations", str(stations))
+    assert not reference.matches("ranking", str(ranking))
+    reparsed = load_ranking_table(str(ranking))
+    assert reparsed.counts[reparsed.station_pos["Central Police Division"]].sum() > \
+        table.counts[table.station_pos["Central Police Division"]].sum()
+
+    # A snapshot built from another file name is not used for it
+    assert not reference.covers("stations", str(stations.with_name("other.geojson")))
+
+def test_corrupted_section_fails_its_checksum(built, capsys):
+    path, registry, table = built
+    data = bytearray(path.read_bytes())
+    data[-1] ^= 0xFF  # last byte of the RNK_RNK payload
+    path.write_bytes(bytes(data))
+    with pytest.raises(SnapshotError, match="checksum"):
+        ReferenceSnapshot(str(path))
+    assert snapshot.get_snapshot(str(path)) is None
+    assert "Ignoring reference snapshot" in capsys.readouterr().out
+
+@pytest.mark.parametrize("patch, message", [
+    (lambda data: data[:4], "truncated"),
+    (lambda data: b"NOTSNAP\0" + data[8:], "not a reference snapshot"),
+    (lambda data: data[:8] + (FORMAT_VERSION + 1).to_bytes(4, "little") + data[12:], "format version"),
+])
+def test_truncated_foreign_and_future_files_are_rejected(built, patch, message):
+    path, _, _ = built
+    path.write_bytes(patch(path.read_bytes()))
+    with pytest.raises(SnapshotError, match=message):
+        ReferenceSnapshot(str(path))
+
+def test_file_digest_is_sha256_of_contents(tmp_path):
+    path = tmp_path / "blob"
+    payload = np.random.default_rng(1).bytes((1 << 20) * 2 + 123)
+    path.write_bytes(payload)
+    assert snapshot.file_digest(str(path)) == hashlib.sha256(payload).hexdigest()
@@ -0,0 +1,84 @@
+import numpy as np
+import pytest
+from utils.spatial_index import StationIndex
+
+def random_index(rng, n, lat_range=(1.2, 1.5), lon_range=(103.6, 104.1)):
+    return StationIndex(rng.uniform(*lat_range, n), rng.uniform(*lon_range, n))
+
+def assert_matches_brute_force(index, points, k, max_radius_km=None):
+    expected = [index.brute_force(lat, lon, k, max_radius_km) for lat, lon in points]
+    assert [index.query(lat, lon, k, max_radius_km) for lat, lon in points] == expected
+    assert index.query_many(points, k, max_radius_km) == expected
+
+@pytest.mark.parametrize("n", [1, 2, 9, 100, 2000])
+@pytest.mark.parametrize("k", [1, 5])
+def test_random_points_match_brute_force(n, k):
+    rng = np.random.default_rng(n * 10 + k)
+    index = random_index(rng, n)
+    points = list(zip(rng.uniform(1.1, 1.6, 300), rng.uniform(103.5, 104.2, 300)))
+    assert_matches_brute_force(index, points, k)
+
+def test_k_larger_than_station_count_returns_every_station():
+    rng = np.random.default_rng(1)
+    index = random_index(rng, 7)
+    points = list(zip(rng.uniform(1.2, 1.5, 50), rng.uniform(103.6, 104.1, 50)))
+    assert_matches_brute_force(index, points, k=20)
+    assert all(len(ranking) == 7 for ranking in index.query_many(points, k=20))
+
+def test_empty_index_and_non_positive_k():
+    empty = StationIndex([], [])
+    assert empty.query(1.3, 103.8) == [] and empty.query_many([(1.3, 103.8)]) == [[]]
+    index = random_index(np.random.default_rng(2), 10)
+    assert index.query(1.3, 103.8, k=0) == [] and index.query_many([(1.3, 103.8)], k=0) == [[]]
+    assert index.query_many([]) == []
+
+def test_duplicate_and_equidistant_stations_tie_by_station_order():
+    # Stations 0/3/5 share a position; 1, 2 and 4 sit on a circle around the query
+    lats = [1.30, 1.31, 1.29, 1.30, 1.30, 1.30]
+    lons = [103.80, 103.80, 103.80, 103.80, 103.81, 103.80]
+    index = StationIndex(lats, lons, leaf_size=1)
+    points = [(1.30, 103.80), (1.30, 103.805), (1.305, 103.80)]
+    for k in (1, 2, 3, 4, 6):
+        assert_matches_brute_force(index, points, k)
+    assert [i for i, _ in index.query(1.30, 103.80, k=3)] == [0, 3, 5]
+
+@pytest.mark.parametrize("lat_range, lon_range", [
+    ((-10, 10), (179.0, 180.0)),
+    ((-10, 10), (-180.0, -179.0)),
+    ((89.0, 90.0), (-180.0, 180.0)),
+    ((-90.0, -89.0), (-180.0, 180.0)),
+])
+def test_antimeridian_and_poles(lat_range, lon_range):
+    rng = np.random.default_rng(3)
+    index = StationIndex(np.concatenate([rng.uniform(*lat_range, 200), rng.uniform(-90, 90, 50)]),
+                         np.concatenate([rng.uniform(*lon_range, 200), rng.uniform(-180, 180, 50)]))
+    points = list(zip(rng.uniform(*lat_range, 200), rng.uniform(*lon_range, 200)))
+    points += [(0.0, 180.0), (0.0, -180.0), (90.0, 0.0), (-90.0, 0.0)]
+    for k in (1, 5):
+        assert_matches_brute_force(index, points, k)
+    # Across the antimeridian the nearest station is the one on the other side
+    across = StationIndex([0.0, 0.0], [179.99, 170.0])
+    assert across.query(0.0, -179.99, k=1)[0][0] == 0
+
+def test_max_radius_cut_off_at_and_just_past_a_station():
+    rng = np.random.default_rng(4)
+    index = random_index(rng, 300)
+    lat, lon = 1.35, 103.85
+    ranking = index.brute_force(lat, lon, k=len(index))
+    for position in (0, 1, 10, 150, 299):
+        station, distance = ranking[position]
+        inside = index.query(lat, lon, k=len(index), max_radius_km=distance)
+        assert station in [i for i, _ in inside]
+        just_short = float(np.nextafter(distance, 0))
+        outside = index.query(lat, lon, k=len(index), max_radius_km=just_short)
+        assert station not in [i for i, _ in outside]
+        for radius in (distance, just_short, distance * (1 + 1e-9)):
+            for k in (1, 5, len(index)):
+                assert_matches_brute_force(index, [(lat, lon)], k, radius)
+
+def test_max_radius_on_random_points():
+    rng = np.random.default_rng(5)
+    index = random_index(rng, 500)
+    points = list(zip(rng.uniform(1.1, 1.6, 200), rng.uniform(103.5, 104.2, 200)))
+    for radius in (0.0, 0.5, 2.0, 50.0):
+        assert_matches_brute_force(index, points, 5, radius)
@@ -1 +1 @@
-from .haversine import haversine
\ No newline at end of file
+from .haversine import haversine, haversine_np, haversine_matrix
\ No newline at end of file
@@ -0,0 +1,81 @@
+import hmac
+import os
+import time
+import jwt
+from config.env import load_env
+from fastapi import Header, HTTPException
+from config.db import db_session
+from repositories import users
+from utils.cache import TTLCache, TieredCache, get_shared_cache
+
+load_env()
+
+# Verified claims are reused until the token expires, capped for tokens without `exp`.
+# Per worker only: verifying an HS256 token is cheaper than a round trip to the shared tier
+TOKEN_CACHE_MAX_TTL = float(os.getenv("TOKEN_CACHE_MAX_TTL", "900"))
+token_cache = TTLCache(maxsize=int(os.getenv("TOKEN_CACHE_SIZE", "10000")), ttl=TOKEN_CACHE_MAX_TTL)
+
+# User rows are cached briefly and shared across workers; profile updates invalidate their entry explicitly
+user_cache = TieredCache("users", maxsize=int(os.getenv("USER_CACHE_SIZE", "10000")),
+                         ttl=float(os.getenv("USER_CACHE_TTL", "30")), shared=get_shared_cache(),
+                         local_ttl=float(os.getenv("CACHE_LOCAL_TTL", "5")))
+
+def jwt_secret() -> str:
+    return os.getenv("JWT_SECRET", "your_jwt_secret")
+
+def decode_bearer(authorization: str) -> dict:
+    """Verify a `Bearer <jwt>` header once and serve repeat calls from the claims cache"""
+    if not authorization.startswith("Bearer "):
+        raise HTTPException(status_code=400, detail="Invalid Authorization header format")
+
+    token = authorization.split("Bearer ")[1]
+    claims = token_cache.get(token)
+    if claims is not None:
+        return claims
+
+    try:
+        claims = jwt.decode(token, jwt_secret(), algorithms=["HS256"])
+    except jwt.ExpiredSignatureError:
+        raise HTTPException(status_code=401, detail="Token has expired")
+    except jwt.InvalidTokenError:
+        raise HTTPException(status_code=401, detail="Invalid token")
+
+    ttl = TOKEN_CACHE_MAX_TTL
+    if "exp" in claims:
+        ttl = min(ttl, claims["exp"] - time.time())
+    if ttl > 0:
+        token_cache.set(token, claims, ttl=ttl)
+    return claims
+
+async def load_user(user_id: int):
+    """User row (id, name, email, phone) via the short-TTL cache, hitting the DB only on a miss"""
+    async def fetch():
+        async with db_session() as connection:
+            return await users.get_by_id(connection, user_id)
+
+    return await user_cache.get_or_load(user_id, fetch)
+
+async def invalidate_user(user_id: int) -> None:
+    await user_cache.invalidate(user_id)
+
+async def get_current_user_id(authorization: str = Header(...)) -> int:
+    """FastAPI dependency: the verified token's userId, without touching the database"""
+    user_id = decode_bearer(authorization).get("userId")
+    if not user_id:
+        raise HTTPException(status_code=400, detail="Invalid token")
+    return user_id
+
+async def get_current_user(authorization: str = Header(...)) -> dict:
+    """FastAPI dependency: the authenticated user's row, 404 if the account no longer exists"""
+    user = await load_user(await get_current_user_id(authorization))
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    return dict(user)
+
+async def require_admin(x_admin_key: str = Header(None)) -> None:
+    """FastAPI dependency for operator endpoints: the X-Admin-Key header must match ADMIN_API_KEY"""
+    expected = os.getenv("ADMIN_API_KEY")
+    if not expected:
+        raise HTTPException(status_code=503, detail="Admin API is not configured")
+    if not x_admin_key or not hmac.compare_digest(x_admin_key, expected):
+        raise HTTPException(status_code=403, detail="Invalid admin key")
@@ -0,0 +1,218 @@
+import asyncio
+import csv
+import io
+import json
+import uuid
+from datetime import datetime
+from functools import lru_cache
+from typing import AsyncIterator, Iterable, List, Optional, Tuple
+from pydantic import EmailStr, TypeAdapter, ValidationError
+from config.db import db_session, run_db
+from models.crime_report_model import CrimeReportRequest
+from repositories import crime_reports, users
+
+# Per-row error details returned to the caller are capped so a bad file cannot bloat the response
+MAX_REPORTED_ERRORS = 100
+
+
+class _ImportedReport(CrimeReportRequest):
+    # Same schema, but the email check (an IDNA round trip costing far more than
+    # the rest of the row) runs through `_normalize_email`, once per distinct address
+    email: str
+
+_chunk_adapter = TypeAdapter(List[_ImportedReport])
+_email_adapter = TypeAdapter(EmailStr)
+
+@lru_cache(maxsize=65536)
+def _normalize_email(email: str) -> str:
+    return _email_adapter.validate_python(email)
+
+# -----------------------------
+# Parsing
+# -----------------------------
+async def iter_lines(stream: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Complete text lines from a byte stream, without holding more than one partial line"""
+    pending = b""
+    async for chunk in stream:
+        pending += chunk
+        lines = pending.split(b"\n")
+        pending = lines.pop()
+        for line in lines:
+            yield line.decode("utf-8").rstrip("\r")
+    if pending.strip():
+        yield pending.decode("utf-8").rstrip("\r")
+
+async def iter_records(lines: AsyncIterator[str], fmt: str) -> AsyncIterator[Tuple[int, Optional[dict], Optional[str]]]:
+    """
+    (line number, record, parse error) for every non-blank line. CSV input needs a
+    header row and one record per line (quoted fields may not span lines).
+    """
+    header = None
+    line_no = 0
+    async for line in lines:
+        line_no += 1
+        if not line.strip():
+            continue
+        if fmt == "csv":
+            fields = next(csv.reader([line]))
+            if header is None:
+                header = [name.strip() for name in fields]
+                continue
+            if len(fields) != len(header):
+                yield line_no, None, f"expected {len(header)} fields, got {len(fields)}"
+                continue
+            yield line_no, dict(zip(header, fields)), None
+        else:
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                yield line_no, None, f"invalid JSON: {e}"
+                continue
+            if not isinstance(record, dict):
+                yield line_no, None, "expected a JSON object"
+                continue
+            yield line_no, record, None
+
+# -----------------------------
+# Validation
+# -----------------------------
+def _check_email(line_no: int, report: _ImportedReport, errors: List[dict]) -> bool:
+    try:
+        report.email = _normalize_email(report.email)
+        return True
+    except ValidationError as e:
+        errors.append({"line": line_no, "error": f"email: {e.errors()[0]['msg']}"})
+        return False
+
+def validate_chunk(numbered: List[Tuple[int, dict]]) -> Tuple[List[Tuple[int, dict, CrimeReportRequest]], List[dict]]:
+    """
+    Validate a chunk of records against the CrimeReportRequest schema in one
+    pass, falling back to row-by-row validation only when the chunk contains a
+    bad row. CPU-bound; callers run it off the event loop.
+    """
+    valid, errors = [], []
+    try:
+        reports = _chunk_adapter.validate_python([record for _, record in numbered])
+        for (line_no, record), report in zip(numbered, reports):
+            if _check_email(line_no, report, errors):
+                valid.append((line_no, record, report))
+        return valid, errors
+    except ValidationError:
+        pass
+
+    for line_no, record in numbered:
+        try:
+            report = _ImportedReport.model_validate(record)
+        except ValidationError as e:
+            errors.append({"line": line_no, "error": "; ".join(
+                f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors()
+            )})
+            continue
+        if _check_email(line_no, report, errors):
+            valid.append((line_no, record, report))
+    return valid, errors
+
+def _submitted_at(value) -> str:
+    if not value:
+        return crime_reports.submitted_now()
+    # Normalises ISO 8601 input (including a `T` separator) to MySQL's DATETIME format
+    return datetime.fromisoformat(str(value)).strftime("%Y-%m-%d %H:%M:%S")
+
+def to_rows(valid: List[Tuple[int, dict, CrimeReportRequest]], user_ids: dict) -> Tuple[List[tuple], List[dict]]:
+    """Rows shaped like crime_reports.INSERT_COLUMNS; user_id comes from the record or the email owner"""
+    rows, errors = [], []
+    for line_no, record, report in valid:
+        try:
+            user_id = record.get("user_id") or user_ids.get(report.email)
+            report_uid = record.get("report_uid") or uuid.uuid4().hex
+            rows.append((
+                report_uid,
+                int(user_id) if user_id else None,
+                report.crime_type, report.location, report.email, report.latitude, report.longitude,
+                report.police_station, _submitted_at(record.get("submitted_at")),
+                record.get("incident_id") or report_uid
+            ))
+        except ValueError as e:
+            errors.append({"line": line_no, "error": str(e)})
+    return rows, errors
+
+# -----------------------------
+# Import
+# -----------------------------
+async def import_reports(stream: AsyncIterator[bytes], fmt: str, chunk_size: int = 1000) -> dict:
+    """
+    Stream NDJSON or CSV crime reports into MySQL. Records are validated and
+    written `chunk_size` at a time with executemany, one commit per chunk, so
+    memory stays flat regardless of file size. Rows carrying an existing
+    report_uid are skipped, which makes re-running an import safe.
+    """
+    summary = {"received": 0, "inserted": 0, "duplicates": 0, "invalid": 0, "errors": []}
+
+    def report_errors(errors: Iterable[dict]) -> None:
+        for error in errors:
+            summary["invalid"] += 1
+            if len(summary["errors"]) < MAX_REPORTED_ERRORS:
+                summary["errors"].append(error)
+
+    async with db_session() as connection:
+        async def flush(chunk: List[Tuple[int, dict]]) -> None:
+            valid, errors = await asyncio.get_running_loop().run_in_executor(None, validate_chunk, chunk)
+            report_errors(errors)
+            emails = {report.email for _, record, report in valid if not record.get("user_id")}
+            user_ids = await users.ids_by_email(connection, emails) if emails else {}
+            rows, errors = to_rows(valid, user_ids)
+            report_errors(errors)
+            inserted = await crime_reports.create_many(connection, rows)
+            summary["inserted"] += inserted
+            summary["duplicates"] += len(rows) - inserted
+
+        chunk: List[Tuple[int, dict]] = []
+        async for line_no, record, error in iter_records(iter_lines(stream), fmt):
+            summary["received"] += 1
+            if error:
+                report_errors([{"line": line_no, "error": error}])
+                continue
+            chunk.append((line_no, record))
+            if len(chunk) >= chunk_size:
+                await flush(chunk)
+                chunk = []
+        if chunk:
+            await flush(chunk)
+
+    return summary
+
+# -----------------------------
+# Export
+# -----------------------------
+def encode_rows(rows: List[tuple], fmt: str, header: bool = False) -> bytes:
+    if fmt == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator="\n")
+        if header:
+            writer.writerow(crime_reports.EXPORT_COLUMNS)
+        writer.writerows(rows)
+        return buffer.getvalue().encode("utf-8")
+    return "".join(
+        json.dumps(dict(zip(crime_reports.EXPORT_COLUMNS, row)), default=str) + "\n" for row in rows
+    ).encode("utf-8")
+
+async def export_reports(fmt: str, chunk_size: int = 5000) -> AsyncIterator[bytes]:
+    """
+    Stream every crime report as NDJSON or CSV. Rows come off an unbuffered
+    (server-side) cursor `chunk_size` at a time, so only one chunk is ever in memory.
+    """
+    async with db_session() as connection:
+        chunks = crime_reports.iter_export_chunks(connection, chunk_size)
+        try:
+            first = True
+            while True:
+                rows = await run_db(next, chunks, None)
+                if rows is None:
+                    break
+                yield encode_rows(rows, fmt, header=first)
+                first = False
+            if first and fmt == "csv":
+                yield encode_rows([], fmt, header=True)
+        finally:
+            # Closes the cursor on the DB executor, also when the client disconnects mid-stream
+            await run_db(chunks.close)
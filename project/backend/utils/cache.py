@@ -0,0 +1,328 @@
+import asyncio
+import itertools
+import os
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional
+import orjson
+from utils.metrics import REGISTRY
+
+_MISSING = object()
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries also expire `ttl` seconds after insertion"""
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 300):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                self.misses += 1
+                return default
+            value, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        return {"size": len(self._data), "maxsize": self.maxsize, "hits": self.hits, "misses": self.misses}
+
+
+# -----------------------------
+# Request coalescing
+# -----------------------------
+class SingleFlight:
+    """Runs one load per key at a time; concurrent callers for that key await the same result"""
+
+    def __init__(self):
+        self.coalesced = 0
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+
+    async def do(self, key: Hashable, load: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            task = asyncio.ensure_future(load())
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._finished(key, done))
+        # The load runs in its own task: cancelling one caller must not cancel it for the others
+        return await asyncio.shield(task)
+
+    def _finished(self, key: Hashable, task: asyncio.Future) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Mark retrieved so a failure whose callers were all cancelled is not logged as unhandled
+        if not task.cancelled():
+            task.exception()
+
+    def forget(self, key: Hashable) -> None:
+        """Later callers start a fresh load instead of joining the one in flight"""
+        self._inflight.pop(key, None)
+
+# -----------------------------
+# Shared tier backends
+# -----------------------------
+class InProcessSharedCache:
+    """
+    Stand-in for the shared tier that lives in this process: byte values with
+    expiry, the same contract as Redis. Used by tests and single-worker runs;
+    workers in separate processes do not see each other's entries.
+    """
+    name = "memory"
+
+    def __init__(self):
+        self._data: Dict[str, tuple] = {}
+
+    async def get(self, key: str) -> Optional[bytes]:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        if entry[1] <= time.monotonic():
+            del self._data[key]
+            return None
+        return entry[0]
+
+    async def get_many(self, keys: List[str]) -> List[Optional[bytes]]:
+        return [await self.get(key) for key in keys]
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        self._data[key] = (value, time.monotonic() + ttl)
+
+    async def delete(self, key: str) -> None:
+        self._data.pop(key, None)
+
+    async def aclose(self) -> None:
+        self._data.clear()
+
+
+class RedisSharedCache:
+    """Shared tier on a Redis-compatible server, reachable by every worker"""
+    name = "redis"
+
+    def __init__(self, url: str, timeout_s: float = 0.05):
+        # Optional dependency, only needed when CACHE_BACKEND=redis
+        import redis.asyncio as redis
+        self._client = redis.from_url(url, socket_timeout=timeout_s, socket_connect_timeout=timeout_s)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self._client.get(key)
+
+    async def get_many(self, keys: List[str]) -> List[Optional[bytes]]:
+        return await self._client.mget(keys)
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        await self._client.set(key, value, px=max(1, int(ttl * 1000)))
+
+    async def delete(self, key: str) -> None:
+        await self._client.delete(key)
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+_shared_cache = None
+
+def get_shared_cache():
+    """The process-wide shared tier selected by CACHE_BACKEND (none, memory or redis); None when disabled"""
+    global _shared_cache
+    if _shared_cache is None:
+        backend = os.getenv("CACHE_BACKEND", "none").lower()
+        if backend == "redis":
+            _shared_cache = RedisSharedCache(
+                os.getenv("REDIS_URL", "redis://127.0.0.1:6379/0"),
+                timeout_s=float(os.getenv("CACHE_SHARED_TIMEOUT_MS", "50")) / 1000
+            )
+        elif backend == "memory":
+            _shared_cache = InProcessSharedCache()
+        elif backend != "none":
+            raise ValueError(f"Unknown CACHE_BACKEND: {backend}")
+    return _shared_cache
+
+async def close_shared_cache() -> None:
+    global _shared_cache
+    if _shared_cache is not None:
+        await _shared_cache.aclose()
+        _shared_cache = None
+
+# -----------------------------
+# Two-tier cache
+# -----------------------------
+_tiered_caches: "weakref.WeakSet[TieredCache]" = weakref.WeakSet()
+
+class TieredCache:
+    """
+    Local TTLCache in front of an optional shared tier that every worker reads
+    and writes, so a value loaded by one worker is a hit in the others. Values
+    cross the shared tier as JSON. A failing shared tier counts as a miss: the
+    cache degrades to per-worker instead of failing the request.
+    """
+
+    def __init__(self, namespace: str, maxsize: int = 1024, ttl: float = 300, shared=None,
+                 local_ttl: Optional[float] = None):
+        self.namespace = namespace
+        self.ttl = ttl
+        self.shared = shared
+        # Other workers cannot evict this worker's copy, so with a shared tier the
+        # local TTL bounds how long an invalidated entry is still served elsewhere
+        if shared is not None and local_ttl is not None:
+            ttl = min(ttl, local_ttl)
+        self.local = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.shared_hits = 0
+        self.shared_misses = 0
+        self.shared_errors = 0
+        self.loads = 0
+        self._shared_down = False
+        self._flight = SingleFlight()
+        self._invalidated_at = TTLCache(maxsize=maxsize, ttl=self.ttl)
+        self._clock = itertools.count()
+        _tiered_caches.add(self)
+
+    def _key(self, key: Hashable) -> str:
+        return f"crimewatch:{self.namespace}:{key!r}"
+
+    async def _shared_call(self, call: Awaitable[Any], default: Any = None) -> Any:
+        try:
+            result = await call
+        except Exception as e:
+            self.shared_errors += 1
+            if not self._shared_down:
+                print(f"⚠️ Shared cache '{self.shared.name}' unavailable for {self.namespace}, "
+                      f"using local tier only: {e!r}")
+                self._shared_down = True
+            return default
+        if self._shared_down:
+            print(f"✅ Shared cache '{self.shared.name}' reachable again for {self.namespace}")
+            self._shared_down = False
+        return result
+
+    def _promote(self, key: Hashable, raw: Optional[bytes]) -> Any:
+        if raw is None:
+            self.shared_misses += 1
+            return None
+        self.shared_hits += 1
+        value = orjson.loads(raw)
+        self.local.set(key, value)
+        return value
+
+    async def get(self, key: Hashable) -> Any:
+        value = self.local.get(key)
+        if value is not None or self.shared is None:
+            return value
+        return self._promote(key, await self._shared_call(self.shared.get(self._key(key))))
+
+    async def get_many(self, keys: List[Hashable]) -> List[Any]:
+        """Values for `keys` (None where missing), one shared-tier round trip for all local misses"""
+        values = [self.local.get(key) for key in keys]
+        missing = [i for i, value in enumerate(values) if value is None]
+        if not missing or self.shared is None:
+            return values
+        raws = await self._shared_call(self.shared.get_many([self._key(keys[i]) for i in missing]),
+                                       default=[None] * len(missing))
+        for i, raw in zip(missing, raws):
+            values[i] = self._promote(keys[i], raw)
+        return values
+
+    async def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        ttl = self.ttl if ttl is None else ttl
+        self.local.set(key, value, ttl=min(ttl, self.local.ttl))
+        if self.shared is not None:
+            await self._shared_call(self.shared.set(self._key(key), orjson.dumps(value), ttl))
+
+    async def get_or_load(self, key: Hashable, load: Callable[[], Awaitable[Any]],
+                          ttl: Optional[float] = None) -> Any:
+        """Cached value for `key`, else the result of `load()`, run once however many callers miss together"""
+        value = self.local.get(key)
+        if value is not None:
+            return value
+        return await self._flight.do(key, lambda: self._load(key, load, ttl))
+
+    async def _load(self, key: Hashable, load: Callable[[], Awaitable[Any]], ttl: Optional[float]) -> Any:
+        started = next(self._clock)
+        if self.shared is not None:
+            value = self._promote(key, await self._shared_call(self.shared.get(self._key(key))))
+            if value is not None:
+                return value
+        value = await load()
+        self.loads += 1
+        # A value read before an invalidation landed is stale: return it to this caller, don't keep it
+        if value is not None and self._invalidated_at.get(key, -1) < started:
+            await self.set(key, value, ttl)
+        return value
+
+    async def invalidate(self, key: Hashable) -> None:
+        self._invalidated_at.set(key, next(self._clock))
+        self._flight.forget(key)
+        self.local.invalidate(key)
+        if self.shared is not None:
+            await self._shared_call(self.shared.delete(self._key(key)))
+
+    def clear(self) -> None:
+        """Drop this worker's local tier; shared entries expire on their own TTL"""
+        self.local.clear()
+
+    def stats(self) -> dict:
+        return {
+            "local": self.local.stats(),
+            "shared": self.shared.name if self.shared is not None else None,
+            "shared_hits": self.shared_hits,
+            "shared_misses": self.shared_misses,
+            "shared_errors": self.shared_errors,
+            "loads": self.loads,
+            "coalesced": self._flight.coalesced
+        }
+
+def _tiered_cache_metrics():
+    caches = sorted(_tiered_caches, key=lambda cache: cache.namespace)
+    lookups, loads, coalesced, errors = [], [], [], []
+    for cache in caches:
+        stats = cache.stats()
+        labels = {"cache": cache.namespace}
+        lookups += [
+            ("cache_lookups_total", {**labels, "tier": "local", "result": "hit"}, stats["local"]["hits"]),
+            ("cache_lookups_total", {**labels, "tier": "local", "result": "miss"}, stats["local"]["misses"]),
+            ("cache_lookups_total", {**labels, "tier": "shared", "result": "hit"}, stats["shared_hits"]),
+            ("cache_lookups_total", {**labels, "tier": "shared", "result": "miss"}, stats["shared_misses"])
+        ]
+        loads.append(("cache_loads_total", labels, stats["loads"]))
+        coalesced.append(("cache_coalesced_total", labels, stats["coalesced"]))
+        errors.append(("cache_shared_errors_total", labels, stats["shared_errors"]))
+    return [
+        ("cache_lookups_total", "counter", "Cache lookups by tier and result", lookups),
+        ("cache_loads_total", "counter", "Values loaded from the source after missing both tiers", loads),
+        ("cache_coalesced_total", "counter", "Callers that joined a load already in flight", coalesced),
+        ("cache_shared_errors_total", "counter", "Shared-tier calls that failed and fell back", errors)
+    ]
+
+REGISTRY.register_collector(_tiered_cache_metrics)
@@ -1,4 +1,7 @@
 from math import radians, sin, cos, sqrt, asin
+import numpy as np
+
+EARTH_RADIUS_KM = 6371  # Use 3956 for miles
 
 def haversine(lat1, long1, lat2, long2):
     """
@@ -12,5 +15,30 @@ def haversine(lat1, long1, lat2, long2):
     dlat = lat2 - lat1
     a = (sin(dlat / 2) ** 2) + cos(lat1) * cos(lat2) * (sin(dlon / 2) ** 2)
     c = 2 * asin(sqrt(a))
-    r = 6371  # Radius of earth in kilometers. Use 3956 for miles
-    return c * r
\ No newline at end of file
+    return c * EARTH_RADIUS_KM
+
+def haversine_np(lat1, long1, lat2, long2):
+    """
+    Vectorized haversine in kilometers. Arguments are scalars or arrays in decimal
+    degrees and broadcast like NumPy operands, so one origin against an array of
+    destinations (or matching arrays of pairs) is computed in a single pass.
+    """
+    lat1, long1, lat2, long2 = (np.radians(np.asarray(v, dtype=np.float64)) for v in (lat1, long1, lat2, long2))
+
+    dlon = long2 - long1
+    dlat = lat2 - lat1
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlon / 2) ** 2
+    c = 2 * np.arcsin(np.sqrt(a))
+    return c * EARTH_RADIUS_KM
+
+
+def haversine_matrix(lats1, longs1, lats2, longs2):
+    """
+    Pairwise distance matrix in kilometers: entry [i, j] is the distance from
+    origin (lats1[i], longs1[i]) to destination (lats2[j], longs2[j])
+    """
+    lats1 = np.asarray(lats1, dtype=np.float64).reshape(-1, 1)
+    longs1 = np.asarray(longs1, dtype=np.float64).reshape(-1, 1)
+    lats2 = np.asarray(lats2, dtype=np.float64).reshape(1, -1)
+    longs2 = np.asarray(longs2, dtype=np.float64).reshape(1, -1)
+    return haversine_np(lats1, longs1, lats2, longs2)
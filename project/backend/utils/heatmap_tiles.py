@@ -0,0 +1,265 @@
+import asyncio
+import hashlib
+import itertools
+import math
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+import numpy as np
+from config.env import load_env
+from config.db import db_session
+from repositories import hotspots
+from repositories.hotspots import CELL_DEG
+from utils.cache import TTLCache
+from utils.png import encode_rgba
+
+load_env()
+
+TILE_SIZE = 256
+TILE_MIN_ZOOM = int(os.getenv("TILE_MIN_ZOOM", "8"))
+TILE_MAX_ZOOM = int(os.getenv("TILE_MAX_ZOOM", "16"))
+TILE_CACHE_DIR = os.getenv("TILE_CACHE_DIR", "data/tiles")
+
+# Reports per pixel at which the heat colour is ~63% of full intensity. A fixed
+# scale (rather than per-tile normalisation) keeps adjacent tiles seamless.
+TILE_SATURATION = float(os.getenv("TILE_SATURATION", "4"))
+
+# Colour ramp from faint yellow to dark red, indexed by intensity 0..1
+_RAMP_STOPS = np.array([0.0, 0.35, 0.7, 1.0])
+_RAMP_RGB = np.array([[255, 237, 160], [254, 178, 76], [240, 59, 32], [189, 0, 38]], dtype=np.float64)
+_MAX_ALPHA = 210
+
+Tile = Tuple[int, int, int]
+
+# -----------------------------
+# Web Mercator helpers
+# -----------------------------
+def lon_to_px(lon: float, z: int) -> float:
+    return (lon + 180.0) / 360.0 * TILE_SIZE * (1 << z)
+
+def lat_to_px(lat: float, z: int) -> float:
+    lat = max(min(lat, 85.05112878), -85.05112878)
+    s = math.sin(math.radians(lat))
+    return (0.5 - math.log((1 + s) / (1 - s)) / (4 * math.pi)) * TILE_SIZE * (1 << z)
+
+def px_to_lon(px: float, z: int) -> float:
+    return px / (TILE_SIZE * (1 << z)) * 360.0 - 180.0
+
+def px_to_lat(px: float, z: int) -> float:
+    n = math.pi - 2 * math.pi * px / (TILE_SIZE * (1 << z))
+    return math.degrees(math.atan(math.sinh(n)))
+
+def kernel_sigma_px(z: int) -> float:
+    """Gaussian spread for one grid cell: about its on-screen size, clamped to stay visible and cheap"""
+    cell_px = lon_to_px(CELL_DEG, z) - lon_to_px(0.0, z)
+    return min(max(cell_px * 0.6, 3.0), 48.0)
+
+def kernel_radius_px(z: int) -> int:
+    return int(math.ceil(3 * kernel_sigma_px(z)))
+
+def tiles_for_cells(cells: Iterable[Tuple[int, int]], min_zoom: int = TILE_MIN_ZOOM,
+                    max_zoom: int = TILE_MAX_ZOOM) -> Set[Tile]:
+    """Every tile, at every served zoom, whose pixels a report in one of `cells` can colour"""
+    touched: Set[Tile] = set()
+    for cell_lat, cell_lon in cells:
+        lat, lon = (cell_lat + 0.5) * CELL_DEG, (cell_lon + 0.5) * CELL_DEG
+        for z in range(min_zoom, max_zoom + 1):
+            r = kernel_radius_px(z)
+            x, y = lon_to_px(lon, z), lat_to_px(lat, z)
+            last = (1 << z) - 1
+            for tx in range(max(0, int((x - r) // TILE_SIZE)), min(last, int((x + r) // TILE_SIZE)) + 1):
+                for ty in range(max(0, int((y - r) // TILE_SIZE)), min(last, int((y + r) // TILE_SIZE)) + 1):
+                    touched.add((z, tx, ty))
+    return touched
+
+# -----------------------------
+# Rendering
+# -----------------------------
+def tile_query_box(z: int, x: int, y: int) -> Tuple[Tuple[int, int], Tuple[int, int]]:
+    """Cell index ranges (lat, lon) whose kernels can reach tile (z, x, y)"""
+    r = kernel_radius_px(z)
+    west, east = px_to_lon(x * TILE_SIZE - r, z), px_to_lon((x + 1) * TILE_SIZE + r, z)
+    north, south = px_to_lat(y * TILE_SIZE - r, z), px_to_lat((y + 1) * TILE_SIZE + r, z)
+    lat_lo, lon_lo = hotspots.cell_of(south, west)
+    lat_hi, lon_hi = hotspots.cell_of(north, east)
+    return (lat_lo, lat_hi), (lon_lo, lon_hi)
+
+def render_tile(z: int, x: int, y: int, cells: Iterable[Tuple[int, int, int]]) -> bytes:
+    """Density PNG for tile (z, x, y) from (cell_lat, cell_lon, count) aggregates"""
+    density = np.zeros((TILE_SIZE, TILE_SIZE), dtype=np.float64)
+    sigma = kernel_sigma_px(z)
+    r = kernel_radius_px(z)
+    origin_x, origin_y = x * TILE_SIZE, y * TILE_SIZE
+    pixels = np.arange(TILE_SIZE, dtype=np.float64) + 0.5
+
+    for cell_lat, cell_lon, count in cells:
+        cx = lon_to_px((cell_lon + 0.5) * CELL_DEG, z) - origin_x
+        cy = lat_to_px((cell_lat + 0.5) * CELL_DEG, z) - origin_y
+        x0, x1 = max(0, int(cx - r)), min(TILE_SIZE, int(cx + r) + 1)
+        y0, y1 = max(0, int(cy - r)), min(TILE_SIZE, int(cy + r) + 1)
+        if x0 >= x1 or y0 >= y1:
+            continue
+        # Separable Gaussian, peak weight 1 per report at the cell centre
+        gx = np.exp(-((pixels[x0:x1] - cx) ** 2) / (2 * sigma * sigma))
+        gy = np.exp(-((pixels[y0:y1] - cy) ** 2) / (2 * sigma * sigma))
+        density[y0:y1, x0:x1] += count * np.outer(gy, gx)
+
+    intensity = 1.0 - np.exp(-density / TILE_SATURATION)
+    rgba = np.zeros((TILE_SIZE, TILE_SIZE, 4), dtype=np.uint8)
+    for channel in range(3):
+        rgba[..., channel] = np.interp(intensity, _RAMP_STOPS, _RAMP_RGB[:, channel]).astype(np.uint8)
+    rgba[..., 3] = (intensity * _MAX_ALPHA).astype(np.uint8)
+    return encode_rgba(TILE_SIZE, TILE_SIZE, rgba.tobytes())
+
+# -----------------------------
+# Tile cache
+# -----------------------------
+def etag_for(png: bytes) -> str:
+    return '"' + hashlib.sha1(png).hexdigest()[:20] + '"'
+
+
+class TileCache:
+    """
+    Two-level cache of rendered tiles: an in-memory LRU in front of PNG files
+    under `directory`. Tiles are invalidated individually when reports land in
+    a cell they cover, so the rest of the pyramid stays warm. Invalidation
+    runs inside report inserts, so it only touches memory; the stale PNG
+    files are deleted on a background thread and ignored until they are gone.
+    """
+
+    def __init__(self, directory: str = TILE_CACHE_DIR, maxsize: int = 2048, ttl: float = 60):
+        self.directory = directory
+        # The TTL bounds staleness in other worker processes, whose memory this one cannot invalidate
+        self.memory = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.renders = 0
+        self.disk_hits = 0
+        self.invalidations = 0
+        self._invalidated_at = TTLCache(maxsize=maxsize * 8, ttl=3600)
+        self._clock = itertools.count()
+        self._inflight: Dict[Tile, asyncio.Future] = {}
+        # Tile -> number of queued file deletions not yet done
+        self._doomed: Dict[Tile, int] = {}
+        self._doomed_lock = threading.Lock()
+        self._remover = ThreadPoolExecutor(max_workers=1, thread_name_prefix="tile-remove")
+
+    def _path(self, tile: Tile) -> str:
+        z, x, y = tile
+        return os.path.join(self.directory, str(z), str(x), f"{y}.png")
+
+    def _read_disk(self, tile: Tile) -> Optional[bytes]:
+        try:
+            with open(self._path(tile), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def _write_disk(self, tile: Tile, png: bytes) -> None:
+        path = self._path(tile)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(png)
+        os.replace(tmp, path)
+
+    def _remove_disk(self, tiles: List[Tile]) -> None:
+        for tile in tiles:
+            try:
+                os.remove(self._path(tile))
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                print(f"⚠️ Could not delete stale tile {tile}: {e}")
+        with self._doomed_lock:
+            for tile in tiles:
+                left = self._doomed.pop(tile) - 1
+                if left:
+                    self._doomed[tile] = left
+
+    def invalidate_tiles(self, tiles: Iterable[Tile]) -> None:
+        tiles = list(tiles)
+        stamp = next(self._clock)
+        with self._doomed_lock:
+            for tile in tiles:
+                self.memory.invalidate(tile)
+                self._invalidated_at.set(tile, stamp)
+                self._doomed[tile] = self._doomed.get(tile, 0) + 1
+        self.invalidations += len(tiles)
+        self._remover.submit(self._remove_disk, tiles)
+
+    def invalidate_cells(self, cells: Set[Tuple[int, int]]) -> None:
+        self.invalidate_tiles(tiles_for_cells(cells))
+
+    async def _render(self, tile: Tile) -> Tuple[bytes, str]:
+        started = next(self._clock)
+        z, x, y = tile
+        lat_range, lon_range = tile_query_box(z, x, y)
+        async with db_session() as connection:
+            cells = await hotspots.totals_in_box(connection, lat_range, lon_range)
+        loop = asyncio.get_running_loop()
+        png = await loop.run_in_executor(None, render_tile, z, x, y, cells)
+        entry = (png, etag_for(png))
+        self.renders += 1
+        # A report that landed mid-render would be missing from this image: serve it, don't keep it
+        if self._invalidated_at.get(tile, -1) < started:
+            self.memory.set(tile, entry)
+            await loop.run_in_executor(None, self._write_disk, tile, png)
+        return entry
+
+    async def get(self, tile: Tile) -> Tuple[bytes, str]:
+        """(png, etag) for a tile, rendering it at most once however many requests race for it"""
+        entry = self.memory.get(tile)
+        if entry is not None:
+            return entry
+
+        started = next(self._clock)
+        png = None
+        if tile not in self._doomed:
+            png = await asyncio.get_running_loop().run_in_executor(None, self._read_disk, tile)
+        # The file may have been read just before an invalidation doomed it
+        if png is not None and self._invalidated_at.get(tile, -1) < started:
+            entry = (png, etag_for(png))
+            self.memory.set(tile, entry)
+            self.disk_hits += 1
+            return entry
+
+        pending = self._inflight.get(tile)
+        if pending is not None:
+            return await asyncio.shield(pending)
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[tile] = future
+        try:
+            entry = await self._render(tile)
+            future.set_result(entry)
+            return entry
+        except BaseException as e:
+            future.set_exception(e)
+            # Mark retrieved so a failure nobody else awaited is not logged as unhandled
+            future.exception()
+            raise
+        finally:
+            del self._inflight[tile]
+
+    def stats(self) -> dict:
+        return {
+            "memory": self.memory.stats(),
+            "renders": self.renders,
+            "disk_hits": self.disk_hits,
+            "invalidated_tiles": self.invalidations,
+            "pending_file_deletions": len(self._doomed)
+        }
+
+
+_tile_cache: Optional[TileCache] = None
+
+def get_tile_cache() -> TileCache:
+    """Process-wide tile cache, invalidated by every committed report insert"""
+    global _tile_cache
+    if _tile_cache is None:
+        _tile_cache = TileCache(
+            TILE_CACHE_DIR,
+            maxsize=int(os.getenv("TILE_MEMORY_CACHE_SIZE", "2048")),
+            ttl=float(os.getenv("TILE_MEMORY_CACHE_TTL", "60"))
+        )
+        hotspots.subscribe(_tile_cache.invalidate_cells)
+    return _tile_cache
@@ -0,0 +1,50 @@
+import math
+from datetime import date, datetime, timedelta, timezone
+from typing import List, Optional, Tuple
+from fastapi import HTTPException
+from repositories import hotspots
+from repositories.hotspots import CELL_DEG, cell_of
+
+# Largest bbox edge accepted by /api/hotspots, in degrees (Singapore spans ~0.7)
+MAX_BBOX_DEG = 2.0
+
+def parse_bbox(bbox: str) -> Tuple[float, float, float, float]:
+    """`minLon,minLat,maxLon,maxLat` (GeoJSON order) -> floats, 400 if malformed"""
+    try:
+        min_lon, min_lat, max_lon, max_lat = (float(part) for part in bbox.split(","))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="bbox must be minLon,minLat,maxLon,maxLat")
+    # float() also accepts nan and inf, which slip past the comparisons below
+    if not all(math.isfinite(v) for v in (min_lon, min_lat, max_lon, max_lat)):
+        raise HTTPException(status_code=400, detail="bbox coordinates must be finite numbers")
+    if min_lon > max_lon or min_lat > max_lat:
+        raise HTTPException(status_code=400, detail="bbox min must not exceed max")
+    if max_lon - min_lon > MAX_BBOX_DEG or max_lat - min_lat > MAX_BBOX_DEG:
+        raise HTTPException(status_code=400, detail=f"bbox may span at most {MAX_BBOX_DEG} degrees")
+    return min_lon, min_lat, max_lon, max_lat
+
+async def hotspots_in_box(connection, bbox: Tuple[float, float, float, float], since: Optional[date],
+                          crime_type: Optional[str] = None) -> dict:
+    """Cells with reports inside `bbox` since `since` (default: the last 30 days), busiest first"""
+    min_lon, min_lat, max_lon, max_lat = bbox
+    # Cell days are UTC dates (crime_reports.submitted_now)
+    since = since or datetime.now(timezone.utc).date() - timedelta(days=30)
+    lat_lo, lon_lo = cell_of(min_lat, min_lon)
+    lat_hi, lon_hi = cell_of(max_lat, max_lon)
+    rows = await hotspots.counts_in_box(connection, since.isoformat(), (lat_lo, lat_hi), (lon_lo, lon_hi), crime_type)
+
+    cells = {}
+    for cell_lat, cell_lon, crime, count in rows:
+        cell = cells.get((cell_lat, cell_lon))
+        if cell is None:
+            cell = cells[(cell_lat, cell_lon)] = {
+                "lat": round((cell_lat + 0.5) * CELL_DEG, 6),
+                "lon": round((cell_lon + 0.5) * CELL_DEG, 6),
+                "count": 0,
+                "by_type": {}
+            }
+        cell["count"] += int(count)
+        cell["by_type"][crime] = cell["by_type"].get(crime, 0) + int(count)
+
+    ranked: List[dict] = sorted(cells.values(), key=lambda c: -c["count"])
+    return {"cell_deg": CELL_DEG, "since": since.isoformat(), "cells": ranked}
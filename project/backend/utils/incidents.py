@@ -0,0 +1,140 @@
+import math
+import os
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, Optional, Tuple
+from config.env import load_env
+from utils.haversine import haversine
+
+load_env()
+
+# Metres per degree of latitude (and of longitude at the equator)
+_M_PER_DEG = 111_320.0
+
+Bucket = Tuple[str, int, int]
+
+
+class IncidentIndex:
+    """
+    Sliding-window spatio-temporal index of recent reports for near-duplicate
+    detection. Reports are hashed by crime type into grid cells one radius wide,
+    so a lookup only inspects the block of cells around the new report, and
+    each cell holds a time-ordered deque whose expired head is trimmed on touch.
+    A report within `radius_m` and `window_s` of an earlier report of the same
+    type joins that report's incident; every joining report extends the window.
+    A report that then fails to save must be `withdraw`n, or later reports
+    would join an incident that was never stored.
+    """
+
+    def __init__(self, radius_m: float = 150.0, window_s: float = 600.0):
+        self.radius_m = radius_m
+        self.window_s = window_s
+        self.cell_deg = radius_m / _M_PER_DEG
+        self.incidents = 0
+        self.duplicates = 0
+        # Per cell: (recorded_at, lat, lon, incident_id, report_uid), oldest first
+        self._cells: Dict[Bucket, Deque[Tuple[float, float, float, str, str]]] = {}
+        self._lock = threading.Lock()
+        self._inserts_since_sweep = 0
+
+    def _bucket(self, crime_type: str, lat: float, lon: float) -> Bucket:
+        return crime_type.strip().lower(), math.floor(lat / self.cell_deg), math.floor(lon / self.cell_deg)
+
+    def _trim(self, key: Bucket, cutoff: float) -> Optional[Deque]:
+        entries = self._cells.get(key)
+        if entries is None:
+            return None
+        while entries and entries[0][0] < cutoff:
+            entries.popleft()
+        if not entries:
+            del self._cells[key]
+            return None
+        return entries
+
+    def _sweep(self, cutoff: float) -> None:
+        # Amortised cleanup of cells nobody has looked up since they went stale
+        for key in list(self._cells):
+            self._trim(key, cutoff)
+
+    def assign(self, report_uid: str, crime_type: str, lat: float, lon: float,
+               now: Optional[float] = None) -> Tuple[str, bool]:
+        """
+        Record a report and return (incident_id, duplicate). The incident id is
+        the report_uid of the first report of the incident.
+        """
+        now = time.time() if now is None else now
+        cutoff = now - self.window_s
+        crime, row, col = self._bucket(crime_type, lat, lon)
+        # A degree of longitude shrinks by cos(lat), so away from the equator the
+        # radius can span more than one column
+        col_reach = math.ceil(1 / max(math.cos(math.radians(lat)), 1e-6))
+
+        with self._lock:
+            best: Optional[Tuple[float, str]] = None
+            for d_row in (-1, 0, 1):
+                for d_col in range(-col_reach, col_reach + 1):
+                    entries = self._trim((crime, row + d_row, col + d_col), cutoff)
+                    if not entries:
+                        continue
+                    for _, other_lat, other_lon, incident_id, _ in entries:
+                        distance_m = haversine(lat, lon, other_lat, other_lon) * 1000
+                        if distance_m <= self.radius_m and (best is None or distance_m < best[0]):
+                            best = (distance_m, incident_id)
+
+            incident_id = best[1] if best else report_uid
+            self._cells.setdefault((crime, row, col), deque()).append((now, lat, lon, incident_id, report_uid))
+            if best:
+                self.duplicates += 1
+            else:
+                self.incidents += 1
+
+            self._inserts_since_sweep += 1
+            if self._inserts_since_sweep >= 1024:
+                self._inserts_since_sweep = 0
+                self._sweep(cutoff)
+        return incident_id, best is not None
+
+    def withdraw(self, report_uid: str, crime_type: str, lat: float, lon: float) -> None:
+        """Forget a report recorded by `assign` whose insert or enqueue failed"""
+        key = self._bucket(crime_type, lat, lon)
+        with self._lock:
+            entries = self._cells.get(key)
+            if entries is None:
+                return
+            for entry in entries:
+                if entry[4] == report_uid:
+                    entries.remove(entry)
+                    if entry[3] == report_uid:
+                        self.incidents -= 1
+                    else:
+                        self.duplicates -= 1
+                    break
+            if not entries:
+                del self._cells[key]
+
+    def stats(self) -> dict:
+        with self._lock:
+            tracked = sum(len(entries) for entries in self._cells.values())
+            cells = len(self._cells)
+        return {
+            "radius_m": self.radius_m,
+            "window_s": self.window_s,
+            "tracked_reports": tracked,
+            "active_cells": cells,
+            "incidents": self.incidents,
+            "duplicates": self.duplicates
+        }
+
+
+_index: Optional[IncidentIndex] = None
+
+def get_incident_index() -> IncidentIndex:
+    """Process-wide index configured from DUPLICATE_RADIUS_M and DUPLICATE_WINDOW_S"""
+    global _index
+    if _index is None:
+        _index = IncidentIndex(
+            radius_m=float(os.getenv("DUPLICATE_RADIUS_M", "150")),
+            window_s=float(os.getenv("DUPLICATE_WINDOW_S", "600"))
+        )
+    return _index
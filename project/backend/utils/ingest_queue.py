@@ -0,0 +1,289 @@
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import List, Optional, Tuple
+from config.env import load_env
+from config.db import acquire_connection, release_connection
+from repositories import crime_reports
+from utils.metrics import Histogram
+
+try:
+    import fcntl
+except ImportError:  # Windows: no flock, so run a single worker per queue file
+    fcntl = None
+
+load_env()
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+INGEST_QUEUE_PATH = os.getenv("INGEST_QUEUE_PATH", os.path.join(BASE_DIR, '../data/ingest_queue.sqlite3'))
+
+def ingest_mode() -> str:
+    """`direct` (insert per request, the default) or `queue` (write-behind)"""
+    return os.getenv("CRIME_REPORT_INGEST_MODE", "direct").lower()
+
+
+class DrainLock:
+    """
+    Exclusive flock on `<queue file>.lock`. Every uvicorn worker enqueues into
+    the same queue file, but only the process holding this lock drains it, so
+    two workers never flush the same rows. The kernel drops the lock when its
+    holder exits, and another worker picks it up on its next poll.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._fd: Optional[int] = None
+
+    def acquire(self) -> bool:
+        """Non-blocking; True while this process holds the lock"""
+        if self._fd is not None:
+            return True
+        if fcntl is None:
+            self._fd = -1
+            return True
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return False
+        self._fd = fd
+        return True
+
+    @property
+    def held(self) -> bool:
+        return self._fd is not None
+
+    def release(self) -> None:
+        if self._fd is not None and self._fd >= 0:
+            os.close(self._fd)
+        self._fd = None
+
+
+class ReportQueue:
+    """
+    Durable FIFO of accepted crime reports in a local SQLite file in WAL mode.
+    A report is durable once `put` returns; rows are deleted only after the
+    worker's MySQL commit, so anything still in the file after a crash is
+    simply flushed again on the next start. Any number of processes may `put`;
+    only the holder of `drain_lock` may `peek` and `ack`.
+    """
+
+    def __init__(self, path: str = INGEST_QUEUE_PATH):
+        self.path = path
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        # FULL fsyncs every commit, so an acknowledged report survives power loss too
+        self._db.execute(f"PRAGMA synchronous={os.getenv('INGEST_QUEUE_SYNC', 'FULL')}")
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS pending_reports (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                report_uid TEXT NOT NULL UNIQUE,
+                row TEXT NOT NULL,
+                enqueued_at REAL NOT NULL
+            )
+        """)
+        self._lock = threading.Lock()
+        self.drain_lock = DrainLock(path + ".lock")
+
+    def put(self, report_uid: str, row: tuple) -> None:
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO pending_reports (report_uid, row, enqueued_at) VALUES (?, ?, ?)",
+                (report_uid, json.dumps(row), time.time())
+            )
+
+    def peek(self, limit: int) -> List[Tuple[int, tuple, float]]:
+        """Oldest `limit` entries as (seq, row, enqueued_at), left in place until acked"""
+        with self._lock:
+            found = self._db.execute(
+                "SELECT seq, row, enqueued_at FROM pending_reports ORDER BY seq LIMIT ?", (limit,)
+            ).fetchall()
+        return [(seq, _upgrade_row(tuple(json.loads(row))), enqueued_at) for seq, row, enqueued_at in found]
+
+    def ack(self, up_to_seq: int) -> None:
+        """Drop every entry up to and including `up_to_seq` (batches are always a prefix)"""
+        with self._lock:
+            self._db.execute("DELETE FROM pending_reports WHERE seq <= ?", (up_to_seq,))
+
+    def depth(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM pending_reports").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+        self.drain_lock.release()
+
+
+class IngestWorker:
+    """
+    Background task that drains the ReportQueue into MySQL with multi-row
+    INSERT batches that skip report_uids already stored. A batch is flushed
+    as soon as `batch_size` reports are waiting, or once the oldest waiting
+    report is `linger_s` old. Failed flushes are retried with exponential
+    backoff; the reports stay queued.
+    Workers that do not hold the queue's drain lock only enqueue, and retry
+    the lock every `lock_poll_s`.
+    """
+
+    def __init__(self, queue: ReportQueue, batch_size: int = 500, linger_s: float = 0.05,
+                 max_backoff_s: float = 30.0, lock_poll_s: float = 1.0):
+        self.queue = queue
+        self.batch_size = batch_size
+        self.linger_s = linger_s
+        self.max_backoff_s = max_backoff_s
+        self.lock_poll_s = lock_poll_s
+        self.flushed = 0
+        self.duplicates = 0
+        self.batches = 0
+        self.failures = 0
+        self.batch_size_hist = Histogram(buckets=(1, 5, 10, 50, 100, 250, 500, 1000, 5000))
+        self.flush_seconds = Histogram()
+        self.queue_delay_seconds = Histogram()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+
+    async def _in_thread(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(None, fn, *args)
+
+    async def submit(self, report_uid: str, row: tuple) -> None:
+        """Durably enqueue one report; returns once it is safe to acknowledge the client"""
+        await self._in_thread(self.queue.put, report_uid, row)
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _wait(self, timeout: float) -> None:
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            pass
+        self._wakeup.clear()
+
+    async def flush_once(self) -> int:
+        """Write the oldest batch to MySQL and ack it; returns the number of queued reports taken"""
+        if not self.queue.drain_lock.acquire():
+            return 0
+        entries = await self._in_thread(self.queue.peek, self.batch_size)
+        if not entries:
+            return 0
+
+        started = time.perf_counter()
+        connection = await acquire_connection()
+        try:
+            inserted = await crime_reports.create_many(connection, [row for _, row, _ in entries])
+        finally:
+            await release_connection(connection)
+        await self._in_thread(self.queue.ack, entries[-1][0])
+
+        now = time.time()
+        for _, _, enqueued_at in entries:
+            self.queue_delay_seconds.observe(now - enqueued_at)
+        self.flush_seconds.observe(time.perf_counter() - started)
+        self.batch_size_hist.observe(len(entries))
+        self.batches += 1
+        self.flushed += inserted
+        self.duplicates += len(entries) - inserted
+        return len(entries)
+
+    async def run(self) -> None:
+        backoff = 0.0
+        while not self._stopping:
+            if backoff:
+                await self._wait(backoff)
+            if not self.queue.drain_lock.acquire():
+                # Another worker process drains the shared queue file
+                await self._wait(self.lock_poll_s)
+                continue
+            entries = await self._in_thread(self.queue.peek, self.batch_size)
+            if not entries:
+                await self._wait(1.0)
+                continue
+            # Linger for a fuller batch unless one is already full or the oldest report is due
+            age = time.time() - entries[0][2]
+            if len(entries) < self.batch_size and age < self.linger_s:
+                await asyncio.sleep(self.linger_s - age)
+            try:
+                await self.flush_once()
+                backoff = 0.0
+            except Exception as e:
+                self.failures += 1
+                backoff = min(self.max_backoff_s, max(0.5, backoff * 2))
+                print(f"⚠️ Crime report flush failed, retrying in {backoff:.1f}s: {e}")
+
+    def start(self) -> None:
+        self._stopping = False
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.get_running_loop().create_task(self.run())
+
+    async def stop(self, drain: bool = True) -> None:
+        """Stop the worker, flushing what is queued first unless `drain` is False"""
+        self._stopping = True
+        if self._task is not None:
+            self._wakeup.set()
+            await self._task
+            self._task = None
+        if drain:
+            try:
+                while await self.flush_once():
+                    pass
+            except Exception as e:
+                print(f"⚠️ Crime reports left queued for the next start: {e}")
+
+    def stats(self) -> dict:
+        return {
+            "mode": ingest_mode(),
+            "queue_depth": self.queue.depth(),
+            "draining": self.queue.drain_lock.held,
+            "batch_size": self.batch_size,
+            "linger_s": self.linger_s,
+            "flushed": self.flushed,
+            "duplicates_skipped": self.duplicates,
+            "batches": self.batches,
+            "failures": self.failures,
+            "batch_sizes": self.batch_size_hist.snapshot(),
+            "flush_seconds": self.flush_seconds.snapshot(),
+            "queue_delay_seconds": self.queue_delay_seconds.snapshot()
+        }
+
+
+def _upgrade_row(row: tuple) -> tuple:
+    # Rows queued before incident_id was added are their own incident
+    return row + (row[0],) if len(row) == 9 else row
+
+def report_row(report, user_id: int, report_uid: str, incident_id: Optional[str] = None) -> tuple:
+    """Row for crime_reports.create_many, stamped with the (UTC) time the report was accepted"""
+    return (report_uid, user_id, report.crime_type, report.location, report.email, report.latitude,
+            report.longitude, report.police_station, crime_reports.submitted_now(), incident_id or report_uid)
+
+
+_worker: Optional[IngestWorker] = None
+
+def get_ingest_worker() -> IngestWorker:
+    """Process-wide worker configured from INGEST_QUEUE_PATH, INGEST_BATCH_SIZE and INGEST_LINGER_MS"""
+    global _worker
+    if _worker is None:
+        _worker = IngestWorker(
+            ReportQueue(INGEST_QUEUE_PATH),
+            batch_size=int(os.getenv("INGEST_BATCH_SIZE", "500")),
+            linger_s=float(os.getenv("INGEST_LINGER_MS", "50")) / 1000,
+            max_backoff_s=float(os.getenv("INGEST_MAX_BACKOFF_S", "30"))
+        )
+    return _worker
+
+async def start_ingest_worker() -> None:
+    if ingest_mode() == "queue":
+        get_ingest_worker().start()
+
+async def stop_ingest_worker() -> None:
+    global _worker
+    if _worker is not None:
+        await _worker.stop()
+        _worker.queue.close()
+        _worker = None
@@ -0,0 +1,265 @@
+import bisect
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+# Latency buckets in seconds, from sub-millisecond calls up to slow upstreams
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+class Histogram:
+    """Thread-safe cumulative histogram of observed values (seconds by convention)"""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._sum = 0.0
+        self._max = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[i] += 1
+            self._sum += value
+            self._max = max(self._max, value)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            counts = list(self._counts)
+            total, maximum = self._sum, self._max
+        count = sum(counts)
+        cumulative, running = {}, 0
+        for bound, n in zip(self.buckets, counts):
+            running += n
+            cumulative[bound] = running
+        return {
+            "count": count,
+            "sum": total,
+            "max": maximum,
+            "mean": total / count if count else 0.0,
+            "buckets": cumulative
+        }
+
+# -----------------------------
+# Labelled metric families
+# -----------------------------
+Labels = Tuple[str, ...]
+Sample = Tuple[str, Dict[str, str], float]
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(str(value))}"' for name, value in labels.items()) + "}"
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Family:
+    """Named metric with a fixed set of label names; one child per label combination"""
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Labels, object] = {}
+        self._lock = threading.Lock()
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def labels(self, *values: str):
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}")
+            with self._lock:
+                child = self._children.setdefault(values, self._new_child())
+        return child
+
+    def _items(self) -> List[Tuple[Dict[str, str], object]]:
+        with self._lock:
+            children = list(self._children.items())
+        return [(dict(zip(self.labelnames, values)), child) for values, child in children]
+
+    def samples(self) -> Iterable[Sample]:
+        raise NotImplementedError
+
+
+class _Value:
+    __slots__ = ("value", "lock")
+
+    def __init__(self):
+        self.value = 0
+        self.lock = threading.Lock()
+
+    def add(self, amount: float) -> None:
+        with self.lock:
+            self.value += amount
+
+
+class Counter(_Family):
+    """Monotonic count, e.g. requests served"""
+    kind = "counter"
+
+    def _new_child(self):
+        return _Value()
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        self.labels(*labels).add(amount)
+
+    def samples(self) -> Iterable[Sample]:
+        for labels, child in self._items():
+            yield self.name, labels, child.value
+
+
+class Gauge(_Family):
+    """Value that goes up and down, e.g. requests in flight"""
+    kind = "gauge"
+
+    def _new_child(self):
+        return _Value()
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        self.labels(*labels).add(amount)
+
+    def dec(self, *labels: str, amount: float = 1) -> None:
+        self.labels(*labels).add(-amount)
+
+    def samples(self) -> Iterable[Sample]:
+        for labels, child in self._items():
+            yield self.name, labels, child.value
+
+
+class HistogramFamily(_Family):
+    """Histogram per label combination, exported as cumulative `le` buckets plus _sum and _count"""
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self):
+        return Histogram(self.buckets)
+
+    def observe(self, *labels: str, value: float) -> None:
+        self.labels(*labels).observe(value)
+
+    def samples(self) -> Iterable[Sample]:
+        for labels, child in self._items():
+            snapshot = child.snapshot()
+            for bound, count in snapshot["buckets"].items():
+                yield f"{self.name}_bucket", {**labels, "le": _format_value(float(bound))}, count
+            yield f"{self.name}_bucket", {**labels, "le": "+Inf"}, snapshot["count"]
+            yield f"{self.name}_sum", labels, snapshot["sum"]
+            yield f"{self.name}_count", labels, snapshot["count"]
+
+
+class Registry:
+    """
+    Metric families plus collectors, rendered in the Prometheus text format.
+    A collector is a callable returning (name, kind, help, samples) tuples,
+    used to export state other components already keep, at scrape time.
+    """
+
+    def __init__(self):
+        self._families: Dict[str, _Family] = {}
+        self._collectors: List[Callable[[], Iterable[tuple]]] = []
+
+    def register(self, family: _Family) -> _Family:
+        if family.name in self._families:
+            raise ValueError(f"Metric {family.name} already registered")
+        self._families[family.name] = family
+        return family
+
+    def register_collector(self, collector: Callable[[], Iterable[tuple]]) -> None:
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        lines = []
+
+        def emit(name, kind, documentation, samples):
+            lines.append(f"# HELP {name} {documentation}")
+            lines.append(f"# TYPE {name} {kind}")
+            for sample_name, labels, value in samples:
+                lines.append(f"{sample_name}{_format_labels(labels)} {_format_value(value)}")
+
+        for family in list(self._families.values()):
+            emit(family.name, family.kind, family.documentation, family.samples())
+        for collector in self._collectors:
+            try:
+                for name, kind, documentation, samples in collector():
+                    emit(name, kind, documentation, samples)
+            except Exception as e:
+                print(f"⚠️ Metrics collector {getattr(collector, '__name__', collector)} failed: {e}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+HTTP_REQUESTS = REGISTRY.register(Counter(
+    "http_requests_total", "HTTP requests by method, route template and status code",
+    ("method", "route", "status")))
+HTTP_REQUEST_SECONDS = REGISTRY.register(HistogramFamily(
+    "http_request_duration_seconds", "Time from request start until the response body is sent",
+    ("method", "route")))
+HTTP_IN_FLIGHT = REGISTRY.register(Gauge(
+    "http_requests_in_flight", "Requests currently being handled"))
+DB_ACQUIRE_SECONDS = REGISTRY.register(HistogramFamily(
+    "db_connection_acquire_seconds", "Time to check a connection out of the pool, including queueing"))
+DB_QUERY_SECONDS = REGISTRY.register(HistogramFamily(
+    "db_query_duration_seconds", "Time spent in a repository call on the DB executor", ("operation",)))
+EXTERNAL_CALL_SECONDS = REGISTRY.register(HistogramFamily(
+    "external_call_duration_seconds", "Calls to upstream services and CPU-bound helpers by outcome",
+    ("service", "outcome")))
+
+def observe_external(service: str, started: float, ok: bool) -> None:
+    """Record an external call that began at perf_counter() `started`"""
+    EXTERNAL_CALL_SECONDS.observe(service, "ok" if ok else "error", value=time.perf_counter() - started)
+
+# -----------------------------
+# ASGI middleware
+# -----------------------------
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware recording request count, latency and in-flight
+    requests. Requests are labelled with the matched route template (not
+    the raw path) so label cardinality stays bounded.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        in_flight = HTTP_IN_FLIGHT.labels()
+        in_flight.add(1)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            in_flight.add(-1)
+            # The router stores the matched route in the shared scope
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            method = scope["method"]
+            HTTP_REQUEST_SECONDS.observe(method, route, value=elapsed)
+            HTTP_REQUESTS.inc(method, route, str(status))
@@ -0,0 +1,20 @@
+import base64
+from typing import Optional, Tuple
+from fastapi import HTTPException
+
+# Keyset cursors are opaque to clients: base64url("<submitted_at>|<id>")
+
+def encode_cursor(submitted_at, row_id: int) -> str:
+    raw = f"{submitted_at}|{row_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: Optional[str]) -> Optional[Tuple[str, int]]:
+    """(submitted_at, id) of the last row on the previous page, 400 if the cursor is malformed"""
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        submitted_at, row_id = raw.rsplit("|", 1)
+        return submitted_at, int(row_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
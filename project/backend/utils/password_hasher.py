@@ -0,0 +1,111 @@
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Union
+import bcrypt
+from config.env import load_env
+from fastapi import HTTPException
+from utils.metrics import Histogram, observe_external
+
+load_env()
+
+
+class HasherSaturated(HTTPException):
+    """503 raised when the hashing queue is full; clients should retry shortly"""
+
+    def __init__(self):
+        super().__init__(status_code=503, detail="Server busy, please retry",
+                         headers={"Retry-After": "1"})
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt on a dedicated thread pool (bcrypt releases the GIL while it
+    works), so hashing never occupies the event loop. At most `workers` hashes
+    run at once and at most `max_queue` more may wait; beyond that calls are
+    shed with HasherSaturated instead of piling up latency.
+    """
+
+    def __init__(self, workers: int, max_queue: int, rounds: int = 12):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.rounds = rounds
+        self.hash_seconds = Histogram()
+        self.queue_wait_seconds = Histogram()
+        self.rejected = 0
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bcrypt")
+
+    async def _submit(self, fn, *args):
+        with self._lock:
+            if self._pending >= self.workers + self.max_queue:
+                self.rejected += 1
+                raise HasherSaturated()
+            self._pending += 1
+
+        queued_at = time.perf_counter()
+
+        def timed():
+            started = time.perf_counter()
+            self.queue_wait_seconds.observe(started - queued_at)
+            ok = False
+            try:
+                result = fn(*args)
+                ok = True
+                return result
+            finally:
+                self.hash_seconds.observe(time.perf_counter() - started)
+                observe_external("bcrypt", started, ok)
+
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, timed)
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    async def hash(self, password: str) -> bytes:
+        """bcrypt hash of `password` at the configured work factor"""
+        return await self._submit(lambda pw: bcrypt.hashpw(pw, bcrypt.gensalt(self.rounds)),
+                                  password.encode('utf-8'))
+
+    async def verify(self, password: str, hashed: Union[str, bytes]) -> bool:
+        """Check `password` against a stored hash (the hash carries its own work factor)"""
+        if isinstance(hashed, str):
+            hashed = hashed.encode('utf-8')
+        return await self._submit(bcrypt.checkpw, password.encode('utf-8'), hashed)
+
+    def stats(self) -> dict:
+        with self._lock:
+            pending = self._pending
+        return {
+            "workers": self.workers,
+            "max_queue": self.max_queue,
+            "rounds": self.rounds,
+            "in_flight": min(pending, self.workers),
+            "queued": max(0, pending - self.workers),
+            "rejected": self.rejected,
+            "hash_seconds": self.hash_seconds.snapshot(),
+            "queue_wait_seconds": self.queue_wait_seconds.snapshot()
+        }
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False)
+
+
+_hasher: Optional[PasswordHasher] = None
+
+def get_password_hasher() -> PasswordHasher:
+    """Process-wide hasher configured from BCRYPT_WORKERS, BCRYPT_MAX_QUEUE and BCRYPT_ROUNDS"""
+    global _hasher
+    if _hasher is None:
+        workers = int(os.getenv("BCRYPT_WORKERS", "0")) or (os.cpu_count() or 2)
+        _hasher = PasswordHasher(
+            workers=workers,
+            max_queue=int(os.getenv("BCRYPT_MAX_QUEUE", str(workers * 8))),
+            rounds=int(os.getenv("BCRYPT_ROUNDS", "12"))
+        )
+    return _hasher
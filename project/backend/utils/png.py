@@ -0,0 +1,19 @@
+import struct
+import zlib
+
+_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+def _chunk(kind: bytes, data: bytes) -> bytes:
+    return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data) & 0xFFFFFFFF)
+
+def encode_rgba(width: int, height: int, pixels: bytes, level: int = 6) -> bytes:
+    """
+    Minimal PNG encoder for 8-bit RGBA images: `pixels` is row-major
+    width * height * 4 bytes. Every scanline uses filter type 0 (None).
+    """
+    stride = width * 4
+    if len(pixels) != stride * height:
+        raise ValueError(f"expected {stride * height} bytes of RGBA, got {len(pixels)}")
+    raw = b"".join(b"\x00" + pixels[row * stride:(row + 1) * stride] for row in range(height))
+    header = struct.pack(">IIBBBBB", width, height, 8, 6, 0, 0, 0)  # 8-bit depth, RGBA colour type
+    return _SIGNATURE + _chunk(b"IHDR", header) + _chunk(b"IDAT", zlib.compress(raw, level)) + _chunk(b"IEND", b"")
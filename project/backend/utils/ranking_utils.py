@@ -1,8 +1,8 @@
-import pandas as pd
+import numpy as np
 import re
-from bs4 import BeautifulSoup
-import json
-from typing import List, Tuple, Dict
+from typing import List, Tuple, Dict, Optional
+from utils.station_registry import get_station_registry
+from utils.snapshot import snapshot_for
 
 # -----------------------------
 # Constants
@@ -26,54 +26,184 @@ def normalize(name: str) -> str:
 # -----------------------------
 # Ranking File Parser
 # -----------------------------
-def parse_ranking_file(filepath: str) -> Dict[str, Dict[str, List[int]]]:
+class RankingTable:
+    """
+    Columnar view of the NPC ranking CSV: counts[station, crime, year] in one
+    dense int32 array. rank[station, crime] is the crime's row position within
+    the station's block in the file, or -1 when the station has no such row.
+    """
+
+    def __init__(self, stations: List[str], crimes: List[str], years: List[str],
+                 counts: np.ndarray, rank: np.ndarray):
+        self.stations = stations
+        self.crimes = crimes
+        self.years = years
+        self.counts = counts
+        self.rank = rank
+        self.station_pos = {station: i for i, station in enumerate(stations)}
+
+    def station_counts(self, station: str) -> np.ndarray:
+        """(crime x year) slice for one station; absent crimes read as 0"""
+        return self.counts[self.station_pos[station]]
+
+    def top_crimes(self, n: int = 3, year: int = 0) -> List[List[str]]:
+        """Top-n crimes per station by count in `year`, ties kept in file order"""
+        values = self.counts[:, :, year]
+        absent = self.rank < 0
+        # lexsort's last key is primary: present first, then count desc, then file order
+        order = np.lexsort((self.rank, -values, absent), axis=-1)
+        present_counts = (~absent).sum(axis=1)
+        return [
+            [self.crimes[c] for c in order[s, :min(n, present_counts[s])]]
+            for s in range(len(self.stations))
+        ]
+
+    def to_dict(self) -> Dict[str, Dict[str, List[int]]]:
+        """Nested {station: {crime: [count per year]}} mapping in file order"""
+        ranking_data = {}
+        counts = self.counts.tolist()
+        for s, station in enumerate(self.stations):
+            crimes = sorted((r, c) for c, r in enumerate(self.rank[s].tolist()) if r >= 0)
+            ranking_data[station] = {self.crimes[c]: counts[s][c] for _, c in crimes}
+        return ranking_data
+
+
+def load_ranking_table(filepath: str, use_snapshot: bool = True) -> RankingTable:
+    """
+    Vectorized ranking CSV loader. Rows naming a Police Division open a station
+    block and every following row is a crime in that block; rows before the
+    first station are ignored. A station seen twice keeps only its last block,
+    and a crime repeated within a block keeps its first position and last counts.
+    A current reference snapshot (utils/snapshot.py) is mapped instead of parsing.
+    """
+    snapshot = snapshot_for("ranking", filepath) if use_snapshot else None
+    if snapshot is not None:
+        return RankingTable(*snapshot.ranking())
+
+    # pandas is only needed for this one-off parse, so workers don't pay for importing it otherwise
+    import pandas as pd
+
     df = pd.read_csv(filepath)
-    ranking_data = {}
-    current_station = None
+    names = df['DataSeries'].map(str).str.strip()
+    years = [str(col) for col in df.columns[1:]]
+
+    is_station = names.str.contains("Police Division", regex=False).to_numpy()
+    block = np.cumsum(is_station) - 1
+    block_station = names[is_station].to_numpy()
+
+    station_order = list(pd.unique(block_station))
+    station_pos = {station: i for i, station in enumerate(station_order)}
+    # Only each station's final block survives, matching a dict that is reset on repeat
+    last_block = {station: b for b, station in enumerate(block_station)}
+
+    crime_rows = ~is_station & (block >= 0)
+    crime_rows &= np.isin(block, list(last_block.values()))
+    rows = pd.DataFrame({
+        "station": [station_pos[block_station[b]] for b in block[crime_rows]],
+        "crime": names[crime_rows].to_numpy()
+    })
+    values = (
+        df.iloc[:, 1:].apply(pd.to_numeric, errors="coerce").fillna(0).astype(int).to_numpy()[crime_rows]
+    )
+
+    crime_codes, crimes = pd.factorize(rows["crime"], use_na_sentinel=False)
+    rows["crime_code"] = crime_codes
+    first = ~rows.duplicated(["station", "crime_code"], keep="first").to_numpy()
+    last = ~rows.duplicated(["station", "crime_code"], keep="last").to_numpy()
+
+    station_idx = rows["station"].to_numpy()
+    counts = np.zeros((len(station_order), len(crimes), len(years)), dtype=np.int32)
+    counts[station_idx[last], crime_codes[last]] = values[last]
+
+    rank = np.full((len(station_order), len(crimes)), -1, dtype=np.int32)
+    first_rows = rows[first]
+    rank[first_rows["station"].to_numpy(), first_rows["crime_code"].to_numpy()] = (
+        first_rows.groupby("station").cumcount().to_numpy()
+    )
 
-    for _, row in df.iterrows():
-        name = str(row['DataSeries']).strip()
+    return RankingTable(station_order, list(crimes), years, counts, rank)
 
-        if "Police Division" in name:
-            current_station = name
-            ranking_data[current_station] = {}
-        elif current_station:
-            crime = name
-            crime_data = pd.to_numeric(pd.Series(row.values[1:]), errors="coerce").fillna(0).astype(int).tolist()
-            ranking_data[current_station][crime] = crime_data
 
-    return ranking_data
+def parse_ranking_file(filepath: str) -> Dict[str, Dict[str, List[int]]]:
+    return load_ranking_table(filepath).to_dict()
 
 # -----------------------------
 # GEOJSON Parser
 # -----------------------------
 def extract_info_from_geojson(geojson_path: str) -> List[Tuple[str, str]]:
-    with open(geojson_path, "r", encoding="utf-8") as f:
-        geojson_data = json.load(f)
+    # Reuse the shared station registry so the Description HTML is scraped once per file
+    registry = get_station_registry(geojson_path)
 
     cleaned_data = []
 
-    for feature in geojson_data["features"]:
-        props = feature["properties"]
-        description_html = props.get("Description", "")
-        soup = BeautifulSoup(description_html, "html.parser")
-        rows = soup.find_all("tr")
-
-        station_name = None
-        divcode = None
-
-        for row in rows:
-            th = row.find("th")
-            td = row.find("td")
-            if th and td:
-                label = th.get_text(strip=True)
-                value = td.get_text(strip=True)
-                if label == "BLDG":
-                    station_name = value
-                elif label == "DIVCODE":
-                    divcode = value
-
+    for station_name, divcode in zip(registry.names, registry.divcodes):
         if station_name and divcode:
             cleaned_data.append((station_name, divcode))
 
     return cleaned_data
+
+# -----------------------------
+# Station -> Top Crimes Index
+# -----------------------------
+def _ngrams(text: str, n: int) -> set:
+    return {text[i:i + n] for i in range(len(text) - n + 1)}
+
+class StationCrimeIndex:
+    """
+    Precomputed top-N crimes per ranking station and per division.
+    A station query matches the first station (in file order) whose normalized
+    name contains the normalized query; exact names resolve with one dict hit and
+    other substrings through an n-gram postings index instead of a full scan.
+    """
+    GRAM = 3
+
+    def __init__(self, table: RankingTable, n: int = 3):
+        self.stations = table.stations
+        self.normalized = [normalize(station) for station in self.stations]
+        self.top = table.top_crimes(n)
+
+        # n-grams of length 1..GRAM so queries shorter than GRAM are indexed too
+        self.postings: Dict[str, set] = {}
+        for pos, name in enumerate(self.normalized):
+            for size in range(1, self.GRAM + 1):
+                for gram in _ngrams(name, size):
+                    self.postings.setdefault(gram, set()).add(pos)
+
+        # A normalized name may also be a substring of an earlier station, so the
+        # exact table stores the first containing position rather than its own
+        self.exact: Dict[str, int] = {}
+        for name in self.normalized:
+            if name not in self.exact:
+                self.exact[name] = self._scan(name)
+
+        self.by_division: Dict[str, List[str]] = {}
+        for divcode, division_name in DIVCODE_TO_DIVISION.items():
+            for pos, station in enumerate(self.stations):
+                if division_name in station:
+                    self.by_division[divcode] = self.top[pos]
+                    break
+
+    def _scan(self, query: str) -> Optional[int]:
+        size = min(len(query), self.GRAM)
+        if size == 0:
+            return 0 if self.stations else None
+
+        grams = sorted((self.postings.get(g, set()) for g in _ngrams(query, size)), key=len)
+        candidates = set.intersection(*grams) if grams else set()
+        for pos in sorted(candidates):
+            if query in self.normalized[pos]:
+                return pos
+        return None
+
+    def find_station(self, norm_station: str) -> Optional[int]:
+        pos = self.exact.get(norm_station)
+        if pos is not None:
+            return pos
+        return self._scan(norm_station)
+
+    def top_for_station(self, norm_station: str) -> Optional[List[str]]:
+        pos = self.find_station(norm_station)
+        return None if pos is None else self.top[pos]
+
+    def top_for_division(self, divcode: str) -> Optional[List[str]]:
+        return self.by_division.get(divcode)
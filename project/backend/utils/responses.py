@@ -0,0 +1,34 @@
+from typing import Any, Sequence
+import orjson
+from fastapi.responses import ORJSONResponse
+from starlette.middleware.gzip import GZipMiddleware
+
+class FastJSONResponse(ORJSONResponse):
+    """
+    orjson-encoded JSON response, the app-wide default. Also accepts what the
+    stdlib encoder did: non-string dict keys (histogram bucket bounds in the
+    health payloads), plus numpy scalars and arrays.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+
+
+class CompressionMiddleware:
+    """
+    gzip for clients that send Accept-Encoding: gzip, via Starlette's
+    GZipMiddleware, skipping paths whose bodies are already compressed (PNG
+    heatmap tiles) where recompressing would only cost CPU.
+    """
+
+    def __init__(self, app, minimum_size: int = 1000, compresslevel: int = 6,
+                 exclude_prefixes: Sequence[str] = ("/tiles/",)):
+        self.app = app
+        self.gzip = GZipMiddleware(app, minimum_size=minimum_size, compresslevel=compresslevel)
+        self.exclude_prefixes = tuple(exclude_prefixes)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and not scope["path"].startswith(self.exclude_prefixes):
+            await self.gzip(scope, receive, send)
+        else:
+            await self.app(scope, receive, send)
@@ -1,15 +1,20 @@
-from twilio.rest import Client
+import asyncio
+import itertools
 import os
-from dotenv import load_dotenv
+import random
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Deque, Dict, List, Optional, Set, Tuple
+from config.env import load_env
+from utils.metrics import Histogram, observe_external
 
-load_dotenv()
+load_env()
 
 account_sid = os.getenv("TWILIO_ACCOUNT_SID")
 auth_token = os.getenv("TWILIO_AUTH_TOKEN")
 twilio_number = os.getenv("TWILIO_PHONE_NUMBER")
 
-client = Client(account_sid, auth_token)
-
 # ✅ Your verified Twilio numbers for each division
 DIVCODE_PHONE_MAP = {
     "ALPHA": "+6583057010",
@@ -21,21 +26,366 @@ DIVCODE_PHONE_MAP = {
     "LIMA": "+6581201337",
 }
 
-def send_sms_by_divcode(divcode: str, message: str) -> str:
-    try:
-        to_number = DIVCODE_PHONE_MAP.get(divcode.upper())
-        if not to_number:
-            return f"❌ Unknown division code: {divcode}"
+# Twilio rejects bodies longer than this
+MAX_SMS_CHARS = 1600
+
+# -----------------------------
+# Providers
+# -----------------------------
+class SmsProvider:
+    """
+    Interface for SMS backends. `send` delivers one message and returns the
+    provider's message id; `is_retryable` tells the dispatcher whether a
+    failure is worth another attempt.
+    """
+    name = "base"
+
+    async def send(self, to_number: str, body: str) -> str:
+        raise NotImplementedError
+
+    def is_retryable(self, error: Exception) -> bool:
+        return True
+
+    async def aclose(self) -> None:
+        pass
+
+
+class TwilioSmsProvider(SmsProvider):
+    """Twilio backend; the blocking REST client runs on its own small thread pool"""
+    name = "twilio"
+
+    def __init__(self, account_sid: Optional[str], auth_token: Optional[str], from_number: Optional[str],
+                 workers: int = 4):
+        self.account_sid = account_sid
+        self.auth_token = auth_token
+        self.from_number = from_number
+        self._client = None
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="twilio")
+
+    @property
+    def client(self):
+        if self._client is None:
+            from twilio.rest import Client
+            self._client = Client(self.account_sid, self.auth_token)
+        return self._client
+
+    def _create(self, to_number: str, body: str) -> str:
+        return self.client.messages.create(
+            body=body,
+            from_=self.from_number,   # always from your Twilio number
+            to=to_number              # different TO number depending on div
+        ).sid
+
+    async def send(self, to_number: str, body: str) -> str:
+        return await asyncio.get_running_loop().run_in_executor(self._executor, self._create, to_number, body)
+
+    def is_retryable(self, error: Exception) -> bool:
+        from twilio.base.exceptions import TwilioRestException
+        # Throttling and server errors pass; a rejected number or body will not
+        if isinstance(error, TwilioRestException):
+            return error.status == 429 or error.status >= 500
+        return True
+
+    async def aclose(self) -> None:
+        self._executor.shutdown(wait=False)
+
+
+class FakeSmsProvider(SmsProvider):
+    """Local stand-in that records messages instead of sending them, with optional latency and failures"""
+    name = "fake"
+
+    def __init__(self, latency_s: float = 0.0, failure_rate: float = 0.0, keep: int = 1000):
+        self.latency_s = latency_s
+        self.failure_rate = failure_rate
+        self.sent: Deque[dict] = deque(maxlen=keep)
+        self._ids = itertools.count(1)
+
+    async def send(self, to_number: str, body: str) -> str:
+        if self.latency_s:
+            await asyncio.sleep(self.latency_s)
+        if self.failure_rate and random.random() < self.failure_rate:
+            raise ConnectionError("Fake SMS provider failure")
+        sid = f"FAKE{next(self._ids):08d}"
+        self.sent.append({"sid": sid, "to": to_number, "body": body, "sent_at": time.time()})
+        return sid
+
+# -----------------------------
+# Dispatcher
+# -----------------------------
+def build_digest(divcode: str, messages: List[str], max_chars: int = MAX_SMS_CHARS) -> Tuple[str, int]:
+    """
+    One SMS body for a division's waiting alerts and how many of them it
+    holds. Alerts that would overflow `max_chars` are left for the next digest.
+    """
+    # 40 characters leave room for the digest header
+    taken, size = 1, len(messages[0])
+    while taken < len(messages) and 40 + size + 2 + len(messages[taken]) <= max_chars:
+        size += 2 + len(messages[taken])
+        taken += 1
+    if taken == 1:
+        return messages[0][:max_chars], 1
+    header = f"{taken} crime reports for {divcode.upper()}"
+    return header + "".join("\n\n" + message for message in messages[:taken]), taken
+
+
+class _Division:
+    """Pending alerts and rate-limit state for one division"""
 
-        sent_message = client.messages.create(
-            body=message,
-            from_=twilio_number,   # always from your Twilio number
-            to=to_number           # different TO number depending on div
+    def __init__(self, burst: float, now: float):
+        self.pending: Deque[Tuple[str, float]] = deque()
+        self.tokens = burst
+        self.refilled_at = now
+        self.retry_at = 0.0
+        self.attempts = 0
+        self.sending = False
+        self.throttled = False
+
+
+class SmsDispatcher:
+    """
+    Background sender for division alerts. `enqueue` returns immediately; a
+    division's alerts are held for `coalesce_window_s` after the first one so
+    a burst goes out as one digest. Each division has a token bucket of
+    `burst` messages refilled at `rate_per_min`, and while it is empty further
+    alerts keep folding into the next digest. Failed sends are retried with
+    exponential backoff up to `max_attempts`. Alerts are held in memory only.
+    """
+
+    def __init__(self, provider: SmsProvider, phone_map: Dict[str, str] = DIVCODE_PHONE_MAP,
+                 coalesce_window_s: float = 5.0, rate_per_min: float = 6.0, burst: float = 3.0,
+                 max_attempts: int = 5, max_backoff_s: float = 60.0, concurrency: int = 4,
+                 max_pending: int = 200):
+        self.provider = provider
+        self.phone_map = {divcode.upper(): number for divcode, number in phone_map.items()}
+        self.coalesce_window_s = coalesce_window_s
+        self.rate_per_s = rate_per_min / 60
+        self.burst = burst
+        self.max_attempts = max_attempts
+        self.max_backoff_s = max_backoff_s
+        self.max_pending = max_pending
+        self.enqueued = 0
+        self.unknown = 0
+        self.messages_sent = 0
+        self.alerts_delivered = 0
+        self.retries = 0
+        self.failed = 0
+        self.dropped = 0
+        self.rate_limited = 0
+        self.delivery_seconds = Histogram(buckets=(0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600))
+        self.send_seconds = Histogram()
+        self.digest_size = Histogram(buckets=(1, 2, 3, 5, 10, 20))
+        self._divisions: Dict[str, _Division] = {}
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._sends: Set[asyncio.Task] = set()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+        self._draining = False
+
+    def enqueue(self, divcode: str, message: str) -> bool:
+        """Queue an alert for a division; False if the division has no number"""
+        divcode = divcode.upper()
+        if divcode not in self.phone_map:
+            self.unknown += 1
+            return False
+        now = time.monotonic()
+        division = self._divisions.get(divcode)
+        if division is None:
+            division = self._divisions[divcode] = _Division(self.burst, now)
+        if len(division.pending) >= self.max_pending:
+            division.pending.popleft()
+            self.dropped += 1
+        division.pending.append((message, now))
+        self.enqueued += 1
+        if self._wakeup is not None:
+            self._wakeup.set()
+        return True
+
+    def _refill(self, division: _Division, now: float) -> None:
+        division.tokens = min(self.burst, division.tokens + (now - division.refilled_at) * self.rate_per_s)
+        division.refilled_at = now
+
+    def _due_at(self, division: _Division, now: float) -> Optional[float]:
+        """When the division's next digest may go out, or None if there is nothing to send"""
+        if division.sending or not division.pending:
+            return None
+        if self._draining:
+            return division.retry_at
+        ready = max(division.pending[0][1] + self.coalesce_window_s, division.retry_at)
+        self._refill(division, now)
+        if division.tokens >= 1:
+            return ready
+        allowed = now + (1 - division.tokens) / self.rate_per_s
+        if allowed > ready and not division.throttled:
+            division.throttled = True
+            self.rate_limited += 1
+        return max(ready, allowed)
+
+    def _launch(self, divcode: str, division: _Division) -> None:
+        if not self._draining:
+            division.tokens -= 1
+        division.throttled = False
+        division.sending = True
+        task = asyncio.get_running_loop().create_task(self._deliver(divcode, division))
+        self._sends.add(task)
+        task.add_done_callback(self._sends.discard)
+
+    async def _deliver(self, divcode: str, division: _Division) -> None:
+        to_number = self.phone_map[divcode]
+        body, taken = build_digest(divcode, [message for message, _ in division.pending])
+        batch = [division.pending.popleft() for _ in range(taken)]
+        try:
+            async with self._semaphore:
+                started = time.perf_counter()
+                ok = False
+                try:
+                    sid = await self.provider.send(to_number, body)
+                    ok = True
+                finally:
+                    self.send_seconds.observe(time.perf_counter() - started)
+                    observe_external(self.provider.name, started, ok)
+        except asyncio.CancelledError:
+            division.pending.extendleft(reversed(batch))
+            raise
+        except Exception as e:
+            division.attempts += 1
+            if self.provider.is_retryable(e) and division.attempts < self.max_attempts:
+                # Back in front of the queue, so the retry also picks up anything that arrived meanwhile
+                division.pending.extendleft(reversed(batch))
+                backoff = min(self.max_backoff_s, 2 ** (division.attempts - 1))
+                division.retry_at = time.monotonic() + backoff * random.uniform(0.8, 1.2)
+                self.retries += 1
+                print(f"⚠️ SMS to {divcode} failed, retrying in {backoff:.0f}s: {e}")
+            else:
+                division.attempts = 0
+                self.failed += len(batch)
+                print(f"❌ Error sending SMS to {divcode}, {len(batch)} alert(s) dropped: {e}")
+        else:
+            now = time.monotonic()
+            division.attempts = 0
+            self.messages_sent += 1
+            self.alerts_delivered += len(batch)
+            self.digest_size.observe(len(batch))
+            for _, enqueued_at in batch:
+                self.delivery_seconds.observe(now - enqueued_at)
+            print(f"✅ SMS sent to {to_number} ({len(batch)} alert(s))")
+            print(f"📬 SID: {sid}")
+        finally:
+            division.sending = False
+            if self._wakeup is not None:
+                self._wakeup.set()
+
+    def _has_work(self) -> bool:
+        return bool(self._sends) or any(division.pending for division in self._divisions.values())
+
+    async def _wait(self, timeout: Optional[float]) -> None:
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            pass
+        self._wakeup.clear()
+
+    async def run(self) -> None:
+        while True:
+            now = time.monotonic()
+            next_due = None
+            for divcode, division in list(self._divisions.items()):
+                due = self._due_at(division, now)
+                if due is None:
+                    continue
+                if due <= now:
+                    self._launch(divcode, division)
+                elif next_due is None or due < next_due:
+                    next_due = due
+            if self._stopping and (not self._draining or not self._has_work()):
+                return
+            await self._wait(None if next_due is None else next_due - now)
+
+    def start(self) -> None:
+        self._stopping = self._draining = False
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.get_running_loop().create_task(self.run())
+
+    async def stop(self, drain: bool = True, timeout_s: float = 10.0) -> None:
+        """
+        Stop the dispatcher. With `drain`, waiting alerts are sent right away,
+        ignoring the coalescing window and rate limits, for up to `timeout_s`.
+        """
+        self._stopping, self._draining = True, drain
+        if self._task is not None:
+            self._wakeup.set()
+            try:
+                await asyncio.wait_for(self._task, timeout=timeout_s)
+            except asyncio.TimeoutError:
+                pass
+            self._task = None
+        sends = list(self._sends)
+        for task in sends:
+            task.cancel()
+        await asyncio.gather(*sends, return_exceptions=True)
+        left = sum(len(division.pending) for division in self._divisions.values())
+        if left:
+            self.dropped += left
+            print(f"⚠️ {left} SMS alert(s) not sent before shutdown")
+        await self.provider.aclose()
+
+    def stats(self) -> dict:
+        return {
+            "provider": self.provider.name,
+            "pending": {divcode: len(division.pending) for divcode, division in self._divisions.items()
+                        if division.pending},
+            "enqueued": self.enqueued,
+            "unknown_division": self.unknown,
+            "messages_sent": self.messages_sent,
+            "alerts_delivered": self.alerts_delivered,
+            "alerts_coalesced": self.alerts_delivered - self.messages_sent,
+            "retries": self.retries,
+            "failed": self.failed,
+            "dropped": self.dropped,
+            "rate_limited": self.rate_limited,
+            "delivery_seconds": self.delivery_seconds.snapshot(),
+            "send_seconds": self.send_seconds.snapshot(),
+            "digest_size": self.digest_size.snapshot()
+        }
+
+# -----------------------------
+# Dispatcher factory
+# -----------------------------
+_dispatcher: Optional[SmsDispatcher] = None
+
+def build_sms_provider() -> SmsProvider:
+    """Build the provider selected by SMS_PROVIDER (twilio or fake)"""
+    name = os.getenv("SMS_PROVIDER", "twilio").lower()
+    if name == "fake":
+        return FakeSmsProvider(
+            latency_s=float(os.getenv("FAKE_SMS_LATENCY_MS", "0")) / 1000,
+            failure_rate=float(os.getenv("FAKE_SMS_FAILURE_RATE", "0"))
+        )
+    if name == "twilio":
+        return TwilioSmsProvider(account_sid, auth_token, twilio_number,
+                                 workers=int(os.getenv("SMS_MAX_CONCURRENCY", "4")))
+    raise ValueError(f"Unknown SMS_PROVIDER: {name}")
+
+def get_sms_dispatcher() -> SmsDispatcher:
+    global _dispatcher
+    if _dispatcher is None:
+        _dispatcher = SmsDispatcher(
+            build_sms_provider(),
+            coalesce_window_s=float(os.getenv("SMS_COALESCE_WINDOW_S", "5")),
+            rate_per_min=float(os.getenv("SMS_DIVISION_RATE_PER_MIN", "6")),
+            burst=float(os.getenv("SMS_DIVISION_BURST", "3")),
+            max_attempts=int(os.getenv("SMS_MAX_ATTEMPTS", "5")),
+            max_backoff_s=float(os.getenv("SMS_MAX_BACKOFF_S", "60")),
+            concurrency=int(os.getenv("SMS_MAX_CONCURRENCY", "4")),
+            max_pending=int(os.getenv("SMS_MAX_PENDING", "200"))
         )
+    return _dispatcher
+
+async def start_sms_dispatcher() -> None:
+    get_sms_dispatcher().start()
 
-        print(f"✅ SMS sent to {to_number}")
-        print(f"📬 SID: {sent_message.sid}")
-        return f"✅ Message sent. SID: {sent_message.sid}"
-    except Exception as e:
-        print(f"❌ Error: {str(e)}")
-        return f"❌ Error sending SMS: {str(e)}"
+async def stop_sms_dispatcher() -> None:
+    global _dispatcher
+    if _dispatcher is not None:
+        await _dispatcher.stop(timeout_s=float(os.getenv("SMS_DRAIN_TIMEOUT_S", "10")))
+        _dispatcher = None
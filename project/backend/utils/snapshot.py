@@ -0,0 +1,351 @@
+"""
+Binary snapshot of the reference datasets (police establishments GeoJSON and
+NPC ranking CSV), compiled offline and opened by every worker with mmap, so
+the page cache holds one copy shared by all workers and nothing is parsed at
+boot. Build it after updating either dataset, from the backend directory:
+    python -m utils.snapshot build
+    python -m utils.snapshot verify
+
+Layout (little-endian, sections 8-byte aligned):
+    header     magic "CWSNAP\\0\\0", format version u32, section count u32
+    directory  per section: tag 8s, offset u64, length u64, crc32 u32, padding
+    META       JSON: build time, source file names and sha256 digests, shapes
+    STRTAB     UTF-8 string table; strings are (offset u32, length u32) refs
+    STATIONS   fixed-width station records (STATION_DTYPE)
+    RNK_STN / RNK_CRM / RNK_YRS   string refs: ranking stations, crimes, years
+    RNK_CNT    int32 counts[station, crime, year]
+    RNK_RNK    int32 rank[station, crime] (-1 when absent)
+
+The loaders in station_registry and ranking_utils use the snapshot when
+REFERENCE_SNAPSHOT (default data/reference.snapshot) exists and the source
+file they were asked for has the digest recorded at build time; otherwise they
+parse the source as before.
+"""
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+import threading
+import time
+import zlib
+from collections.abc import Sequence
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from config.env import load_env
+
+load_env()
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+SNAPSHOT_FILE = os.getenv("REFERENCE_SNAPSHOT", os.path.join(BASE_DIR, '../data/reference.snapshot'))
+
+MAGIC = b"CWSNAP\0\0"
+FORMAT_VERSION = 1
+_HEADER = struct.Struct("<8sII")
+_SECTION = struct.Struct("<8sQQI4x")
+_NONE = 0xFFFFFFFF
+
+# 40-byte station record; string fields are (offset, length) into STRTAB
+STATION_DTYPE = np.dtype([
+    ("latitude", "<f8"),
+    ("longitude", "<f8"),
+    ("name", "<u4", (2,)),
+    ("divcode", "<u4", (2,)),
+    ("feature", "<u4", (2,)),
+])
+STRING_REF_DTYPE = np.dtype(("<u4", (2,)))
+
+
+class SnapshotError(Exception):
+    """Raised when a snapshot file is truncated, corrupt or of another format version"""
+
+# -----------------------------
+# Source digests
+# -----------------------------
+_digests: Dict[Tuple[str, int, int], str] = {}
+
+def file_digest(path: str) -> str:
+    """sha256 of `path`, memoized on (path, size, mtime) so repeated checks don't re-read it"""
+    stat = os.stat(path)
+    key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+    digest = _digests.get(key)
+    if digest is None:
+        sha256 = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                sha256.update(chunk)
+        digest = sha256.hexdigest()
+        _digests[key] = digest
+    return digest
+
+# -----------------------------
+# Writer
+# -----------------------------
+class _StringTable:
+    def __init__(self):
+        self._buffer = bytearray()
+        self._offsets: Dict[str, Tuple[int, int]] = {}
+
+    def ref(self, value: Optional[str]) -> Tuple[int, int]:
+        if value is None:
+            return (_NONE, 0)
+        found = self._offsets.get(value)
+        if found is None:
+            encoded = value.encode("utf-8")
+            found = (len(self._buffer), len(encoded))
+            self._buffer += encoded
+            self._offsets[value] = found
+        return found
+
+    def refs(self, values) -> np.ndarray:
+        return np.array([self.ref(value) for value in values], dtype=STRING_REF_DTYPE).reshape(-1, 2)
+
+    def tobytes(self) -> bytes:
+        return bytes(self._buffer)
+
+
+def write_snapshot(path: str, registry, table, sources: Dict[str, str]) -> dict:
+    """
+    Write a snapshot of a parsed StationRegistry and RankingTable to `path`
+    atomically. `sources` maps "stations" / "ranking" to the files they were
+    parsed from, whose digests are recorded for staleness checks.
+    """
+    strings = _StringTable()
+    stations = np.zeros(len(registry), dtype=STATION_DTYPE)
+    stations["latitude"] = registry.latitudes
+    stations["longitude"] = registry.longitudes
+    stations["name"] = strings.refs(registry.names)
+    stations["divcode"] = strings.refs(registry.divcodes)
+    stations["feature"] = strings.refs(json.dumps(feature, separators=(",", ":")) for feature in registry.features)
+
+    meta = {
+        "format_version": FORMAT_VERSION,
+        "built_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "sources": {kind: {"name": os.path.basename(source), "sha256": file_digest(source)}
+                    for kind, source in sources.items()},
+        "stations": len(registry),
+        "ranking_shape": list(table.counts.shape)
+    }
+    sections = [
+        (b"STATIONS", stations.tobytes()),
+        (b"RNK_STN", strings.refs(table.stations).tobytes()),
+        (b"RNK_CRM", strings.refs(table.crimes).tobytes()),
+        (b"RNK_YRS", strings.refs(table.years).tobytes()),
+        (b"RNK_CNT", np.ascontiguousarray(table.counts, dtype="<i4").tobytes()),
+        (b"RNK_RNK", np.ascontiguousarray(table.rank, dtype="<i4").tobytes()),
+    ]
+    sections = [(b"META", json.dumps(meta).encode("utf-8")), (b"STRTAB", strings.tobytes())] + sections
+
+    offset = _HEADER.size + _SECTION.size * len(sections)
+    directory, payload = [], bytearray()
+    for tag, data in sections:
+        start = offset + len(payload)
+        padding = -start % 8
+        payload += b"\0" * padding
+        start += padding
+        directory.append(_SECTION.pack(tag, start, len(data), zlib.crc32(data)))
+        payload += data
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, FORMAT_VERSION, len(sections)))
+        f.writelines(directory)
+        f.write(payload)
+        f.flush()
+        os.fsync(f.fileno())
+    # Workers that already mapped the old file keep reading it until they reload
+    os.replace(tmp_path, path)
+    return meta
+
+# -----------------------------
+# Reader
+# -----------------------------
+class SnapshotFeatures(Sequence):
+    """GeoJSON features decoded from the snapshot on first access, then kept"""
+
+    def __init__(self, snapshot: "ReferenceSnapshot", refs: np.ndarray):
+        self._snapshot = snapshot
+        self._refs = refs
+        self._decoded: Dict[int, dict] = {}
+
+    def __len__(self) -> int:
+        return len(self._refs)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        index = range(len(self))[index]
+        feature = self._decoded.get(index)
+        if feature is None:
+            feature = json.loads(self._snapshot.string(self._refs[index]))
+            self._decoded[index] = feature
+        return feature
+
+
+class ReferenceSnapshot:
+    """Read-only mmap of a snapshot file; numeric sections are zero-copy numpy views"""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._mmap)
+        self._sections = self._read_directory()
+        self.meta = json.loads(bytes(self._section(b"META")))
+        self._strings = self._section(b"STRTAB")
+
+    def _read_directory(self) -> Dict[bytes, memoryview]:
+        if len(self._mmap) < _HEADER.size:
+            raise SnapshotError(f"{self.path} is truncated")
+        magic, version, count = _HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            raise SnapshotError(f"{self.path} is not a reference snapshot")
+        if version != FORMAT_VERSION:
+            raise SnapshotError(f"{self.path} has format version {version}, expected {FORMAT_VERSION}")
+
+        sections = {}
+        for i in range(count):
+            tag, offset, length, crc = _SECTION.unpack_from(self._mmap, _HEADER.size + i * _SECTION.size)
+            tag = tag.rstrip(b"\0")
+            if offset + length > len(self._mmap):
+                raise SnapshotError(f"{self.path} is truncated in section {tag.decode()}")
+            data = self._view[offset:offset + length]
+            if zlib.crc32(data) != crc:
+                raise SnapshotError(f"{self.path} failed its checksum in section {tag.decode()}")
+            sections[tag] = data
+        return sections
+
+    def _section(self, tag: bytes) -> memoryview:
+        try:
+            return self._sections[tag]
+        except KeyError:
+            raise SnapshotError(f"{self.path} has no {tag.decode()} section") from None
+
+    def _array(self, tag: bytes, dtype, shape=None) -> np.ndarray:
+        array = np.frombuffer(self._section(tag), dtype=dtype)
+        return array.reshape(shape) if shape is not None else array
+
+    def string(self, ref) -> Optional[str]:
+        offset, length = int(ref[0]), int(ref[1])
+        if offset == _NONE:
+            return None
+        return str(self._strings[offset:offset + length], "utf-8")
+
+    def strings(self, tag: bytes) -> List[Optional[str]]:
+        return [self.string(ref) for ref in self._array(tag, STRING_REF_DTYPE)]
+
+    def covers(self, kind: str, source_path: str) -> bool:
+        """True when `kind` was built from a file with `source_path`'s name"""
+        source = self.meta["sources"].get(kind)
+        return source is not None and source["name"] == os.path.basename(source_path)
+
+    def matches(self, kind: str, source_path: str) -> bool:
+        """
+        True when `kind` was built from `source_path`'s current contents, or,
+        if that file is absent (snapshot-only deployments), from one of its name.
+        """
+        if not self.covers(kind, source_path):
+            return False
+        if not os.path.exists(source_path):
+            return True
+        return self.meta["sources"][kind]["sha256"] == file_digest(source_path)
+
+    def stations(self):
+        """(names, divcodes, latitudes, longitudes, features) with coordinates as zero-copy views"""
+        records = self._array(b"STATIONS", STATION_DTYPE)
+        names = [self.string(ref) for ref in records["name"]]
+        divcodes = [self.string(ref) for ref in records["divcode"]]
+        return names, divcodes, records["latitude"], records["longitude"], SnapshotFeatures(self, records["feature"])
+
+    def ranking(self):
+        """(stations, crimes, years, counts, rank) with the count and rank matrices as zero-copy views"""
+        stations, crimes, years = (self.strings(tag) for tag in (b"RNK_STN", b"RNK_CRM", b"RNK_YRS"))
+        counts = self._array(b"RNK_CNT", "<i4", (len(stations), len(crimes), len(years)))
+        rank = self._array(b"RNK_RNK", "<i4", (len(stations), len(crimes)))
+        return stations, crimes, years, counts, rank
+
+
+# Keyed by path; the file's identity is rechecked on every lookup so a rebuilt snapshot is picked up
+_snapshots: Dict[str, Tuple[tuple, Optional[ReferenceSnapshot]]] = {}
+_snapshots_lock = threading.Lock()
+_warned = set()
+
+def get_snapshot(path: str = SNAPSHOT_FILE) -> Optional[ReferenceSnapshot]:
+    """The shared snapshot at `path`, or None when it is absent or unreadable"""
+    key = os.path.abspath(path)
+    try:
+        stat = os.stat(key)
+    except OSError:
+        return None
+    identity = (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+    cached = _snapshots.get(key)
+    if cached is not None and cached[0] == identity:
+        return cached[1]
+    with _snapshots_lock:
+        cached = _snapshots.get(key)
+        if cached is None or cached[0] != identity:
+            snapshot = None
+            try:
+                snapshot = ReferenceSnapshot(key)
+            except (OSError, ValueError, SnapshotError) as e:
+                print(f"⚠️ Ignoring reference snapshot: {e}")
+            cached = (identity, snapshot)
+            _snapshots[key] = cached
+    return cached[1]
+
+def snapshot_for(kind: str, source_path: str) -> Optional[ReferenceSnapshot]:
+    """The shared snapshot if it holds `kind` parsed from `source_path`'s current contents"""
+    snapshot = get_snapshot()
+    if snapshot is None or not snapshot.covers(kind, source_path):
+        return None
+    if not snapshot.matches(kind, source_path):
+        if (kind, snapshot.path) not in _warned:
+            _warned.add((kind, snapshot.path))
+            print(f"⚠️ Reference snapshot is stale for {os.path.basename(source_path)}; "
+                  f"parsing the source (rebuild with `python -m utils.snapshot build`)")
+        return None
+    return snapshot
+
+# -----------------------------
+# CLI
+# -----------------------------
+def build(stations_path: str, ranking_path: str, out_path: str = SNAPSHOT_FILE) -> dict:
+    # Parsed from the sources, never from an existing snapshot
+    from utils.station_registry import load_station_registry
+    from utils.ranking_utils import load_ranking_table
+
+    registry = load_station_registry(stations_path, use_snapshot=False)
+    table = load_ranking_table(ranking_path, use_snapshot=False)
+    return write_snapshot(out_path, registry, table, {"stations": stations_path, "ranking": ranking_path})
+
+def main(argv: List[str]) -> int:
+    from utils.station_registry import STATION_FILE
+    from controllers.ranking_controller import RANKING_FILE
+
+    command = argv[0] if argv else "verify"
+    path = argv[1] if len(argv) > 1 else SNAPSHOT_FILE
+    if command == "build":
+        started = time.perf_counter()
+        meta = build(STATION_FILE, RANKING_FILE, path)
+        print(f"✅ Wrote {path} ({os.path.getsize(path)} bytes, {meta['stations']} stations, "
+              f"ranking {meta['ranking_shape']}) in {time.perf_counter() - started:.2f}s")
+    elif command == "verify":
+        try:
+            snapshot = ReferenceSnapshot(path)
+        except (OSError, SnapshotError) as e:
+            print(f"❌ {e}")
+            return 1
+        fresh = {kind: snapshot.matches(kind, source)
+                 for kind, source in (("stations", STATION_FILE), ("ranking", RANKING_FILE))}
+        print(f"{path}: format {FORMAT_VERSION}, built {snapshot.meta['built_at']}, checksums OK")
+        for kind, ok in fresh.items():
+            print(f"  {kind:<9} {'current' if ok else 'STALE: source changed since build'}")
+        return 0 if all(fresh.values()) else 1
+    else:
+        print(__doc__)
+        return 2
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
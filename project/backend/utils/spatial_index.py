@@ -0,0 +1,226 @@
+import heapq
+from math import radians, sin, cos
+from typing import Iterable, List, Optional, Sequence, Tuple
+import numpy as np
+from utils.haversine import EARTH_RADIUS_KM, haversine_np
+
+# Relative slack applied to chord bounds so floating point noise never drops a
+# candidate that the haversine ranking would have kept
+_BOUND_SLACK = 1e-9
+
+def _to_unit_vector(lat: float, lon: float) -> Tuple[float, float, float]:
+    lat, lon = radians(lat), radians(lon)
+    return (cos(lat) * cos(lon), cos(lat) * sin(lon), sin(lat))
+
+def _chord_sq_for_km(distance_km: float) -> float:
+    """Squared chord length on the unit sphere for a great circle distance"""
+    half_angle = min(distance_km / (2 * EARTH_RADIUS_KM), 3.141592653589793 / 2)
+    return (2 * sin(half_angle)) ** 2
+
+
+class StationIndex:
+    """
+    KD-tree over stations projected onto the unit sphere.
+    Chord length is monotonic in great circle distance, so nearest neighbours by
+    chord are nearest by haversine; candidates are re-ranked with `haversine_np` so
+    results match a brute-force sort exactly, ties included.
+    """
+
+    def __init__(self, latitudes: Sequence[float], longitudes: Sequence[float], leaf_size: int = 8):
+        self.latitudes = np.asarray(latitudes, dtype=np.float64)
+        self.longitudes = np.asarray(longitudes, dtype=np.float64)
+        self.leaf_size = leaf_size
+        lat, lon = np.radians(self.latitudes), np.radians(self.longitudes)
+        xyz = np.column_stack((np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)))
+        self.xyz = xyz
+        # Tree traversal is scalar Python, where tuples are far cheaper to index than arrays
+        self.points = [tuple(p) for p in xyz.tolist()]
+        self.order = list(range(len(self.points)))
+        # Each node is (start, end, axis, split, left, right); leaves have axis -1
+        self.nodes: List[Tuple[int, int, int, float, int, int]] = []
+        if self.points:
+            self._build(0, len(self.points))
+        # Leaf members as index arrays, for the batched traversal
+        order = np.asarray(self.order, dtype=np.intp)
+        self.node_members = {node_id: order[start:end]
+                             for node_id, (start, end, axis, *_) in enumerate(self.nodes) if axis < 0}
+
+    def __len__(self) -> int:
+        return len(self.points)
+
+    def _build(self, start: int, end: int) -> int:
+        node_id = len(self.nodes)
+        self.nodes.append((start, end, -1, 0.0, -1, -1))
+        if end - start <= self.leaf_size:
+            return node_id
+
+        members = self.order[start:end]
+        spreads = [
+            max(self.points[i][axis] for i in members) - min(self.points[i][axis] for i in members)
+            for axis in range(3)
+        ]
+        axis = spreads.index(max(spreads))
+        members.sort(key=lambda i: self.points[i][axis])
+        self.order[start:end] = members
+
+        mid = (start + end) // 2
+        split = self.points[self.order[mid]][axis]
+        left = self._build(start, mid)
+        right = self._build(mid, end)
+        self.nodes[node_id] = (start, end, axis, split, left, right)
+        return node_id
+
+    def _chord_sq(self, q: Tuple[float, float, float], i: int) -> float:
+        p = self.points[i]
+        return (p[0] - q[0]) ** 2 + (p[1] - q[1]) ** 2 + (p[2] - q[2]) ** 2
+
+    def _knn_bound(self, q: Tuple[float, float, float], k: int, bound: float) -> float:
+        """Squared chord to the k-th nearest point, capped at `bound`"""
+        heap: List[float] = []  # max-heap of the k best squared chords (negated)
+        stack = [0]
+        while stack:
+            start, end, axis, split, left, right = self.nodes[stack.pop()]
+            if axis < 0:
+                for pos in range(start, end):
+                    d2 = self._chord_sq(q, self.order[pos])
+                    if d2 > bound:
+                        continue
+                    if len(heap) < k:
+                        heapq.heappush(heap, -d2)
+                    elif d2 < -heap[0]:
+                        heapq.heapreplace(heap, -d2)
+                    if len(heap) == k:
+                        bound = min(bound, -heap[0])
+                continue
+            diff = q[axis] - split
+            near, far = (left, right) if diff < 0 else (right, left)
+            if diff * diff <= bound * (1 + _BOUND_SLACK):
+                stack.append(far)
+            stack.append(near)
+        return bound
+
+    def _within(self, q: Tuple[float, float, float], bound: float) -> List[int]:
+        """All point indices whose squared chord to `q` is at most `bound`"""
+        found = []
+        stack = [0]
+        while stack:
+            start, end, axis, split, left, right = self.nodes[stack.pop()]
+            if axis < 0:
+                for pos in range(start, end):
+                    i = self.order[pos]
+                    if self._chord_sq(q, i) <= bound:
+                        found.append(i)
+                continue
+            diff = q[axis] - split
+            stack.append(left if diff < 0 else right)
+            if diff * diff <= bound:
+                stack.append(right if diff < 0 else left)
+        return found
+
+    def query(self, lat: float, lon: float, k: int = 5,
+              max_radius_km: Optional[float] = None) -> List[Tuple[int, float]]:
+        """
+        Return up to `k` (station index, distance_km) pairs nearest to (lat, lon),
+        closest first, optionally limited to stations within `max_radius_km`.
+        """
+        if k <= 0 or not self.points:
+            return []
+
+        q = _to_unit_vector(lat, lon)
+        bound = float("inf") if max_radius_km is None else _chord_sq_for_km(max_radius_km)
+        bound = self._knn_bound(q, k, bound * (1 + _BOUND_SLACK) + 1e-18)
+        if bound == float("inf"):
+            candidates = list(range(len(self.points)))
+        else:
+            candidates = self._within(q, bound * (1 + _BOUND_SLACK) + 1e-18)
+
+        candidates = np.sort(np.asarray(candidates, dtype=np.intp))
+        distances = haversine_np(lat, lon, self.latitudes[candidates], self.longitudes[candidates])
+        if max_radius_km is not None:
+            keep = distances <= max_radius_km
+            candidates, distances = candidates[keep], distances[keep]
+        # Stable sort over ascending indices breaks distance ties by station order
+        ranked = np.argsort(distances, kind="stable")[:k]
+        return [(int(candidates[j]), float(distances[j])) for j in ranked]
+
+    def _knn_bounds_many(self, node_id: int, queries: np.ndarray, qidx: np.ndarray, best: np.ndarray) -> None:
+        """Batched `_knn_bound`: `best[q]` keeps the k smallest squared chords seen for query q"""
+        start, end, axis, split, left, right = self.nodes[node_id]
+        if axis < 0:
+            members = self.node_members[node_id]
+            diff = queries[qidx, None, :] - self.xyz[members][None, :, :]
+            merged = np.concatenate((best[qidx], np.einsum("qmd,qmd->qm", diff, diff)), axis=1)
+            k = best.shape[1]
+            best[qidx] = np.partition(merged, k - 1, axis=1)[:, :k]
+            return
+        diff = queries[qidx, axis] - split
+        below = diff < 0
+        # Near side first for every query, then the far side only where the k-th bound still reaches it
+        for child, mask in ((left, below), (right, ~below)):
+            if mask.any():
+                self._knn_bounds_many(child, queries, qidx[mask], best)
+        reach = diff * diff <= best[qidx, -1] * (1 + _BOUND_SLACK)
+        for child, mask in ((right, below & reach), (left, ~below & reach)):
+            if mask.any():
+                self._knn_bounds_many(child, queries, qidx[mask], best)
+
+    def _within_many(self, node_id: int, queries: np.ndarray, qidx: np.ndarray, bounds: np.ndarray,
+                     found: List[Tuple[np.ndarray, np.ndarray]]) -> None:
+        """Batched `_within`: appends (query, station) index pairs within each query's bound"""
+        start, end, axis, split, left, right = self.nodes[node_id]
+        if axis < 0:
+            members = self.node_members[node_id]
+            diff = queries[qidx, None, :] - self.xyz[members][None, :, :]
+            hit_q, hit_m = np.nonzero(np.einsum("qmd,qmd->qm", diff, diff) <= bounds[qidx, None])
+            found.append((qidx[hit_q], members[hit_m]))
+            return
+        diff = queries[qidx, axis] - split
+        reach = diff * diff <= bounds[qidx]
+        for child, mask in ((left, (diff < 0) | reach), (right, (diff >= 0) | reach)):
+            if mask.any():
+                self._within_many(child, queries, qidx[mask], bounds, found)
+
+    def query_many(self, points: Iterable[Tuple[float, float]], k: int = 5,
+                   max_radius_km: Optional[float] = None) -> List[List[Tuple[int, float]]]:
+        """
+        `query` for every (lat, lon) in `points`, preserving input order, in one
+        batched pass: each tree node is visited once for all the queries that
+        reach it, and all candidates are re-ranked by haversine together.
+        """
+        coords = np.asarray(list(points), dtype=np.float64).reshape(-1, 2)
+        if k <= 0 or not self.points or not len(coords):
+            return [[] for _ in range(len(coords))]
+
+        lat, lon = np.radians(coords[:, 0]), np.radians(coords[:, 1])
+        queries = np.column_stack((np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)))
+        qidx = np.arange(len(coords))
+        bound = float("inf") if max_radius_km is None else _chord_sq_for_km(max_radius_km)
+        best = np.full((len(coords), k), bound * (1 + _BOUND_SLACK) + 1e-18)
+        self._knn_bounds_many(0, queries, qidx, best)
+
+        found: List[Tuple[np.ndarray, np.ndarray]] = []
+        self._within_many(0, queries, qidx, best[:, -1] * (1 + _BOUND_SLACK) + 1e-18, found)
+        owners = np.concatenate([q for q, _ in found])
+        candidates = np.concatenate([i for _, i in found])
+        distances = haversine_np(coords[owners, 0], coords[owners, 1],
+                                 self.latitudes[candidates], self.longitudes[candidates])
+        if max_radius_km is not None:
+            keep = distances <= max_radius_km
+            owners, candidates, distances = owners[keep], candidates[keep], distances[keep]
+
+        # Grouped by query, closest first, distance ties broken by station order as in `query`
+        ranked = np.lexsort((candidates, distances, owners))
+        owners, candidates, distances = owners[ranked], candidates[ranked], distances[ranked]
+        starts = np.searchsorted(owners, qidx)
+        ends = np.minimum(np.searchsorted(owners, qidx, side="right"), starts + k)
+        pairs = list(zip(candidates.tolist(), distances.tolist()))
+        return [pairs[s:e] for s, e in zip(starts.tolist(), ends.tolist())]
+
+    def brute_force(self, lat: float, lon: float, k: int = 5,
+                    max_radius_km: Optional[float] = None) -> List[Tuple[int, float]]:
+        """Full-scan reference ranking that `query` is guaranteed to reproduce"""
+        distances = haversine_np(lat, lon, self.latitudes, self.longitudes)
+        ranked = [int(i) for i in np.argsort(distances, kind="stable")]
+        if max_radius_km is not None:
+            ranked = [i for i in ranked if distances[i] <= max_radius_km]
+        return [(i, float(distances[i])) for i in ranked[:k]]
@@ -0,0 +1,127 @@
+import json
+import os
+import threading
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from utils.spatial_index import StationIndex
+from utils.snapshot import snapshot_for
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+STATION_FILE = os.path.join(BASE_DIR, '../data/SingaporePoliceForceEstablishments2018GEOJSON.geojson')
+
+# -----------------------------
+# Description HTML Parser
+# -----------------------------
+def parse_description(desc_html: str) -> Tuple[Optional[str], Optional[str]]:
+    """Extract the BLDG name and DIVCODE from a feature's Description table"""
+    # Imported on first parse rather than with the module; only dataset loads need it
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(desc_html, "html.parser")
+
+    bldg_name = None
+    divcode = None
+
+    for row in soup.find_all("tr"):
+        th = row.find("th")
+        td = row.find("td")
+        if th and td:
+            label = th.get_text(strip=True)
+            value = td.get_text(strip=True)
+            if label == "BLDG":
+                bldg_name = value
+            elif label == "DIVCODE":
+                divcode = value
+
+    return bldg_name, divcode
+
+# -----------------------------
+# Registry
+# -----------------------------
+class StationRegistry:
+    """Police establishments parsed once and held in index-aligned arrays"""
+
+    def __init__(self, path: str, mtime: float, names: List[Optional[str]], divcodes: List[Optional[str]],
+                 latitudes: Sequence[float], longitudes: Sequence[float], features: Sequence[dict]):
+        self.path = path
+        self.mtime = mtime
+        self.names = tuple(names)
+        self.divcodes = tuple(divcodes)
+        self.latitudes = np.asarray(latitudes, dtype=np.float64)
+        self.longitudes = np.asarray(longitudes, dtype=np.float64)
+        self.features = features
+        self.index = StationIndex(self.latitudes, self.longitudes)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def station(self, index: int) -> dict:
+        """Return station `index` in the dict shape used by the location controller"""
+        return {
+            "name": self.names[index],
+            "divcode": self.divcodes[index],
+            "latitude": float(self.latitudes[index]),
+            "longitude": float(self.longitudes[index]),
+            "raw": self.features[index]
+        }
+
+
+def load_station_registry(path: str = STATION_FILE, use_snapshot: bool = True) -> StationRegistry:
+    """
+    Read the GeoJSON at `path` and parse every feature into a new registry.
+    A current reference snapshot (utils/snapshot.py) is mapped instead of parsing.
+    """
+    snapshot = snapshot_for("stations", path) if use_snapshot else None
+    if snapshot is not None:
+        names, divcodes, latitudes, longitudes, features = snapshot.stations()
+        mtime = os.path.getmtime(path if os.path.exists(path) else snapshot.path)
+        return StationRegistry(path, mtime, names, divcodes, latitudes, longitudes, features)
+
+    mtime = os.path.getmtime(path)
+    with open(path, "r", encoding="utf-8") as f:
+        geojson_data = json.load(f)
+
+    names, divcodes, features = [], [], []
+    latitudes, longitudes = [], []
+
+    for feature in geojson_data["features"]:
+        lon, lat = feature['geometry']['coordinates'][:2]
+        bldg_name, divcode = parse_description(feature['properties'].get('Description', ''))
+
+        names.append(bldg_name)
+        divcodes.append(divcode)
+        latitudes.append(lat)
+        longitudes.append(lon)
+        features.append(feature)
+
+    return StationRegistry(path, mtime, names, divcodes, latitudes, longitudes, tuple(features))
+
+# Registries are keyed by absolute path so every caller shares one parse per file
+_registries: Dict[str, StationRegistry] = {}
+_registries_lock = threading.Lock()
+
+def get_station_registry(path: str = STATION_FILE) -> StationRegistry:
+    """Return the shared registry for `path`, parsing the file on first use"""
+    key = os.path.abspath(path)
+    registry = _registries.get(key)
+    if registry is None:
+        with _registries_lock:
+            registry = _registries.get(key)
+            if registry is None:
+                registry = load_station_registry(key)
+                _registries[key] = registry
+    return registry
+
+def reload_station_registry(path: str = STATION_FILE, force: bool = True) -> StationRegistry:
+    """
+    Re-parse the dataset at `path` and swap it in for subsequent lookups.
+    With force=False the file is only re-read when its mtime has changed.
+    """
+    key = os.path.abspath(path)
+    with _registries_lock:
+        current = _registries.get(key)
+        if current is not None and not force and os.path.getmtime(key) == current.mtime:
+            return current
+        registry = load_station_registry(key)
+        _registries[key] = registry
+    return registry
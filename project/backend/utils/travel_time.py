@@ -0,0 +1,247 @@
+import asyncio
+import os
+import time
+from typing import List, Optional, Tuple
+import httpx
+from config.env import load_env
+from utils.cache import SingleFlight, TieredCache, get_shared_cache
+from utils.haversine import haversine
+from utils.metrics import observe_external
+
+load_env()
+
+DISTANCE_MATRIX_URL = "https://maps.googleapis.com/maps/api/distancematrix/json"
+
+# Straight-line distance is scaled by a road detour factor and divided by a
+# typical urban driving speed when no routed estimate is available
+DETOUR_FACTOR = 1.3
+AVERAGE_SPEED_KMH = 40.0
+
+Point = Tuple[float, float]
+
+# -----------------------------
+# Backends
+# -----------------------------
+class TravelTimeProvider:
+    """
+    Interface for travel-time backends. `travel_times` returns one entry per
+    destination: a dict with travel_distance_km / travel_time_min, or None when
+    the backend could not route that destination.
+    """
+    name = "base"
+
+    async def travel_times(self, origin: Point, destinations: List[Point]) -> List[Optional[dict]]:
+        raise NotImplementedError
+
+    async def aclose(self) -> None:
+        pass
+
+
+class HaversineEstimator(TravelTimeProvider):
+    """Offline ETA estimate from great circle distance, used as the fallback"""
+    name = "estimate"
+
+    def __init__(self, detour_factor: float = DETOUR_FACTOR, speed_kmh: float = AVERAGE_SPEED_KMH):
+        self.detour_factor = detour_factor
+        self.speed_kmh = speed_kmh
+
+    def estimate(self, origin: Point, destination: Point) -> dict:
+        distance_km = haversine(origin[0], origin[1], destination[0], destination[1]) * self.detour_factor
+        return {
+            "travel_distance_km": distance_km,
+            "travel_time_min": distance_km / self.speed_kmh * 60,
+            "eta_source": self.name
+        }
+
+    async def travel_times(self, origin: Point, destinations: List[Point]) -> List[Optional[dict]]:
+        return [self.estimate(origin, dest) for dest in destinations]
+
+
+class StubTravelTimeProvider(HaversineEstimator):
+    """Local stand-in for the Distance Matrix API with a configurable response latency"""
+    name = "stub"
+
+    def __init__(self, latency_s: float = 0.0, **kwargs):
+        super().__init__(**kwargs)
+        self.latency_s = latency_s
+
+    async def travel_times(self, origin: Point, destinations: List[Point]) -> List[Optional[dict]]:
+        if self.latency_s:
+            await asyncio.sleep(self.latency_s)
+        return [self.estimate(origin, dest) for dest in destinations]
+
+
+class GoogleDistanceMatrixProvider(TravelTimeProvider):
+    """Google Distance Matrix backend over a pooled, keep-alive HTTP client"""
+    name = "google"
+
+    def __init__(self, api_key: Optional[str], endpoint: str = DISTANCE_MATRIX_URL,
+                 timeout_s: float = 2.0, max_connections: int = 20):
+        self.api_key = api_key
+        self.endpoint = endpoint
+        self.timeout_s = timeout_s
+        self.max_connections = max_connections
+        self._client: Optional[httpx.AsyncClient] = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        # Created lazily so the client binds to the running event loop
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout_s,
+                limits=httpx.Limits(max_connections=self.max_connections,
+                                    max_keepalive_connections=self.max_connections)
+            )
+        return self._client
+
+    async def travel_times(self, origin: Point, destinations: List[Point]) -> List[Optional[dict]]:
+        params = {
+            "origins": f"{origin[0]},{origin[1]}",
+            "destinations": "|".join(f"{lat},{lon}" for lat, lon in destinations),
+            "key": self.api_key,
+            "mode": "driving",
+            "units": "metric"
+        }
+
+        started = time.perf_counter()
+        try:
+            response = await self.client.get(self.endpoint, params=params)
+            data = response.json()
+        except Exception:
+            observe_external("distance_matrix", started, ok=False)
+            raise
+        observe_external("distance_matrix", started, ok=data.get("status") == "OK")
+
+        if data["status"] != "OK":
+            raise Exception(f"Distance Matrix API Error: {data['status']}")
+
+        results = []
+        for elem in data["rows"][0]["elements"]:
+            if elem["status"] == "OK":
+                results.append({
+                    "travel_distance_km": elem["distance"]["value"] / 1000,
+                    "travel_time_min": elem["duration"]["value"] / 60,
+                    "eta_source": self.name
+                })
+            else:
+                results.append(None)
+        return results
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+# -----------------------------
+# Caching front end
+# -----------------------------
+class CachedTravelTimeProvider(TravelTimeProvider):
+    """
+    Wraps a backend with a TTL/LRU cache keyed on the origin quantized to a grid
+    cell plus the destination, a per-call timeout, and a haversine fallback
+    whenever the backend is slow or failing. Fallback estimates are not cached.
+    Identical concurrent backend calls from one cell are coalesced into one.
+    """
+
+    def __init__(self, backend: TravelTimeProvider, cache: TieredCache, cell_deg: float = 0.002,
+                 timeout_s: float = 2.0, fallback: Optional[HaversineEstimator] = None):
+        self.backend = backend
+        self.cache = cache
+        self.cell_deg = cell_deg
+        self.timeout_s = timeout_s
+        self.fallback = fallback or HaversineEstimator()
+        self.name = backend.name
+        self.backend_calls = 0
+        self.fallbacks = 0
+        self._flight = SingleFlight()
+
+    def cache_key(self, origin: Point, destination: Point) -> tuple:
+        cell = (round(origin[0] / self.cell_deg), round(origin[1] / self.cell_deg))
+        return (cell, destination)
+
+    async def travel_times(self, origin: Point, destinations: List[Point]) -> List[Optional[dict]]:
+        keys = [self.cache_key(origin, dest) for dest in destinations]
+        results: List[Optional[dict]] = await self.cache.get_many(keys)
+        missing = [i for i, cached in enumerate(results) if cached is None]
+        if not missing:
+            return results
+
+        pending = [destinations[i] for i in missing]
+
+        async def fetch() -> List[Optional[dict]]:
+            fetched = await asyncio.wait_for(self.backend.travel_times(origin, pending), timeout=self.timeout_s)
+            self.backend_calls += 1
+            for i, value in zip(missing, fetched):
+                if value is not None:
+                    await self.cache.set(keys[i], value)
+            return fetched
+
+        try:
+            # Requests from the same cell share results, so they can share the upstream call too
+            fetched = await self._flight.do((keys[missing[0]][0], tuple(pending)), fetch)
+        except Exception as e:
+            print(f"⚠️ Travel time backend '{self.backend.name}' unavailable, using estimates: {e!r}")
+            self.fallbacks += 1
+            fetched = await self.fallback.travel_times(origin, pending)
+
+        for i, value in zip(missing, fetched):
+            results[i] = value
+        return results
+
+    def stats(self) -> dict:
+        return {
+            "backend": self.name,
+            "cache": self.cache.stats(),
+            "backend_calls": self.backend_calls,
+            "coalesced_calls": self._flight.coalesced,
+            "fallbacks": self.fallbacks
+        }
+
+    async def aclose(self) -> None:
+        await self.backend.aclose()
+
+# -----------------------------
+# Provider factory
+# -----------------------------
+_provider: Optional[CachedTravelTimeProvider] = None
+
+def build_travel_time_provider() -> CachedTravelTimeProvider:
+    """Build the provider selected by TRAVEL_TIME_BACKEND (google or stub)"""
+    timeout_s = float(os.getenv("TRAVEL_TIME_TIMEOUT", "2.0"))
+    backend_name = os.getenv("TRAVEL_TIME_BACKEND", "google").lower()
+
+    if backend_name == "stub":
+        backend = StubTravelTimeProvider(latency_s=float(os.getenv("STUB_TRAVEL_LATENCY_MS", "0")) / 1000)
+    elif backend_name == "google":
+        backend = GoogleDistanceMatrixProvider(
+            os.getenv("GOOGLE_MAPS_API_KEY"),
+            endpoint=os.getenv("DISTANCE_MATRIX_URL", DISTANCE_MATRIX_URL),
+            timeout_s=timeout_s,
+            max_connections=int(os.getenv("TRAVEL_TIME_MAX_CONNECTIONS", "20"))
+        )
+    else:
+        raise ValueError(f"Unknown TRAVEL_TIME_BACKEND: {backend_name}")
+
+    cache = TieredCache(
+        "travel_times",
+        maxsize=int(os.getenv("TRAVEL_TIME_CACHE_SIZE", "10000")),
+        ttl=float(os.getenv("TRAVEL_TIME_CACHE_TTL", "600")),
+        shared=get_shared_cache()
+    )
+    return CachedTravelTimeProvider(
+        backend, cache,
+        cell_deg=float(os.getenv("TRAVEL_TIME_CELL_DEG", "0.002")),
+        timeout_s=timeout_s
+    )
+
+def get_travel_time_provider() -> CachedTravelTimeProvider:
+    global _provider
+    if _provider is None:
+        _provider = build_travel_time_provider()
+    return _provider
+
+async def close_travel_time_provider() -> None:
+    global _provider
+    if _provider is not None:
+        await _provider.aclose()
+        _provider = None
@@ -17,39 +17,74 @@ type Report = {
   created_at: string;
 };
 
+type ReportPage = {
+  reports: Report[];
+  nextCursor: string | null;
+};
+
+const sortNewestFirst = (list: Report[]) =>
+  [...list].sort((a, b) => new Date(b.created_at).getTime() - new Date(a.created_at).getTime());
+
+const matchesQuery = (report: Report, query: string) => {
+  const lowercaseQuery = query.toLowerCase();
+  return (
+    (report.crime_type && report.crime_type.toLowerCase().includes(lowercaseQuery)) ||
+    (report.location && report.location.toLowerCase().includes(lowercaseQuery)) ||
+    (report.police_station && report.police_station.toLowerCase().includes(lowercaseQuery))
+  );
+};
+
+// /api/history returns one page at a time; X-Next-Cursor is set while older reports remain
+const fetchReportPage = async (token: string, cursor: string | null): Promise<ReportPage> => {
+  const response = await axios.get<Report[]>(`${BASE_URL}/api/history`, {
+    headers: {
+      Authorization: `Bearer ${token}`,
+    },
+    params: cursor ? { cursor } : undefined,
+  });
+  return {
+    reports: response.data,
+    nextCursor: response.headers['x-next-cursor'] ?? null,
+  };
+};
+
 export default function AlertsScreen() {
   const [reports, setReports] = useState<Report[]>([]);
   const [filteredReports, setFilteredReports] = useState<Report[]>([]);
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
   const [searchQuery, setSearchQuery] = useState('');
   const [selectedReport, setSelectedReport] = useState<Report | null>(null);
   const [modalVisible, setModalVisible] = useState(false);
   const modalAnimation = useRef(new Animated.Value(300)).current;
   const overlayOpacity = useRef(new Animated.Value(0)).current;
+  // Guards against onEndReached firing again while a page is still loading
+  const pageRequestInFlight = useRef(false);
+  const searchQueryRef = useRef('');
+
+  const showReports = (list: Report[]) => {
+    const query = searchQueryRef.current.trim();
+    setReports(list);
+    setFilteredReports(query === '' ? list : list.filter(report => matchesQuery(report, query)));
+  };
 
   useFocusEffect(
     useCallback(() => {
       const fetchReports = async () => {
         setLoading(true);
+        pageRequestInFlight.current = true;
         try {
           const token = await AsyncStorage.getItem('userToken');
           if (!token) return;
   
-          const response = await axios.get<Report[]>(`${BASE_URL}/api/history`, {
-            headers: {
-              Authorization: `Bearer ${token}`,
-            },
-          });
-          
-          const sortedReports = [...response.data].sort((a, b) => {
-            return new Date(b.created_at).getTime() - new Date(a.created_at).getTime();
-          });
-          
-          setReports(sortedReports);
-          setFilteredReports(sortedReports);
+          const page = await fetchReportPage(token, null);
+          showReports(sortNewestFirst(page.reports));
+          setNextCursor(page.nextCursor);
         } catch (error) {
           console.error("Error fetching reports:", error);
         } finally {
+          pageRequestInFlight.current = false;
           setLoading(false);
         }
       };
@@ -58,6 +93,25 @@ export default function AlertsScreen() {
     }, [])
   );
 
+  const loadMoreReports = async () => {
+    if (!nextCursor || pageRequestInFlight.current) return;
+    pageRequestInFlight.current = true;
+    setLoadingMore(true);
+    try {
+      const token = await AsyncStorage.getItem('userToken');
+      if (!token) return;
+
+      const page = await fetchReportPage(token, nextCursor);
+      showReports(sortNewestFirst([...reports, ...page.reports]));
+      setNextCursor(page.nextCursor);
+    } catch (error) {
+      console.error("Error fetching more reports:", error);
+    } finally {
+      pageRequestInFlight.current = false;
+      setLoadingMore(false);
+    }
+  };
+
   const formatTimeAgo = (dateString: string) => {
     const now = new Date();
     // Convert input date to Singapore time
@@ -96,24 +150,19 @@ export default function AlertsScreen() {
 
   const handleSearch = (text: string) => {
     setSearchQuery(text);
+    searchQueryRef.current = text;
     
     if (text.trim() === '') {
       setFilteredReports(reports);
       return;
     }
     
-    const lowercaseQuery = text.toLowerCase();
-    const filtered = reports.filter(report => 
-      (report.crime_type && report.crime_type.toLowerCase().includes(lowercaseQuery)) ||
-      (report.location && report.location.toLowerCase().includes(lowercaseQuery)) ||
-      (report.police_station && report.police_station.toLowerCase().includes(lowercaseQuery))
-    );
-    
-    setFilteredReports(filtered);
+    setFilteredReports(reports.filter(report => matchesQuery(report, text)));
   };
 
   const clearSearch = () => {
     setSearchQuery('');
+    searchQueryRef.current = '';
     setFilteredReports(reports);
   };
 
@@ -305,6 +354,17 @@ export default function AlertsScreen() {
               <Text style={styles.alertTime}>{formatTimeAgo(item.created_at)}</Text>
             </TouchableOpacity>
           )}
+          onEndReached={loadMoreReports}
+          onEndReachedThreshold={0.5}
+          ListFooterComponent={
+            loadingMore ? (
+              <ActivityIndicator style={styles.footerLoader} color="#007AFF" />
+            ) : nextCursor ? (
+              <TouchableOpacity style={styles.loadMoreButton} onPress={loadMoreReports}>
+                <Text style={styles.loadMoreText}>Load older reports</Text>
+              </TouchableOpacity>
+            ) : null
+          }
           ListEmptyComponent={
             <View style={styles.emptyContainer}>
               <Ionicons name="search-outline" size={64} color="#E5E5EA" />
@@ -392,6 +452,21 @@ const styles = StyleSheet.create({
     fontSize: 14,
     color: '#8E8E93',
   },
+  footerLoader: {
+    paddingVertical: 16,
+  },
+  loadMoreButton: {
+    backgroundColor: '#F2F2F7',
+    borderRadius: 10,
+    paddingVertical: 12,
+    alignItems: 'center',
+    marginBottom: 20,
+  },
+  loadMoreText: {
+    fontSize: 16,
+    fontWeight: '600',
+    color: '#007AFF',
+  },
   emptyContainer: {
     flex: 1,
     justifyContent: 'center',
@@ -96,7 +96,7 @@ export default function ReportScreen() {
     try {
       const userEmail = await fetchUserEmail();
       
-      await submitCrimeReport({
+      const submitted = await submitCrimeReport({
         crime_type: selectedCrimeType.title,
         location: location.name,
         email: userEmail,
@@ -115,6 +115,13 @@ export default function ReportScreen() {
       Time: ${new Date().toLocaleString()}
       `.trim();
 
+      // The station was already alerted about this incident by the first report
+      if (submitted.duplicate) {
+        Alert.alert("Success", "This incident has already been reported nearby. Your report was added to it.");
+        setModalVisible(false);
+        return;
+      }
+
       await sendSMS(nearestStation.divcode || "UNKNOWN", smsMessage);
 
       Alert.alert("Success", "Crime report submitted successfully!");
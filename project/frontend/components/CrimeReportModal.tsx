@@ -112,11 +112,13 @@ const CrimeReportModal: React.FC<CrimeReportModalProps> = ({
                 </Text>
                 {nearestStation && (
                   <Text style={styles.detailSubvalue}>
-                    {nearestStation.travel_distance_km !== undefined
+                    {nearestStation.travel_distance_km != null
                       ? `${nearestStation.travel_distance_km.toFixed(1)} km`
                       : 'Distance unavailable'}
                     {' • '}
-                    {Math.round(nearestStation.travel_time_min)} mins away
+                    {nearestStation.travel_time_min != null
+                      ? `${Math.round(nearestStation.travel_time_min)} mins away`
+                      : 'ETA unavailable'}
                   </Text>
                 )}
               </View>
@@ -45,11 +45,13 @@ const LocationInfo = ({ location, nearestStation, onLocationPress }: LocationInf
             </Text>
             {nearestStation && (
               <Text style={styles.locationText}>
-                {nearestStation.travel_distance_km !== undefined
+                {nearestStation.travel_distance_km != null
                   ? `${nearestStation.travel_distance_km.toFixed(1)} km`
                   : 'Distance unavailable'}
                   {' • '}
-                {Math.round(nearestStation.travel_time_min)} mins away
+                {nearestStation.travel_time_min != null
+                  ? `${Math.round(nearestStation.travel_time_min)} mins away`
+                  : 'ETA unavailable'}
             </Text>
             )}
           </View>
@@ -10,9 +10,14 @@ export interface Location {
 
 export interface NearestStation {
   name: string;
-  travel_distance_km: number;
-  travel_time_min: number;
-  divcode?: string;
+  divcode?: string | null;
+  latitude: number;
+  longitude: number;
+  distance: number;
+  // null when no route to the station could be computed
+  travel_distance_km: number | null;
+  travel_time_min: number | null;
+  eta_source?: string | null;
 }
 
 export interface CrimeReport {
@@ -61,7 +66,14 @@ export const fetchUserEmail = async (): Promise<string> => {
   return response.data.email;
 };
 
-export const submitCrimeReport = async (report: CrimeReport): Promise<void> => {
+export interface SubmittedReport {
+  msg: string;
+  report_id: string;
+  incident_id: string;
+  duplicate: boolean;
+}
+
+export const submitCrimeReport = async (report: CrimeReport): Promise<SubmittedReport> => {
   const token = await AsyncStorage.getItem('userToken');
   if (!token) {
     throw new Error("User not authenticated. Please log in.");
@@ -72,7 +84,8 @@ export const submitCrimeReport = async (report: CrimeReport): Promise<void> => {
     'Content-Type': 'application/json',
   };
   
-  await axios.post(`${BASE_URL}/api/crime-report`, report, { headers });
+  const response = await axios.post<SubmittedReport>(`${BASE_URL}/api/crime-report`, report, { headers });
+  return response.data;
 };
 
 export const sendSMS = async (divcode: string, message: string): Promise<void> => {